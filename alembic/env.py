@@ -21,8 +21,11 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from app.core.database import Base
 from app.models import (
+    catalogue_version,
+    chunk_summary,
     exam,
     file,
+    file_page,
     predicted_paper,
     processed_text,
     question_topic,
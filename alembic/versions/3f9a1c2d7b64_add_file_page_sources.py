@@ -0,0 +1,29 @@
+"""add file page sources
+
+Revision ID: 3f9a1c2d7b64
+Revises: 18873ea0ba63
+Create Date: 2026-10-18 10:12:31.204117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c2d7b64"
+down_revision: Union[str, Sequence[str], None] = "18873ea0ba63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("files", sa.Column("page_sources", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("files", "page_sources")
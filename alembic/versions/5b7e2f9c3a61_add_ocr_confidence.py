@@ -0,0 +1,42 @@
+"""add ocr confidence
+
+Revision ID: 5b7e2f9c3a61
+Revises: 9d4a6c1e8b53
+Create Date: 2026-10-18 19:06:51.274308
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e2f9c3a61"
+down_revision: Union[str, Sequence[str], None] = "9d4a6c1e8b53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE uploadstatus ADD VALUE IF NOT EXISTS 'needs_review'")
+    op.add_column("file_pages", sa.Column("confidence", sa.Float(), nullable=True))
+    op.add_column("file_pages", sa.Column("word_count", sa.Integer(), nullable=True))
+    op.add_column(
+        "processed_texts", sa.Column("word_count", sa.Integer(), nullable=True)
+    )
+    # the old constant 0.9 was never measured
+    op.execute("UPDATE processed_texts SET confidence = NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("processed_texts", "word_count")
+    op.drop_column("file_pages", "word_count")
+    op.drop_column("file_pages", "confidence")
+    # Postgres cannot drop enum values; park reviewed uploads as failed
+    op.execute(
+        "UPDATE uploads SET status = 'failed' WHERE status = 'needs_review'"
+    )
@@ -0,0 +1,29 @@
+"""add file page dpi
+
+Revision ID: 9d4a6c1e8b53
+Revises: f2b7c9e04d18
+Create Date: 2026-10-18 17:41:22.630914
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4a6c1e8b53"
+down_revision: Union[str, Sequence[str], None] = "f2b7c9e04d18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("file_pages", sa.Column("dpi", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("file_pages", "dpi")
@@ -0,0 +1,55 @@
+"""add file pages checkpoints
+
+Revision ID: a72e5d90c1f3
+Revises: 3f9a1c2d7b64
+Create Date: 2026-10-18 11:03:47.518230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a72e5d90c1f3"
+down_revision: Union[str, Sequence[str], None] = "3f9a1c2d7b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "file_pages",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("file_id", sa.UUID(), nullable=False),
+        sa.Column("page_number", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=20), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("seconds", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["file_id"], ["files.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("file_id", "page_number", name="uq_file_page"),
+    )
+    op.create_index(
+        op.f("ix_file_pages_file_id"), "file_pages", ["file_id"], unique=False
+    )
+    op.add_column(
+        "processed_texts",
+        sa.Column(
+            "questions_extracted",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("processed_texts", "questions_extracted")
+    op.drop_index(op.f("ix_file_pages_file_id"), table_name="file_pages")
+    op.drop_table("file_pages")
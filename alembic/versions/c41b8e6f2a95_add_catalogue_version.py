@@ -0,0 +1,61 @@
+"""add catalogue version
+
+Revision ID: c41b8e6f2a95
+Revises: a72e5d90c1f3
+Create Date: 2026-10-18 12:26:05.930442
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41b8e6f2a95"
+down_revision: Union[str, Sequence[str], None] = "a72e5d90c1f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOGUE_TABLES = ("exams", "subjects", "topics")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalogue_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO catalogue_version (id, version) VALUES (1, 0)")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_catalogue_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE catalogue_version
+            SET version = version + 1, updated_at = now()
+            WHERE id = 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in CATALOGUE_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_catalogue_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in CATALOGUE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_catalogue_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_catalogue_version()")
+    op.drop_table("catalogue_version")
@@ -0,0 +1,44 @@
+"""add predicted paper status
+
+Revision ID: e83d1f4b9a27
+Revises: c41b8e6f2a95
+Create Date: 2026-10-18 14:12:09.204517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e83d1f4b9a27"
+down_revision: Union[str, Sequence[str], None] = "c41b8e6f2a95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+predicted_paper_status = sa.Enum(
+    "generating", "completed", "failed", name="predicted_paper_status"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    predicted_paper_status.create(op.get_bind(), checkfirst=True)
+    # existing papers were written in one go, so they are complete
+    op.add_column(
+        "predicted_papers",
+        sa.Column(
+            "status",
+            predicted_paper_status,
+            server_default="completed",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("predicted_papers", "status")
+    predicted_paper_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,53 @@
+"""add chunk summaries
+
+Revision ID: f2b7c9e04d18
+Revises: e83d1f4b9a27
+Create Date: 2026-10-18 15:02:41.771306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b7c9e04d18"
+down_revision: Union[str, Sequence[str], None] = "e83d1f4b9a27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chunk_summaries",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("processed_text_id", sa.UUID(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["processed_text_id"], ["processed_texts.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "processed_text_id", "chunk_index", name="uq_chunk_summary"
+        ),
+    )
+    op.create_index(
+        op.f("ix_chunk_summaries_processed_text_id"),
+        "chunk_summaries",
+        ["processed_text_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_chunk_summaries_processed_text_id"), table_name="chunk_summaries"
+    )
+    op.drop_table("chunk_summaries")
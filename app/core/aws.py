@@ -1,25 +1,248 @@
+"""Shared S3 access.
+
+boto3 clients are thread-safe but expensive to build (credential
+resolution, endpoint data, a fresh HTTP pool), so one client per
+credentials/region is created lazily per process and reused. Blocking
+calls go through a dedicated thread pool via the async wrappers below.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
 import boto3
-from typing import Optional
+from botocore.config import Config
 
 from app.core.config import settings
 
+_clients: Dict[Tuple, object] = {}
+_clients_lock = threading.Lock()
+
+# keyed by pid: a forked child must not reuse the parent's pool threads
+_s3_executors: Dict[int, ThreadPoolExecutor] = {}
+
+
+class ObjectTooLarge(ValueError):
+    """The S3 object is bigger than the caller allows."""
+
+
+class ObjectChecksumMismatch(ValueError):
+    """The S3 object's content does not match its declared sha256."""
+
+
+@dataclass
+class DownloadedObject:
+    path: str
+    size: int
+    sha256: str
+
 
 def get_s3_client(
     aws_access_key_id: Optional[str] = None,
     aws_secret_access_key: Optional[str] = None,
     region_name: Optional[str] = None,
 ):
-    """Return a boto3 S3 client. Allows creating a client with alternate credentials for testing."""
-    return boto3.client(
-        "s3",
-        aws_access_key_id=aws_access_key_id or settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=aws_secret_access_key or settings.AWS_SECRET_ACCESS_KEY,
-        region_name=region_name or settings.AWS_REGION,
+    """Return the shared boto3 S3 client for these credentials (default: settings).
+
+    Clients are cached per process, so a forked worker never reuses the
+    parent's connection pool.
+    """
+    key = (
+        os.getpid(),
+        aws_access_key_id or settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key or settings.AWS_SECRET_ACCESS_KEY,
+        region_name or settings.AWS_REGION,
+    )
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    # boto3's default session is not thread-safe; build clients one at a time
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = boto3.session.Session().client(
+                "s3",
+                aws_access_key_id=key[1],
+                aws_secret_access_key=key[2],
+                region_name=key[3],
+                config=Config(
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": 5, "mode": "adaptive"},
+                ),
+            )
+            _clients[key] = client
+    return client
+
+
+def get_s3_executor() -> ThreadPoolExecutor:
+    """Thread pool for blocking S3 calls, kept apart from the default
+    executor so slow transfers cannot starve other `run_in_executor` work.
+
+    Like the clients, the pool is per process: a forked child builds its own
+    instead of using the parent's, whose threads do not exist in the child.
+    """
+    pid = os.getpid()
+    executor = _s3_executors.get(pid)
+    if executor is not None:
+        return executor
+
+    with _clients_lock:
+        executor = _s3_executors.get(pid)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.S3_EXECUTOR_WORKERS, thread_name_prefix="s3"
+            )
+            _s3_executors[pid] = executor
+    return executor
+
+
+def shutdown_s3_executor() -> None:
+    with _clients_lock:
+        executor = _s3_executors.pop(os.getpid(), None)
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def _run(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_s3_executor(), lambda: func(*args, **kwargs)
+    )
+
+
+async def get_object_bytes(
+    key: str, bucket: Optional[str] = None, s3_client=None
+) -> bytes:
+    """Download a whole object without blocking the event loop."""
+    client = s3_client or get_s3_client()
+
+    def _get() -> bytes:
+        response = client.get_object(Bucket=bucket or settings.AWS_S3_BUCKET, Key=key)
+        return response["Body"].read()
+
+    return await _run(_get)
+
+
+async def put_object_bytes(
+    key: str,
+    data: bytes,
+    content_type: Optional[str] = None,
+    bucket: Optional[str] = None,
+    s3_client=None,
+) -> str:
+    """Upload `data` as one object and return its key."""
+    client = s3_client or get_s3_client()
+    extra_args = {"ContentType": content_type} if content_type else {}
+    await _run(
+        client.put_object,
+        Bucket=bucket or settings.AWS_S3_BUCKET,
+        Key=key,
+        Body=data,
+        **extra_args,
     )
+    return key
+
+
+async def iter_object_chunks(
+    key: str,
+    chunk_size: int = 1024 * 1024,
+    bucket: Optional[str] = None,
+    s3_client=None,
+) -> AsyncIterator[bytes]:
+    """Stream an object in chunks; each read runs in the S3 thread pool."""
+    client = s3_client or get_s3_client()
+    response = await _run(
+        client.get_object, Bucket=bucket or settings.AWS_S3_BUCKET, Key=key
+    )
+    body = response["Body"]
+    try:
+        while True:
+            chunk = await _run(body.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        body.close()
+
+
+def stream_object_to_file(
+    key: str,
+    path: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = 1024 * 1024,
+    bucket: Optional[str] = None,
+    s3_client=None,
+) -> Tuple[int, str]:
+    """Write an object to `path` chunk by chunk; return (size, hex sha256).
+
+    Raises `ObjectTooLarge` as soon as the object is known to exceed
+    `max_bytes` (from its Content-Length, or while streaming), and
+    `ObjectChecksumMismatch` if the object declares a `sha256` in its
+    metadata (presigned uploads) that its content does not match. The hash
+    is computed while streaming anyway, so this check is free here.
+    """
+    client = s3_client or get_s3_client()
+    response = client.get_object(Bucket=bucket or settings.AWS_S3_BUCKET, Key=key)
+    body = response["Body"]
+    try:
+        length = response.get("ContentLength")
+        if max_bytes is not None and length is not None and length > max_bytes:
+            raise ObjectTooLarge(f"{key} is {length} bytes (limit {max_bytes})")
+
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "wb") as fh:
+            while True:
+                chunk = body.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise ObjectTooLarge(f"{key} exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                fh.write(chunk)
+        sha256 = digest.hexdigest()
+        declared = response.get("Metadata", {}).get("sha256")
+        if declared and declared != sha256:
+            raise ObjectChecksumMismatch(f"{key} does not match its declared sha256")
+        return size, sha256
+    finally:
+        body.close()
+
+
+@asynccontextmanager
+async def download_object(
+    key: str,
+    max_bytes: Optional[int] = None,
+    suffix: str = "",
+    bucket: Optional[str] = None,
+    s3_client=None,
+) -> AsyncIterator[DownloadedObject]:
+    """Stream an object into a private temp dir for the duration of the block.
 
+    The object never sits in memory as a whole, consumers get a real file
+    path (Poppler can read it directly), and the directory is removed on
+    exit, including on errors.
+    """
+    with tempfile.TemporaryDirectory(prefix="s3-") as tmp_dir:
+        path = os.path.join(tmp_dir, f"object{suffix}")
+        size, sha256 = await _run(
+            stream_object_to_file,
+            key,
+            path,
+            max_bytes=max_bytes,
+            bucket=bucket,
+            s3_client=s3_client,
+        )
+        yield DownloadedObject(path=path, size=size, sha256=sha256)
 
-# default module-level client (convenience)
-s3 = get_s3_client()
 
 # default bucket name
 bucket = settings.AWS_S3_BUCKET
@@ -0,0 +1,244 @@
+"""Small byte-value caches with Redis and local-disk backends.
+
+Both backends are async-safe (blocking I/O runs in a thread), apply a TTL,
+count hits/misses and never raise on backend errors: a broken cache just
+behaves like a miss.
+"""
+
+import abc
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class Cache(abc.ABC):
+    """Base class: namespacing, TTL and hit/miss accounting."""
+
+    def __init__(self, namespace: str, ttl_seconds: int):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await asyncio.to_thread(self._lookup, key)
+        except Exception:
+            logger.warning("Cache %s get failed", self.namespace, exc_info=True)
+            value = None
+
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await asyncio.to_thread(self._set, key, value)
+        except Exception:
+            logger.warning("Cache %s set failed", self.namespace, exc_info=True)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        """Drop every entry in this namespace."""
+        await asyncio.to_thread(self._clear)
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        value = self._get(key)
+        self._record(hit=value is not None)
+        return value
+
+    def _record(self, hit: bool) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: bytes) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _clear(self) -> None:
+        ...
+
+
+class NullCache(Cache):
+    """Cache that stores nothing (used when caching is disabled)."""
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def _set(self, key: str, value: bytes) -> None:
+        pass
+
+    def _delete(self, key: str) -> None:
+        pass
+
+    def _clear(self) -> None:
+        pass
+
+
+class RedisCache(Cache):
+    """Shared cache in Redis; eviction is TTL plus the server's maxmemory policy.
+
+    Hit/miss counts are also kept in a Redis hash so they aggregate across
+    worker processes.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, url: Optional[str] = None):
+        super().__init__(namespace, ttl_seconds)
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _record(self, hit: bool) -> None:
+        try:
+            self.client.hincrby(
+                f"cache-stats:{self.namespace}", "hits" if hit else "misses", 1
+            )
+        except Exception:
+            pass
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self._key(key))
+
+    def _set(self, key: str, value: bytes) -> None:
+        self.client.set(self._key(key), value, ex=self.ttl_seconds)
+
+    def _delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def _clear(self) -> None:
+        for cache_key in self.client.scan_iter(match=self._key("*"), count=500):
+            self.client.delete(cache_key)
+
+    def shared_stats(self) -> CacheStats:
+        raw = self.client.hgetall(f"cache-stats:{self.namespace}")
+        return CacheStats(
+            hits=int(raw.get(b"hits", 0)), misses=int(raw.get(b"misses", 0))
+        )
+
+
+class DiskCache(Cache):
+    """Per-host cache in a directory, bounded by TTL and total size (LRU).
+
+    Entry mtimes double as last-access times: hits touch the file, and when
+    the directory grows past `max_bytes` the least recently used entries are
+    removed first.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        max_bytes: int,
+        directory: Optional[str] = None,
+    ):
+        super().__init__(namespace, ttl_seconds)
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(directory or settings.CACHE_DIR, namespace)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as fh:
+                value = fh.read()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+
+    def _set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(value)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def build_cache(
+    namespace: str, backend: str, ttl_seconds: int, max_bytes: int
+) -> Cache:
+    """Create a cache for `backend`: "redis", "disk" or "none"."""
+    if backend == "redis":
+        return RedisCache(namespace, ttl_seconds)
+    if backend == "disk":
+        return DiskCache(namespace, ttl_seconds, max_bytes)
+    if backend == "none":
+        return NullCache(namespace, ttl_seconds)
+    raise ValueError(f"Unknown cache backend: {backend}")
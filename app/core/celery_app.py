@@ -6,4 +6,13 @@ celery_app = Celery(
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
 )
+celery_app.conf.update(
+    # CPU-heavy OCR and I/O-bound stages run on separate worker pools:
+    #   celery -A app.core.celery_app.celery_app worker -Q ocr
+    #   celery -A app.core.celery_app.celery_app worker -Q io
+    task_routes={"upload.ocr_file": {"queue": "ocr"}},
+    task_default_queue="io",
+    # stage tasks are long; don't let one worker hoard queued work
+    worker_prefetch_multiplier=1,
+)
 celery_app.autodiscover_tasks(["app.workers"])
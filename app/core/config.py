@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,10 +10,98 @@ class Settings(BaseSettings):
     REDIS_URL: str
     OPENAI_API_KEY: str
 
+    # LLM: model, in-flight requests per process, shared per-minute quotas
+    # ("redis", "local" or "none") and retries on 429/5xx
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_RATE_LIMIT_BACKEND: str = "redis"
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200_000
+    LLM_MAX_RETRIES: int = 4
+    # completion tokens assumed per request when charging the token bucket
+    LLM_COMPLETION_TOKENS_ESTIMATE: int = 1500
+    # predicted papers stream to clients: how often new text is published to
+    # Redis and committed to the database, and how long the stream is kept
+    PREDICTION_PUBLISH_SECONDS: float = 0.25
+    PREDICTION_PERSIST_SECONDS: float = 2.0
+    PREDICTION_STREAM_TTL_SECONDS: int = 3600
+    # LLM context budgets in LLM_MODEL tokens (see app.services.prompt_budget);
+    # longer text is condensed by map-reduce over chunks of CONTEXT_CHUNK_TOKENS
+    PREDICTION_CONTEXT_TOKENS: int = 6000
+    FLASHCARD_CONTEXT_TOKENS: int = 4000
+    CONTEXT_CHUNK_TOKENS: int = 3000
+    # LLM response cache: "redis", "disk" or "none"
+    LLM_CACHE_BACKEND: str = "redis"
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_MB: int = 256  # disk backend only
+
+    # connection pool per process (each Celery worker process has its own)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION: str
     AWS_S3_BUCKET: str
+    # HTTP connections per shared S3 client (one client per process)
+    S3_MAX_POOL_CONNECTIONS: int = 50
+
+    # direct-to-S3 uploads: size limit per file, multipart part size (S3
+    # minimum is 5 MB) and lifetime of presigned part URLs
+    UPLOAD_MAX_MB: int = 200
+    UPLOAD_PART_SIZE_MB: int = 8
+    UPLOAD_URL_EXPIRES_SECONDS: int = 3600
+
+    # proxied uploads: files uploaded at once per request, threads in the
+    # dedicated S3 pool (shared by all S3 calls), and boto3 multipart
+    # settings per file
+    S3_UPLOAD_CONCURRENCY: int = 4
+    S3_EXECUTOR_WORKERS: int = 16
+    S3_MULTIPART_THRESHOLD_MB: int = 8
+    S3_MULTIPART_CHUNK_MB: int = 8
+    S3_TRANSFER_MAX_CONCURRENCY: int = 4
+
+    # OCR: size of the per-process page pool (1 = run pages inline)
+    OCR_MAX_WORKERS: int = os.cpu_count() or 1
+    # OCR: approximate ceiling for rendered page images held at once
+    OCR_MEMORY_BUDGET_MB: int = 1024
+    # OCR: largest input file workers will download
+    OCR_MAX_INPUT_MB: int = 250
+    # OCR preprocessing: pixel ceiling for page rasters (larger photos are
+    # downscaled; ~A4 at 300 DPI), deskew search range, and pages per pool task
+    OCR_MAX_IMAGE_PIXELS: int = 9_000_000
+    OCR_DESKEW: bool = True
+    OCR_MAX_SKEW_DEGREES: float = 10.0
+    OCR_BATCH_PAGES: int = 1
+    # OCR: render PDF pages at OCR_LOW_DPI and re-render only pages whose
+    # median glyph height is under OCR_MIN_TEXT_HEIGHT_PX (up to OCR_MAX_DPI)
+    OCR_ADAPTIVE_DPI: bool = True
+    OCR_LOW_DPI: int = 200
+    OCR_MAX_DPI: int = 300
+    OCR_MIN_TEXT_HEIGHT_PX: int = 16
+    # OCR quality gate: uploads below this word confidence (0-1) or word
+    # count stop after OCR with status needs_review instead of predicting
+    OCR_MIN_CONFIDENCE: float = 0.6
+    OCR_MIN_WORDS: int = 30
+    # OCR backend: "tesserocr" (warm in-process engines, optional package),
+    # "pytesseract" (a tesseract process per page) or "auto" (tesserocr if
+    # installed)
+    OCR_BACKEND: str = "auto"
+    # OCR: use a PDF's embedded text layer for pages that have one
+    OCR_USE_TEXT_LAYER: bool = True
+    OCR_TEXT_LAYER_MIN_CHARS: int = 40
+    # OCR result cache: "redis", "disk" or "none"
+    OCR_CACHE_BACKEND: str = "redis"
+    OCR_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    OCR_CACHE_MAX_MB: int = 2048  # disk backend only
+
+    # topic catalogue: how often readers re-check the catalogue version, and
+    # an optional shared tier ("redis" or "none") in front of the database
+    TOPIC_CATALOGUE_CHECK_SECONDS: int = 30
+    TOPIC_CATALOGUE_SHARED_CACHE: str = "none"
+
+    # local directory for disk-backed caches
+    CACHE_DIR: str = "/tmp/prepnexa-cache"
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -2,8 +2,11 @@ import asyncio
 
 from app.core.database import engine, Base
 from app.models import (
+    catalogue_version,
+    chunk_summary,
     exam,
     file,
+    file_page,
     predicted_paper,
     processed_text,
     question_topic,
@@ -1,45 +1,656 @@
 from pathlib import Path
+import hashlib
+import math
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 import pytesseract
-import cv2
 import numpy as np
 from PIL import Image
-from pdf2image import convert_from_path, convert_from_bytes
-from typing import Union
+from pdf2image import convert_from_path, pdfinfo_from_path
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 import logging
 
+try:
+    import tesserocr
+except ImportError:  # optional; pages fall back to pytesseract
+    tesserocr = None
+
+from app.core.config import settings
+from app.core.preprocessing import (
+    estimate_text_height,
+    open_image,
+    preprocess_page,
+    to_gray,
+)
+
 logger = logging.getLogger(__name__)
 
+OCR_LANG = "eng"
 TESSERACT_CONFIG = "--oem 3 --psm 6"
+DEFAULT_DPI = 300
+# `Image.info` key carrying the resolution a PDF page was rendered at
+RENDER_DPI_INFO = "ocr_render_dpi"
+# bump whenever preprocessing or page handling changes OCR output; this
+# invalidates cached OCR results (see `ocr_fingerprint`)
+OCR_ENGINE_VERSION = "3"
+
+# A4 at 8.27 x 11.69 inches; used to size render windows against the budget
+_PAGE_INCHES = (8.27, 11.69)
+
+# `image_to_data` row level of single words, and the columns we read
+_WORD_LEVEL = 5
+_DATA_KEYS = ("level", "block_num", "par_num", "line_num", "conf", "text")
+
+# how a page's text was obtained
+PAGE_SOURCE_OCR = "ocr"
+PAGE_SOURCE_TEXT_LAYER = "text_layer"
+
+
+@dataclass
+class PageResult:
+    """OCR output and timing for a single page (1-based `page_number`)."""
+
+    page_number: int
+    text: str
+    seconds: float
+    source: str = PAGE_SOURCE_OCR
+    # render resolution of OCRed PDF pages
+    dpi: Optional[int] = None
+    # mean Tesseract word confidence (0-1, weighted by word length); 1.0
+    # for text-layer pages, None when nothing was recognized
+    confidence: Optional[float] = None
+    word_count: int = 0
+
+
+@dataclass
+class PageText:
+    text: str
+    confidence: Optional[float]
+    word_count: int
+
+
+@dataclass
+class OcrResult:
+    """OCR output for a whole document, pages kept in page order."""
+
+    pages: List[PageResult] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages).strip()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def seconds(self) -> float:
+        """Total OCR time summed over pages (CPU time, not wall clock)."""
+        return sum(page.seconds for page in self.pages)
 
+    @property
+    def page_sources(self) -> List[str]:
+        return [page.source for page in self.pages]
 
-def preprocess_image(image: Image.Image) -> np.ndarray:
+    @property
+    def word_count(self) -> int:
+        return sum(page.word_count for page in self.pages)
+
+    @property
+    def confidence(self) -> Optional[float]:
+        """Page confidences averaged by word count (None if no words)."""
+        scored = [p for p in self.pages if p.confidence is not None and p.word_count]
+        words = sum(page.word_count for page in scored)
+        if not words:
+            return None
+        return sum(page.confidence * page.word_count for page in scored) / words
+
+
+def ocr_fingerprint() -> str:
+    """Short hash of everything besides the input bytes that shapes OCR output."""
+    parts = [
+        OCR_ENGINE_VERSION,
+        ocr_backend(),
+        TESSERACT_CONFIG,
+        str(DEFAULT_DPI),
+        str(settings.OCR_ADAPTIVE_DPI),
+        str(settings.OCR_LOW_DPI),
+        str(settings.OCR_MAX_DPI),
+        str(settings.OCR_MIN_TEXT_HEIGHT_PX),
+        str(settings.OCR_USE_TEXT_LAYER),
+        str(settings.OCR_TEXT_LAYER_MIN_CHARS),
+        str(settings.OCR_MAX_IMAGE_PIXELS),
+        str(settings.OCR_DESKEW),
+        str(settings.OCR_MAX_SKEW_DEGREES),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def preprocess_image(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
     """Preprocess an image to improve OCR accuracy.
 
-    The image is converted to RGB (if needed), then to grayscale and
-    binarized using Otsu's thresholding method.
+    Grayscale, downscaled, border-cropped, deskewed and adaptively
+    binarized; see `app.core.preprocessing`.
     """
-    if image.mode != "RGB":
-        image = image.convert("RGB")
+    return preprocess_page(image)
 
-    img = np.array(image)
-    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-    return gray
 
+def page_text_from_data(data: Dict[str, list]) -> PageText:
+    """Rebuild page text and word confidence from `image_to_data` output.
+
+    Words are joined by spaces, lines by newlines and paragraphs by blank
+    lines, like `image_to_string`. Confidence is the mean word confidence
+    weighted by word length, so stray one-character guesses weigh little.
+    """
+    paragraphs: Dict[Tuple[int, int], Dict[int, List[str]]] = {}
+    weighted = 0.0
+    chars = 0
+    for i, word in enumerate(data.get("text", [])):
+        word = str(word).strip()
+        if data["level"][i] != _WORD_LEVEL or not word:
+            continue
+        paragraph = paragraphs.setdefault(
+            (data["block_num"][i], data["par_num"][i]), {}
+        )
+        paragraph.setdefault(data["line_num"][i], []).append(word)
+        conf = float(data["conf"][i])
+        if conf >= 0:
+            weighted += conf * len(word)
+            chars += len(word)
+
+    text = "\n\n".join(
+        "\n".join(" ".join(words) for words in lines.values())
+        for lines in paragraphs.values()
+    )
+    word_count = sum(
+        len(words) for lines in paragraphs.values() for words in lines.values()
+    )
+    confidence = weighted / chars / 100 if chars else None
+    return PageText(text=text, confidence=confidence, word_count=word_count)
+
+
+_engines = threading.local()
+# set once a tesserocr engine failed to start (e.g. missing tessdata)
+_tesserocr_failed = False
+
+
+def ocr_backend() -> str:
+    """Backend pages are read with: "tesserocr" or "pytesseract".
+
+    `OCR_BACKEND` "auto" prefers tesserocr, which keeps a warm engine per
+    thread and passes page buffers in memory; pytesseract starts a
+    `tesseract` process (and writes a temp image) for every page.
+    """
+    if settings.OCR_BACKEND == "pytesseract":
+        return "pytesseract"
+    if tesserocr is None or _tesserocr_failed:
+        return "pytesseract"
+    return "tesserocr"
+
+
+def _tesserocr_api():
+    """This thread's engine, created (loading the language model) once."""
+    api = getattr(_engines, "api", None)
+    if api is None:
+        # same engine and page segmentation mode as TESSERACT_CONFIG
+        api = tesserocr.PyTessBaseAPI(
+            lang=OCR_LANG,
+            oem=tesserocr.OEM.DEFAULT,
+            psm=tesserocr.PSM.SINGLE_BLOCK,
+        )
+        _engines.api = api
+    return api
+
+
+def _tesserocr_data(processed: np.ndarray) -> Dict[str, list]:
+    """Word rows shaped like `image_to_data` output, read by tesserocr."""
+    RIL = tesserocr.RIL
+    api = _tesserocr_api()
+    height, width = processed.shape
+    pixels = np.ascontiguousarray(processed, dtype=np.uint8)
+    data: Dict[str, list] = {key: [] for key in _DATA_KEYS}
+    try:
+        # raw 8-bit buffer: no encoding, no temp file
+        api.SetImageBytes(pixels.tobytes(), width, height, 1, width)
+        api.Recognize()
+        block = par = line = 0
+        for word in tesserocr.iterate_level(api.GetIterator(), RIL.WORD):
+            if word.IsAtBeginningOf(RIL.BLOCK):
+                block, par, line = block + 1, 0, 0
+            if word.IsAtBeginningOf(RIL.PARA):
+                par, line = par + 1, 0
+            if word.IsAtBeginningOf(RIL.TEXTLINE):
+                line += 1
+            data["level"].append(_WORD_LEVEL)
+            data["block_num"].append(block)
+            data["par_num"].append(par)
+            data["line_num"].append(line)
+            data["conf"].append(word.Confidence(RIL.WORD))
+            data["text"].append(word.GetUTF8Text(RIL.WORD) or "")
+    finally:
+        api.Clear()
+    return data
+
+
+def _pytesseract_data(processed: np.ndarray) -> Dict[str, list]:
+    return pytesseract.image_to_data(
+        processed,
+        lang=OCR_LANG,
+        config=TESSERACT_CONFIG,
+        output_type=pytesseract.Output.DICT,
+    )
+
+
+def read_image(image: Union[Image.Image, np.ndarray]) -> PageText:
+    """OCR a single image: text plus word confidence and count."""
+    global _tesserocr_failed
 
-def extract_text_from_image(image: Image.Image) -> str:
-    """Extract text from a single image using Tesseract OCR."""
     processed = preprocess_image(image)
-    return pytesseract.image_to_string(processed, lang="eng", config=TESSERACT_CONFIG)
+    if ocr_backend() == "tesserocr":
+        try:
+            return page_text_from_data(_tesserocr_data(processed))
+        except RuntimeError:
+            # raised when the engine cannot initialize
+            logger.warning(
+                "tesserocr unavailable; falling back to pytesseract", exc_info=True
+            )
+            _tesserocr_failed = True
+    return page_text_from_data(_pytesseract_data(processed))
+
+
+def extract_text_from_image(image: Union[Image.Image, np.ndarray]) -> str:
+    """Extract text from a single image using Tesseract OCR."""
+    return read_image(image).text
+
+
+def _ocr_page(page_number: int, image: Image.Image) -> PageResult:
+    """OCR one page and time it (preprocessing included)."""
+    started = time.perf_counter()
+    page = read_image(image)
+    return PageResult(
+        page_number=page_number,
+        text=page.text,
+        seconds=time.perf_counter() - started,
+        dpi=getattr(image, "info", {}).get(RENDER_DPI_INFO),
+        confidence=page.confidence,
+        word_count=page.word_count,
+    )
+
+
+def _ocr_batch(batch: List[Tuple[int, Image.Image]]) -> List[PageResult]:
+    """Pool task: OCR a batch of pages. Must stay module-level (picklable)."""
+    return [_ocr_page(page_number, image) for page_number, image in batch]
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_ocr_executor() -> Optional[Executor]:
+    """Return the process-wide OCR pool, creating it on first use.
+
+    Returns None when `OCR_MAX_WORKERS` is 1 or less, in which case pages are
+    processed inline. Celery prefork children are daemonic and may not start
+    child processes, so there we use threads instead: recognition runs in the
+    `tesseract` subprocess, or in tesserocr with the GIL released, so threads
+    still spread pages over cores. Either way each worker keeps its own warm
+    tesserocr engine across pages.
+    """
+    global _executor
+
+    workers = settings.OCR_MAX_WORKERS
+    if workers <= 1:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            if multiprocessing.current_process().daemon:
+                logger.info("Daemonic process; using %d OCR threads", workers)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="ocr"
+                )
+            else:
+                logger.info("Starting OCR process pool with %d workers", workers)
+                _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+def shutdown_ocr_executor() -> None:
+    """Stop the shared OCR pool (if any); a new one is created on next use."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def estimate_page_bytes(dpi: int, channels: int = 1) -> int:
+    """Approximate in-memory size of one rendered A4 page at `dpi`
+    (pages are rendered in grayscale, one byte per pixel)."""
+    width, height = (int(inches * dpi) for inches in _PAGE_INCHES)
+    return width * height * channels
+
+
+def pages_within_budget(dpi: int) -> int:
+    """How many rendered pages fit in `OCR_MEMORY_BUDGET_MB` (at least 1)."""
+    budget = settings.OCR_MEMORY_BUDGET_MB * 1024 * 1024
+    return max(1, budget // estimate_page_bytes(dpi))
+
+
+def iter_ocr_pages(
+    pages: Iterable[Tuple[int, Image.Image]], max_in_flight: Optional[int] = None
+) -> Iterator[PageResult]:
+    """OCR `(page_number, image)` pairs on the shared pool, in input order.
+
+    `pages` is consumed lazily: at most `max_in_flight` pages are queued on
+    the pool at once, so a generator of rendered pages is never materialized
+    in full. Each image is dropped as soon as it has been handed to the pool.
+    Pages are submitted `OCR_BATCH_PAGES` at a time, which saves per-task
+    overhead when there are many small pages (e.g. photos).
+    """
+    executor = get_ocr_executor()
+
+    if executor is None:
+        for page_number, image in pages:
+            yield _ocr_page(page_number, image)
+            del image
+        return
+
+    batch_size = max(1, settings.OCR_BATCH_PAGES)
+    limit = max(1, (max_in_flight or settings.OCR_MAX_WORKERS * 2) // batch_size)
+    pending = deque()
+    batch: List[Tuple[int, Image.Image]] = []
+    try:
+        for page in pages:
+            batch.append(page)
+            if len(batch) < batch_size:
+                continue
+            pending.append(executor.submit(_ocr_batch, batch))
+            batch = []
+            if len(pending) >= limit:
+                yield from pending.popleft().result()
+        if batch:
+            pending.append(executor.submit(_ocr_batch, batch))
+            batch = []
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def ocr_images(
+    images: Iterable[Image.Image], max_in_flight: Optional[int] = None
+) -> OcrResult:
+    """OCR a sequence of page images and collect the ordered result."""
+    started = time.perf_counter()
+    numbered = enumerate(images, start=1)
+    result = OcrResult(pages=list(iter_ocr_pages(numbered, max_in_flight)))
+    logger.info(
+        "OCR finished: %d pages in %.2fs wall (%.2fs page time, slowest %.2fs)",
+        result.page_count,
+        time.perf_counter() - started,
+        result.seconds,
+        max((page.seconds for page in result.pages), default=0.0),
+    )
+    return result
+
+
+@contextmanager
+def pdf_path(source: Union[str, bytes]) -> Iterator[str]:
+    """Yield a filesystem path for `source`, spilling bytes to a temp file.
+
+    Poppler reads from a path anyway (pdf2image's `*_from_bytes` helpers
+    write a temp file per call), so writing once lets windowed rendering
+    reuse the same file.
+    """
+    if not isinstance(source, (bytes, bytearray)):
+        yield str(source)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="ocr-") as tmp_dir:
+        path = os.path.join(tmp_dir, "source.pdf")
+        with open(path, "wb") as fh:
+            fh.write(source)
+        yield path
+
+
+def get_pdf_page_count(path: str) -> int:
+    return int(pdfinfo_from_path(path)["Pages"])
+
+
+def extract_text_layer(path: str, page_count: int) -> List[str]:
+    """Return the embedded text of every page (empty strings if unavailable).
+
+    Uses a single `pdftotext` run (Poppler), which separates pages with form
+    feeds. Scanned pages simply come back empty.
+    """
+    try:
+        proc = subprocess.run(
+            ["pdftotext", "-enc", "UTF-8", path, "-"],
+            capture_output=True,
+            check=True,
+            timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError):
+        logger.warning("pdftotext failed for %s; OCRing every page", path)
+        return [""] * page_count
+
+    texts = proc.stdout.decode("utf-8", errors="replace").split("\f")
+    texts = texts[:page_count]
+    return texts + [""] * (page_count - len(texts))
+
+
+def has_usable_text(text: str) -> bool:
+    """Whether an embedded text layer is good enough to skip OCR.
+
+    Requires a minimum amount of alphanumeric content and rejects the
+    replacement-character soup produced by fonts without a Unicode map.
+    """
+    stripped = "".join(text.split())
+    if len(stripped) < settings.OCR_TEXT_LAYER_MIN_CHARS:
+        return False
+
+    alnum = sum(ch.isalnum() for ch in stripped)
+    garbage = stripped.count("\ufffd") + stripped.count("(cid:")
+    return alnum / len(stripped) >= 0.5 and garbage / len(stripped) < 0.05
+
+
+def _page_windows(page_numbers: Sequence[int], window: int) -> Iterator[Tuple[int, int]]:
+    """Split sorted page numbers into contiguous (first, last) runs of <= window."""
+    first = last = None
+    for number in page_numbers:
+        if first is not None and number == last + 1 and number - first < window:
+            last = number
+            continue
+        if first is not None:
+            yield first, last
+        first = last = number
+    if first is not None:
+        yield first, last
+
+
+def _render_pages(path: str, dpi: int, first: int, last: int) -> List[Image.Image]:
+    try:
+        # grayscale: a third of the memory and no RGB -> gray conversion
+        pages = convert_from_path(
+            path, dpi=dpi, first_page=first, last_page=last, grayscale=True
+        )
+    except Exception:
+        logger.exception("Failed to render PDF pages %d-%d: %s", first, last, path)
+        raise
+    for page in pages:
+        page.info[RENDER_DPI_INFO] = dpi
+    return pages
+
+
+def iter_pdf_pages(
+    path: str,
+    dpi: int = DEFAULT_DPI,
+    window: Optional[int] = None,
+    page_numbers: Optional[Sequence[int]] = None,
+) -> Iterator[Tuple[int, Image.Image]]:
+    """Render a PDF lazily as `(page_number, image)`, `window` pages per call.
+
+    Only one window of rendered pages is held here at a time and each page is
+    released once the consumer moves on. `page_numbers` limits rendering to
+    the given (1-based) pages.
+    """
+    if page_numbers is None:
+        page_numbers = range(1, get_pdf_page_count(path) + 1)
+    window = max(1, window or pages_within_budget(dpi) // 2)
+
+    for first, last in _page_windows(sorted(page_numbers), window):
+        batch = _render_pages(path, dpi, first, last)
+        batch.reverse()
+        page_number = first
+        while batch:
+            yield page_number, batch.pop()
+            page_number += 1
+
+
+def choose_dpi(image: Image.Image, dpi: int) -> int:
+    """Resolution at which `image` (rendered at `dpi`) has readable text.
+
+    Returns `dpi` when the median glyph height already reaches
+    `OCR_MIN_TEXT_HEIGHT_PX` (or the page has no text), otherwise the
+    scaled-up resolution, rounded up to 50 and capped at `OCR_MAX_DPI`.
+    """
+    height = estimate_text_height(to_gray(image))
+    if height is None or height >= settings.OCR_MIN_TEXT_HEIGHT_PX:
+        return dpi
+    wanted = dpi * settings.OCR_MIN_TEXT_HEIGHT_PX / height
+    return max(dpi, min(settings.OCR_MAX_DPI, math.ceil(wanted / 50) * 50))
+
+
+def iter_adaptive_pdf_pages(
+    path: str,
+    window: Optional[int] = None,
+    page_numbers: Optional[Sequence[int]] = None,
+) -> Iterator[Tuple[int, Image.Image]]:
+    """Like `iter_pdf_pages`, rendering at `OCR_LOW_DPI` first.
+
+    Pages whose text comes out too small are rendered again, one at a
+    time, at the resolution `choose_dpi` picks; the rest are OCRed at the
+    low resolution. Each image records its DPI under `RENDER_DPI_INFO`.
+    """
+    low = settings.OCR_LOW_DPI
+    rerendered = 0
+    for page_number, image in iter_pdf_pages(
+        path, dpi=low, window=window, page_numbers=page_numbers
+    ):
+        dpi = choose_dpi(image, low)
+        if dpi > low:
+            rerendered += 1
+            image = _render_pages(path, dpi, page_number, page_number)[0]
+        yield page_number, image
+        del image
+    logger.info("Adaptive DPI: %d pages re-rendered above %d DPI", rerendered, low)
+
+
+def iter_ocr_pdf(
+    source: Union[str, bytes],
+    dpi: Optional[int] = None,
+    skip_pages: Collection[int] = (),
+) -> Iterator[PageResult]:
+    """Yield page results for a PDF (path or bytes), OCRing only scanned pages.
+
+    Pages with a usable embedded text layer are taken as-is and yielded
+    first; the rest are rendered in bounded windows and OCRed in parallel,
+    yielded in page order. Pages in `skip_pages` (e.g. restored from a
+    checkpoint) are neither rendered nor yielded. Peak memory stays around
+    `OCR_MEMORY_BUDGET_MB`: half the budget goes to the render window, the
+    rest to pages queued on the OCR pool.
+
+    Without an explicit `dpi`, pages are rendered adaptively (see
+    `iter_adaptive_pdf_pages`) when `OCR_ADAPTIVE_DPI` is on, else at
+    `DEFAULT_DPI`.
+
+    Note: requires Poppler installed for rendering.
+    """
+    adaptive = dpi is None and settings.OCR_ADAPTIVE_DPI
+    dpi = dpi or DEFAULT_DPI
+    # size the render window for the first pass, the queue for the largest
+    # pages it may hold
+    render_dpi = settings.OCR_LOW_DPI if adaptive else dpi
+    peak_dpi = settings.OCR_MAX_DPI if adaptive else dpi
+    window = max(1, pages_within_budget(render_dpi) // 2)
+    max_in_flight = max(1, pages_within_budget(peak_dpi) // 2)
+
+    with pdf_path(source) as path:
+        total = get_pdf_page_count(path)
+        todo = [n for n in range(1, total + 1) if n not in skip_pages]
+        if not todo:
+            return
+
+        scanned = todo
+        if settings.OCR_USE_TEXT_LAYER:
+            started = time.perf_counter()
+            layer = extract_text_layer(path, total)
+            per_page = (time.perf_counter() - started) / max(1, total)
+            scanned = []
+            for page_number in todo:
+                text = layer[page_number - 1]
+                if not has_usable_text(text):
+                    scanned.append(page_number)
+                    continue
+                yield PageResult(
+                    page_number=page_number,
+                    text=text,
+                    seconds=per_page,
+                    source=PAGE_SOURCE_TEXT_LAYER,
+                    # embedded text is exact
+                    confidence=1.0,
+                    word_count=len(text.split()),
+                )
+
+        logger.info(
+            "PDF has %d pages: %d skipped, %d with text layer, %d to OCR",
+            total,
+            total - len(todo),
+            len(todo) - len(scanned),
+            len(scanned),
+        )
+        if scanned:
+            if adaptive:
+                pages = iter_adaptive_pdf_pages(
+                    path, window=window, page_numbers=scanned
+                )
+            else:
+                pages = iter_pdf_pages(
+                    path, dpi=dpi, window=window, page_numbers=scanned
+                )
+            yield from iter_ocr_pages(pages, max_in_flight=max_in_flight)
+
+
+def ocr_pdf(source: Union[str, bytes], dpi: Optional[int] = None) -> OcrResult:
+    """Extract text from a PDF (path or bytes); see `iter_ocr_pdf`."""
+    pages = sorted(iter_ocr_pdf(source, dpi=dpi), key=lambda page: page.page_number)
+    return OcrResult(pages=pages)
 
 
 def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
     """Extract text from PDF bytes by rendering pages and running OCR."""
-    pages = convert_from_bytes(pdf_bytes, dpi=300)
-    text = ""
-    for page in pages:
-        text += extract_text_from_image(page)
-    return text
+    return ocr_pdf(pdf_bytes).text
 
 
 def extract_text_from_pdf_path(path: str) -> str:
@@ -47,16 +658,7 @@ def extract_text_from_pdf_path(path: str) -> str:
 
     Note: requires Poppler installed for `convert_from_path`.
     """
-    try:
-        pages = convert_from_path(path, dpi=300)
-    except Exception as e:
-        logger.exception("Failed to convert PDF path to images: %s", path)
-        raise
-
-    text = ""
-    for page in pages:
-        text += extract_text_from_image(page)
-    return text
+    return ocr_pdf(path).text
 
 
 def extract_text(source: Union[str, bytes]) -> str:
@@ -75,9 +677,9 @@ def extract_text(source: Union[str, bytes]) -> str:
         return extract_text_from_pdf_path(path)
 
     try:
-        image = Image.open(path)
+        image = open_image(path)
     except Exception:
         logger.exception("Failed to open image: %s", path)
         raise
 
-    return extract_text_from_image(image)
+    return ocr_images([image]).text
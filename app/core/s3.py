@@ -1,13 +1,31 @@
 import asyncio
+import functools
+import os
 import tempfile
+from boto3.s3.transfer import TransferConfig
 from fastapi import UploadFile
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 import logging
 
-from app.core.aws import get_s3_client, s3 as default_s3, bucket as default_bucket
+from app.core.aws import (
+    bucket as default_bucket,
+    get_s3_client,
+    get_s3_executor,
+    stream_object_to_file,
+)
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
+# multipart above the threshold, with parts of each file sent in parallel
+transfer_config = TransferConfig(
+    multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+    multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * MB,
+    max_concurrency=settings.S3_TRANSFER_MAX_CONCURRENCY,
+)
+
 
 def _upload_fileobj_sync(
     file_obj,
@@ -26,12 +44,13 @@ def _upload_fileobj_sync(
     if content_type:
         extra_args["ContentType"] = content_type
 
-    client = s3_client or default_s3
+    client = s3_client or get_s3_client()
     client.upload_fileobj(
         file_obj,
         bucket,
         key,
         ExtraArgs=extra_args,
+        Config=transfer_config,
     )
 
 
@@ -50,7 +69,7 @@ async def upload_file_to_s3(
     b = bucket or default_bucket
     try:
         await loop.run_in_executor(
-            None,
+            get_s3_executor(),
             _upload_fileobj_sync,
             file.file,
             b,
@@ -65,6 +84,55 @@ async def upload_file_to_s3(
     return s3_key
 
 
+async def upload_files_to_s3(
+    uploads: Sequence[Tuple[UploadFile, str]],
+    bucket: Optional[str] = None,
+    s3_client=None,
+    max_concurrency: Optional[int] = None,
+) -> List[str]:
+    """
+    Uploads (file, s3_key) pairs concurrently, at most `max_concurrency`
+    (default `S3_UPLOAD_CONCURRENCY`) at a time.
+
+    All-or-nothing: if any file fails, the remaining uploads are awaited and
+    every object that was (or may have been partially) written is deleted
+    before the first error is re-raised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or settings.S3_UPLOAD_CONCURRENCY)
+
+    async def _upload(file: UploadFile, s3_key: str) -> str:
+        async with semaphore:
+            return await upload_file_to_s3(
+                file, s3_key, bucket=bucket, s3_client=s3_client
+            )
+
+    results = await asyncio.gather(
+        *(_upload(file, key) for file, key in uploads), return_exceptions=True
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        await delete_objects_from_s3(
+            [key for _, key in uploads], bucket=bucket, s3_client=s3_client
+        )
+        raise errors[0]
+    return results
+
+
+async def delete_objects_from_s3(
+    s3_keys: Sequence[str], bucket: Optional[str] = None, s3_client=None
+) -> None:
+    """Best-effort delete of `s3_keys` (missing keys are not an error)."""
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                get_s3_executor(), delete_object, key, bucket, s3_client
+            )
+            for key in s3_keys
+        )
+    )
+
+
 def upload_bytesio_to_s3(
     file_obj,
     s3_key: str,
@@ -82,12 +150,13 @@ def upload_bytesio_to_s3(
         except Exception:
             pass
 
-        client = s3_client or default_s3
+        client = s3_client or get_s3_client()
         client.upload_fileobj(
             file_obj,
             b,
             s3_key,
             ExtraArgs={"ContentType": content_type},
+            Config=transfer_config,
         )
     except Exception:
         logger.exception("Failed to upload bytes to S3: %s", s3_key)
@@ -96,39 +165,110 @@ def upload_bytesio_to_s3(
     return s3_key
 
 
-def _download_fileobj_sync(
-    bucket: str,
-    key: str,
-    local_path: str,
+async def download_file_from_s3(
+    s3_key: str,
+    bucket: Optional[str] = None,
     s3_client=None,
-):
-    client = s3_client or default_s3
-    with open(local_path, "wb") as f:
-        client.download_fileobj(bucket, key, f)
-
+    max_bytes: Optional[int] = None,
+) -> str:
+    """
+    Streams an S3 object to a new temp file and returns its path.
 
-async def download_file_from_s3(
-    s3_key: str, bucket: Optional[str] = None, s3_client=None
-):
+    The caller owns the file and must delete it; prefer
+    `app.core.aws.download_object`, which cleans up automatically.
+    """
     loop = asyncio.get_running_loop()
 
-    tmp_file = tempfile.NamedTemporaryFile(delete=False)
-    tmp_path = tmp_file.name
-    tmp_file.close()
-
-    b = bucket or default_bucket
+    fd, tmp_path = tempfile.mkstemp(prefix="s3-")
+    os.close(fd)
 
     try:
         await loop.run_in_executor(
-            None,
-            _download_fileobj_sync,
-            b,
-            s3_key,
-            tmp_path,
-            s3_client,
+            get_s3_executor(),
+            functools.partial(
+                stream_object_to_file,
+                s3_key,
+                tmp_path,
+                max_bytes=max_bytes,
+                bucket=bucket or default_bucket,
+                s3_client=s3_client,
+            ),
         )
     except Exception:
         logger.exception("Failed to download S3 object %s", s3_key)
+        os.remove(tmp_path)
         raise
 
     return tmp_path
+
+
+def create_presigned_multipart_upload(
+    s3_key: str,
+    part_count: int,
+    content_type: Optional[str] = None,
+    metadata: Optional[dict] = None,
+    expires_in: int = 3600,
+    bucket: Optional[str] = None,
+    s3_client=None,
+) -> Tuple[str, List[str]]:
+    """
+    Starts a multipart upload and presigns a PUT URL for each part.
+
+    Returns (multipart upload id, part URLs ordered by part number).
+    """
+    b = bucket or default_bucket
+    client = s3_client or get_s3_client()
+
+    extra_args = {}
+    if content_type:
+        extra_args["ContentType"] = content_type
+    if metadata:
+        extra_args["Metadata"] = metadata
+
+    response = client.create_multipart_upload(Bucket=b, Key=s3_key, **extra_args)
+    upload_id = response["UploadId"]
+
+    urls = [
+        client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": b,
+                "Key": s3_key,
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+            },
+            ExpiresIn=expires_in,
+        )
+        for part_number in range(1, part_count + 1)
+    ]
+    return upload_id, urls
+
+
+def complete_multipart_upload(
+    s3_key: str,
+    upload_id: str,
+    parts: List[dict],
+    bucket: Optional[str] = None,
+    s3_client=None,
+) -> None:
+    """Completes a multipart upload from [{"PartNumber": n, "ETag": etag}, ...]."""
+    client = s3_client or get_s3_client()
+    client.complete_multipart_upload(
+        Bucket=bucket or default_bucket,
+        Key=s3_key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+    )
+
+
+def head_object(s3_key: str, bucket: Optional[str] = None, s3_client=None) -> dict:
+    client = s3_client or get_s3_client()
+    return client.head_object(Bucket=bucket or default_bucket, Key=s3_key)
+
+
+def delete_object(s3_key: str, bucket: Optional[str] = None, s3_client=None) -> None:
+    client = s3_client or get_s3_client()
+    try:
+        client.delete_object(Bucket=bucket or default_bucket, Key=s3_key)
+    except Exception:
+        logger.warning("Failed to delete S3 object %s", s3_key, exc_info=True)
@@ -3,8 +3,12 @@
 from app.models.user import User
 from app.models.upload import Upload
 from app.models.file import File
+from app.models.file_page import FilePage
 from app.models.processed_text import ProcessedText
+from app.models.chunk_summary import ChunkSummary
 from app.models.exam import Exam, Subject, Topic
+from app.models.catalogue_version import CatalogueVersion
 from app.models.question import Question
 from app.models.question_topic import QuestionTopic
+from app.models.predicted_paper import PredictedPaper
 from app.models.flashcards import Flashcard
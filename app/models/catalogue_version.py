@@ -0,0 +1,67 @@
+from datetime import datetime
+from sqlalchemy import DDL, BigInteger, DateTime, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CatalogueVersion(Base):
+    """Single-row version stamp of the exams/subjects/topics catalogue.
+
+    Bumped by database triggers on every write to those tables (see the
+    alembic migration, or `_install_triggers` for `create_all`), so caches
+    can detect syllabus changes cheaply.
+    """
+
+    __tablename__ = "catalogue_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+CATALOGUE_TABLES = ("exams", "subjects", "topics")
+
+
+def _install_triggers(metadata, connection, **kw) -> None:
+    """Seed row and version triggers for schemas built with `create_all`
+    (`app.core.init_db`); mirrors the catalogue_version migration."""
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(
+        DDL(
+            "INSERT INTO catalogue_version (id, version) VALUES (1, 0) "
+            "ON CONFLICT (id) DO NOTHING"
+        )
+    )
+    connection.execute(
+        DDL(
+            """
+            CREATE OR REPLACE FUNCTION bump_catalogue_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE catalogue_version
+                SET version = version + 1, updated_at = now()
+                WHERE id = 1;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    for table in CATALOGUE_TABLES:
+        connection.execute(
+            DDL(f"DROP TRIGGER IF EXISTS {table}_catalogue_version ON {table}")
+        )
+        connection.execute(
+            DDL(
+                f"""
+                CREATE TRIGGER {table}_catalogue_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_catalogue_version()
+                """
+            )
+        )
+
+
+# after the whole metadata, so the catalogue tables exist
+event.listen(Base.metadata, "after_create", _install_triggers)
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+import uuid
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+
+class ChunkSummary(Base):
+    """Condensed form of one chunk of a processed text (map step output)."""
+
+    __tablename__ = "chunk_summaries"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    processed_text_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("processed_texts.id", ondelete="CASCADE"), index=True
+    )
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    # sha256 of the chunk text and summary prompt; a mismatch means stale
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+
+    processed_text = relationship("ProcessedText", back_populates="chunk_summaries")
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "processed_text_id", "chunk_index", name="uq_chunk_summary"
+        ),
+    )
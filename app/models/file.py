@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 import enum
 import uuid
 
-from sqlalchemy import DateTime, String, Integer, ForeignKey, Enum, Text
+from sqlalchemy import DateTime, String, Integer, ForeignKey, Enum, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -30,9 +30,17 @@ class File(Base):
 
     page_count: Mapped[int | None] = mapped_column(Integer)
     extracted_text: Mapped[str | None] = mapped_column(Text)
+    # per page, how its text was obtained: "text_layer" or "ocr"
+    page_sources: Mapped[list[str] | None] = mapped_column(JSON)
 
     upload = relationship("Upload", back_populates="files")
     processed_text = relationship("ProcessedText", back_populates="file", uselist=False)
+    pages = relationship(
+        "FilePage",
+        back_populates="file",
+        cascade="all, delete-orphan",
+        order_by="FilePage.page_number",
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
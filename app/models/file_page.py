@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+import uuid
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.core.database import Base
+
+
+class FilePage(Base):
+    """Checkpoint of one finished page of a file's text extraction."""
+
+    __tablename__ = "file_pages"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    file_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("files.id", ondelete="CASCADE"), index=True
+    )
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    # "text_layer" or "ocr" (see app.core.ocr)
+    source: Mapped[str] = mapped_column(String(20), nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    seconds: Mapped[float | None] = mapped_column(Float)
+    # render resolution of OCRed PDF pages (see app.core.ocr.choose_dpi)
+    dpi: Mapped[int | None] = mapped_column(Integer)
+    # mean Tesseract word confidence, 0-1 (see app.core.ocr.PageResult)
+    confidence: Mapped[float | None] = mapped_column(Float)
+    word_count: Mapped[int | None] = mapped_column(Integer)
+
+    file = relationship("File", back_populates="pages")
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        UniqueConstraint("file_id", "page_number", name="uq_file_page"),
+    )
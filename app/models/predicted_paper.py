@@ -1,11 +1,18 @@
+import enum
 import uuid
-from sqlalchemy import String, Text, ForeignKey
+from sqlalchemy import Enum, String, Text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
 
 
+class PredictedPaperStatus(str, enum.Enum):
+    generating = "generating"  # text is partial and still streaming
+    completed = "completed"
+    failed = "failed"
+
+
 class PredictedPaper(Base):
     __tablename__ = "predicted_papers"
 
@@ -21,7 +28,14 @@ class PredictedPaper(Base):
         UUID(as_uuid=True), ForeignKey("exams.id"), nullable=False
     )
 
-    predicted_text: Mapped[str] = mapped_column(Text, nullable=False)
+    predicted_text: Mapped[str] = mapped_column(Text, nullable=False, default="")
+
+    status: Mapped[PredictedPaperStatus] = mapped_column(
+        Enum(PredictedPaperStatus, name="predicted_paper_status"),
+        nullable=False,
+        default=PredictedPaperStatus.completed,
+        server_default=PredictedPaperStatus.completed.value,
+    )
 
     pdf_s3_key: Mapped[str | None] = mapped_column(String, nullable=True)
 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Float, ForeignKey, Text
+from sqlalchemy import Boolean, Float, ForeignKey, Integer, Text, false
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -18,7 +18,19 @@ class ProcessedText(Base):
     file_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("files.id"), unique=True)
 
     cleaned_text: Mapped[str] = mapped_column(Text)
+    # OCR word confidence (0-1) and word count of the whole file
     confidence: Mapped[float | None] = mapped_column(Float)
+    word_count: Mapped[int | None] = mapped_column(Integer)
+    # set once questions (and topic links) for this text have been stored
+    questions_extracted: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=false()
+    )
 
     file = relationship("File", back_populates="processed_text")
     questions = relationship("Question", back_populates="processed_text")
+    chunk_summaries = relationship(
+        "ChunkSummary",
+        back_populates="processed_text",
+        cascade="all, delete-orphan",
+        order_by="ChunkSummary.chunk_index",
+    )
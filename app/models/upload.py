@@ -14,6 +14,8 @@ class UploadStatus(str, enum.Enum):
     processing = "processing"
     completed = "completed"
     failed = "failed"
+    # OCR text too poor to predict from; stopped before any LLM call
+    needs_review = "needs_review"
 
 
 class Upload(Base):
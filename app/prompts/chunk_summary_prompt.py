@@ -0,0 +1,18 @@
+CHUNK_SUMMARY_PROMPT = """
+You are condensing part of a previous year exam question paper so that a
+new paper can be set from it.
+
+From the EXCERPT below, extract:
+
+- Section headings, instructions and marks per question
+- Every question, shortened but keeping its key terms, numbers and options
+- The topics and concepts the questions cover
+
+Keep the original order. Do not answer the questions and do not add
+anything that is not in the excerpt. Use plain text, one item per line.
+
+EXCERPT ({label}):
+------------------------
+{chunk}
+------------------------
+"""
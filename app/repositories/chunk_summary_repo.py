@@ -0,0 +1,42 @@
+from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models.chunk_summary import ChunkSummary
+
+
+class ChunkSummaryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_for_processed_text(self, processed_text_id) -> Dict[int, ChunkSummary]:
+        stmt = select(ChunkSummary).where(
+            ChunkSummary.processed_text_id == processed_text_id
+        )
+        result = await self.db.execute(stmt)
+        return {row.chunk_index: row for row in result.scalars().all()}
+
+    async def save(
+        self,
+        processed_text_id,
+        chunk_index: int,
+        content_hash: str,
+        summary: str,
+        existing: ChunkSummary | None = None,
+    ) -> ChunkSummary:
+        if existing is not None:
+            existing.content_hash = content_hash
+            existing.summary = summary
+            return existing
+
+        row = ChunkSummary(
+            processed_text_id=processed_text_id,
+            chunk_index=chunk_index,
+            content_hash=content_hash,
+            summary=summary,
+        )
+        self.db.add(row)
+        return row
+
+    async def commit(self) -> None:
+        await self.db.commit()
@@ -0,0 +1,37 @@
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.ocr import PageResult
+from app.models.file_page import FilePage
+
+
+class FilePageRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_for_file(self, file_id) -> List[FilePage]:
+        stmt = (
+            select(FilePage)
+            .where(FilePage.file_id == file_id)
+            .order_by(FilePage.page_number)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def add(self, file_id, page: PageResult) -> FilePage:
+        file_page = FilePage(
+            file_id=file_id,
+            page_number=page.page_number,
+            source=page.source,
+            text=page.text,
+            seconds=page.seconds,
+            dpi=page.dpi,
+            confidence=page.confidence,
+            word_count=page.word_count,
+        )
+        self.db.add(file_page)
+        return file_page
+
+    async def commit(self) -> None:
+        await self.db.commit()
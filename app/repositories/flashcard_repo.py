@@ -1,5 +1,6 @@
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
 from app.models.flashcards import Flashcard
 
@@ -14,3 +15,12 @@ class FlashcardRepository:
         self.db.add(flashcard)
         await self.db.flush()
         return flashcard
+
+    async def exists_for_paper(self, predicted_paper_id) -> bool:
+        stmt = (
+            select(Flashcard.id)
+            .where(Flashcard.predicted_paper_id == predicted_paper_id)
+            .limit(1)
+        )
+        result = await self.db.execute(stmt)
+        return result.first() is not None
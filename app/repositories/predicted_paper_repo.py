@@ -25,6 +25,11 @@ class PredictedPaperRepository:
     async def get(self, paper_id: UUID) -> Optional[PredictedPaper]:
         return await self.db.get(PredictedPaper, paper_id)
 
+    async def get_for_upload(self, upload_id) -> Optional[PredictedPaper]:
+        stmt = select(PredictedPaper).where(PredictedPaper.upload_id == upload_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
     async def list_files_for_upload(self, upload_id) -> List[FileModel]:
         stmt = select(FileModel).where(FileModel.upload_id == upload_id)
         result = await self.db.execute(stmt)
@@ -1,5 +1,6 @@
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
 from app.models.processed_text import ProcessedText
 
@@ -9,12 +10,17 @@ class ProcessedTextRepository:
         self.db = db
 
     async def create(
-        self, file_id: str, cleaned_text: str, confidence: float | None
+        self,
+        file_id: str,
+        cleaned_text: str,
+        confidence: float | None,
+        word_count: int | None = None,
     ) -> ProcessedText:
         processed = ProcessedText(
             file_id=file_id,
             cleaned_text=cleaned_text,
             confidence=confidence,
+            word_count=word_count,
         )
         self.db.add(processed)
         await self.db.flush()
@@ -22,3 +28,8 @@ class ProcessedTextRepository:
 
     async def get(self, processed_text_id: str) -> Optional[ProcessedText]:
         return await self.db.get(ProcessedText, processed_text_id)
+
+    async def get_by_file(self, file_id) -> Optional[ProcessedText]:
+        stmt = select(ProcessedText).where(ProcessedText.file_id == file_id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.question import Question
@@ -30,6 +32,24 @@ class QuestionRepository:
         await self.db.flush()
         return question
 
+    async def list_for_processed_texts(
+        self, processed_text_ids: Sequence[UUID]
+    ) -> List[Question]:
+        """Questions extracted from these texts, in paper order."""
+        if not processed_text_ids:
+            return []
+        stmt = (
+            select(Question)
+            .where(Question.processed_text_id.in_(processed_text_ids))
+            .order_by(
+                Question.year,
+                Question.processed_text_id,
+                Question.question_number.nulls_last(),
+            )
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
     async def add_question_topic(
         self, question_id: str, topic_id: str, confidence: float | None
     ):
@@ -40,3 +60,21 @@ class QuestionRepository:
         )
         self.db.add(q_topic)
         return q_topic
+
+    async def bulk_create_questions(self, rows: List[dict]) -> List[UUID]:
+        """Insert many questions in one multi-row INSERT ... RETURNING.
+
+        `rows` are dicts of `Question` column values; returns the new ids in
+        the same order as `rows`.
+        """
+        if not rows:
+            return []
+        stmt = insert(Question).returning(Question.id, sort_by_parameter_order=True)
+        result = await self.db.execute(stmt, rows)
+        return list(result.scalars())
+
+    async def bulk_add_question_topics(self, rows: List[dict]) -> None:
+        """Insert many question-topic links in one multi-row INSERT."""
+        if not rows:
+            return
+        await self.db.execute(insert(QuestionTopic), rows)
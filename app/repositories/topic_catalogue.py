@@ -0,0 +1,187 @@
+"""Process-wide cache of the exams -> subjects -> topics catalogue.
+
+The syllabus rarely changes, so topics are loaded once per exam and served
+from memory. Freshness comes from the `catalogue_version` row, which
+database triggers bump on every write to exams/subjects/topics; readers
+re-check it at most every `TOPIC_CATALOGUE_CHECK_SECONDS` and drop
+everything when it moves. With `TOPIC_CATALOGUE_SHARED_CACHE=redis`, loaded
+exams are also shared between processes (keyed by version).
+
+Without the version row (a database set up some other way), the cache
+degrades to a TTL: everything is dropped every
+`TOPIC_CATALOGUE_CHECK_SECONDS` and nothing is shared.
+"""
+
+import json
+import logging
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheStats, build_cache
+from app.core.config import settings
+from app.models.catalogue_version import CatalogueVersion
+from app.models.exam import Subject, Topic
+
+logger = logging.getLogger(__name__)
+
+# `version` while the database has no catalogue_version row
+_UNVERSIONED = -1
+
+
+@dataclass(frozen=True)
+class CatalogueTopic:
+    """Read-only topic row (safe to share between sessions)."""
+
+    id: uuid.UUID
+    name: str
+    subject_id: uuid.UUID
+    subject_name: str
+
+
+class TopicCatalogue:
+    def __init__(self, check_seconds: int):
+        self.check_seconds = check_seconds
+        self.stats = CacheStats()
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._exams: Dict[str, Tuple[CatalogueTopic, ...]] = {}
+        self._shared = build_cache(
+            "topic-catalogue",
+            backend=settings.TOPIC_CATALOGUE_SHARED_CACHE,
+            ttl_seconds=24 * 3600,
+            max_bytes=0,
+        )
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Drop every cached exam and force a version re-check."""
+        self._exams.clear()
+        self._checked_at = 0.0
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by cached topics."""
+        total = sys.getsizeof(self._exams)
+        for topics in self._exams.values():
+            total += sys.getsizeof(topics)
+            for topic in topics:
+                total += sys.getsizeof(topic) + sys.getsizeof(topic.name)
+                total += sys.getsizeof(topic.subject_name)
+        return total
+
+    async def _refresh_version(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_seconds:
+            return
+
+        result = await db.execute(
+            select(CatalogueVersion.version).where(CatalogueVersion.id == 1)
+        )
+        version = result.scalar_one_or_none()
+        self._checked_at = now
+        if version is None:
+            # nothing will ever bump a missing row: expire instead
+            if self._version != _UNVERSIONED:
+                logger.warning(
+                    "No catalogue_version row; topic cache expires every %ds",
+                    self.check_seconds,
+                )
+            self._exams.clear()
+            self._version = _UNVERSIONED
+            return
+        if version != self._version:
+            if self._version is not None:
+                logger.info(
+                    "Topic catalogue changed (v%s -> v%s); dropping cache",
+                    self._version,
+                    version,
+                )
+            self._exams.clear()
+            self._version = version
+
+    async def topics_for_exam(
+        self, db: AsyncSession, exam_id
+    ) -> Tuple[CatalogueTopic, ...]:
+        """Topics of an exam (with their subject), from cache when current.
+
+        The same tuple object is returned until the catalogue changes, so
+        callers may key derived caches on it.
+        """
+        await self._refresh_version(db)
+        key = str(exam_id)
+
+        topics = self._exams.get(key)
+        if topics is not None:
+            self.stats.hits += 1
+            return topics
+        self.stats.misses += 1
+
+        versioned = self._version != _UNVERSIONED
+        shared_key = f"v{self._version}:{key}"
+        raw = await self._shared.get(shared_key) if versioned else None
+        if raw is not None:
+            topics = tuple(
+                CatalogueTopic(
+                    id=uuid.UUID(t["id"]),
+                    name=t["name"],
+                    subject_id=uuid.UUID(t["subject_id"]),
+                    subject_name=t["subject_name"],
+                )
+                for t in json.loads(raw)
+            )
+        else:
+            topics = await self._load_exam(db, exam_id)
+            if versioned:
+                await self._shared.set(
+                    shared_key,
+                    json.dumps(
+                        [
+                            {
+                                "id": str(t.id),
+                                "name": t.name,
+                                "subject_id": str(t.subject_id),
+                                "subject_name": t.subject_name,
+                            }
+                            for t in topics
+                        ]
+                    ).encode(),
+                )
+
+        self._exams[key] = topics
+        logger.info(
+            "Cached %d topics for exam %s (hit ratio %.2f, ~%d bytes)",
+            len(topics),
+            key,
+            self.stats.hit_ratio,
+            self.memory_bytes(),
+        )
+        return topics
+
+    async def _load_exam(self, db: AsyncSession, exam_id) -> Tuple[CatalogueTopic, ...]:
+        stmt = (
+            select(Topic.id, Topic.name, Subject.id, Subject.name)
+            .join(Subject, Subject.id == Topic.subject_id)
+            .where(Subject.exam_id == exam_id)
+            .order_by(Subject.name, Topic.name)
+        )
+        result = await db.execute(stmt)
+        return tuple(
+            CatalogueTopic(
+                id=topic_id,
+                name=name,
+                subject_id=subject_id,
+                subject_name=subject_name,
+            )
+            for topic_id, name, subject_id, subject_name in result.all()
+        )
+
+
+topic_catalogue = TopicCatalogue(check_seconds=settings.TOPIC_CATALOGUE_CHECK_SECONDS)
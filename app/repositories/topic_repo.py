@@ -1,15 +1,13 @@
-from typing import List
+from typing import Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.models.exam import Topic
+from app.repositories.topic_catalogue import CatalogueTopic, topic_catalogue
 
 
 class TopicRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def list_topics_by_exam(self, exam_id) -> List[Topic]:
-        stmt = select(Topic).where(Topic.subject.has(exam_id=exam_id))
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+    async def list_topics_by_exam(self, exam_id) -> Tuple[CatalogueTopic, ...]:
+        """Topics of an exam, served from the process-wide catalogue cache."""
+        return await topic_catalogue.topics_for_exam(self.db, exam_id)
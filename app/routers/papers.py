@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.dependencies.auth import get_current_user
@@ -27,3 +28,20 @@ async def predicted_paper_detail(
     if not detail:
         raise HTTPException(status_code=404, detail="Prediction not found or forbidden")
     return detail
+
+
+@router.get("/{paper_id}/stream")
+async def stream_predicted_paper(
+    paper_id: str,
+    current_user: User = Depends(get_current_user),
+    service: PredictedPaperService = Depends(get_predicted_paper_service),
+):
+    """Follow a paper as it is generated (server-sent events)."""
+    paper = await service.get_owned(paper_id=paper_id, user_id=current_user.id)
+    if not paper:
+        raise HTTPException(status_code=404, detail="Prediction not found or forbidden")
+    return StreamingResponse(
+        service.stream_events(paper),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,5 @@
-from uuid import uuid4
-from pathlib import Path
-
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
     File,
     Form,
@@ -11,16 +7,22 @@ from fastapi import (
     UploadFile,
     status,
 )
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.s3 import upload_file_to_s3
+from app.core.s3 import delete_objects_from_s3, upload_files_to_s3
 from app.dependencies.auth import get_current_user
 from app.models.file import FileType
-from app.models.file import File as FileModel
 from app.models.user import User
 from app.workers.dispatcher import enqueue_process_upload
-from app.services.upload_service import UploadService
+from app.schemas.upload import (
+    CompleteUploadRequest,
+    PresignUploadRequest,
+    PresignUploadResponse,
+)
+from app.services.upload_service import (
+    UploadService,
+    file_type_for_filename,
+    new_upload_key,
+)
 from app.dependencies.services import get_upload_service
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
@@ -30,32 +32,11 @@ ALLOWED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg"}
 
 
 def detect_file_type(file: UploadFile) -> FileType:
-    """
-    Detect file type using filename extension.
-    Mobile clients often send content-type as application/octet-stream.
-    """
-    if not file.filename:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must have a filename",
-        )
-
-    ext = Path(file.filename).suffix.lower()
-
-    if ext == ".pdf":
-        return FileType.pdf
-    if ext in {".png", ".jpg", ".jpeg"}:
-        return FileType.image
-
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail=f"Unsupported file extension: {ext}",
-    )
+    return file_type_for_filename(file.filename)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_new_upload(
-    background_tasks: BackgroundTasks,
     exam_id: str = Form(...),
     year: int = Form(...),
     files: list[UploadFile] = File(...),
@@ -72,18 +53,26 @@ async def create_new_upload(
     for file in files:
         detect_file_type(file)
 
-    # Build file metadata and upload to S3
-    file_meta = []
-    for file in files:
-        file_type = detect_file_type(file)
-        # generate s3 key placeholder; upload happens here
-        s3_key = f"uploads/{{uuid4()}}_{file.filename}"
-        await upload_file_to_s3(file, s3_key)
-        file_meta.append((file.filename, file_type, s3_key))
-
-    result = await upload_service.create_upload(
-        user_id=current_user.id, exam_id=exam_id, year=year, files=file_meta
-    )
+    # Build file metadata and upload to S3 (concurrently, all-or-nothing)
+    file_meta = [
+        (
+            file.filename,
+            detect_file_type(file),
+            new_upload_key(file.filename, current_user.id),
+        )
+        for file in files
+    ]
+    s3_keys = [s3_key for _, _, s3_key in file_meta]
+    await upload_files_to_s3(list(zip(files, s3_keys)))
+
+    try:
+        result = await upload_service.create_upload(
+            user_id=current_user.id, exam_id=exam_id, year=year, files=file_meta
+        )
+    except Exception:
+        # don't leave orphaned objects behind when the upload isn't recorded
+        await delete_objects_from_s3(s3_keys)
+        raise
 
     # enqueue processing via Celery (with retries)
     enqueue_process_upload(result["upload"].id)
@@ -93,3 +82,39 @@ async def create_new_upload(
         "files_uploaded": len(result["files"]),
         "status": result["upload"].status,
     }
+
+
+@router.post("/presign", response_model=PresignUploadResponse)
+async def presign_upload(
+    body: PresignUploadRequest,
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service),
+):
+    """Issue presigned multipart URLs so clients upload straight to S3."""
+    files = await upload_service.presign_upload(
+        user_id=current_user.id, files=body.files
+    )
+    return {"files": files}
+
+
+@router.post("/complete", status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    body: CompleteUploadRequest,
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service),
+):
+    """Verify presigned uploads, record them and start processing."""
+    result = await upload_service.complete_presigned_upload(
+        user_id=current_user.id,
+        exam_id=body.exam_id,
+        year=body.year,
+        files=body.files,
+    )
+
+    enqueue_process_upload(result["upload"].id)
+
+    return {
+        "upload_id": result["upload"].id,
+        "files_uploaded": len(result["files"]),
+        "status": result["upload"].status,
+    }
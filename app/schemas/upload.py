@@ -0,0 +1,49 @@
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+
+class PresignFile(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+    # hex sha256 of the whole file, checked when the upload is completed
+    sha256: str = Field(pattern=r"^[0-9a-fA-F]{64}$")
+    content_type: str | None = None
+
+
+class PresignUploadRequest(BaseModel):
+    files: list[PresignFile] = Field(min_length=1)
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class PresignedFile(BaseModel):
+    filename: str
+    s3_key: str
+    multipart_upload_id: str
+    part_size: int
+    parts: list[PresignedPart]
+
+
+class PresignUploadResponse(BaseModel):
+    files: list[PresignedFile]
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(ge=1)
+    etag: str
+
+
+class CompletedFile(BaseModel):
+    filename: str
+    s3_key: str
+    multipart_upload_id: str
+    parts: list[CompletedPart] = Field(min_length=1)
+
+
+class CompleteUploadRequest(BaseModel):
+    exam_id: UUID
+    year: int
+    files: list[CompletedFile] = Field(min_length=1)
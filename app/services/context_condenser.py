@@ -0,0 +1,193 @@
+"""Map-reduce condensation of long OCR text into a bounded LLM context.
+
+Text that already fits the budget is passed through untouched. Otherwise it
+is split into token-bounded chunks along paragraph/line boundaries, every
+chunk is summarized concurrently (map), and the summaries are joined and,
+if still too long, condensed again (reduce). Chunk summaries of a
+`ProcessedText` are stored as `ChunkSummary` rows, so predicting again for
+the same files costs no LLM calls for the map step.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from app.core.config import settings
+from app.models.chunk_summary import ChunkSummary
+from app.models.processed_text import ProcessedText
+from app.prompts.chunk_summary_prompt import CHUNK_SUMMARY_PROMPT
+from app.repositories.chunk_summary_repo import ChunkSummaryRepository
+from app.services.llm_client import call_llm
+from app.services.llm_scheduler import LlmPriority
+from app.services.prompt_budget import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# reduce rounds before falling back to truncation
+MAX_REDUCE_DEPTH = 3
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    # a single line longer than a chunk: cut it by size, scaled by how
+    # densely this text tokenizes
+    size = max(1, len(text) * max_tokens // count_tokens(text))
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """Split `text` into chunks of at most ~`max_tokens`, preferring
+    paragraph breaks, then line breaks."""
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            if count_tokens(line) <= max_tokens:
+                pieces.append(line)
+            else:
+                pieces.extend(_hard_split(line, max_tokens))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        tokens = count_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def chunk_hash(chunk: str) -> str:
+    # includes the prompt, so editing it invalidates stored summaries
+    return hashlib.sha256(f"{CHUNK_SUMMARY_PROMPT}\0{chunk}".encode()).hexdigest()
+
+
+async def summarize_chunk(
+    chunk: str, label: str, priority: LlmPriority = LlmPriority.prediction
+) -> str:
+    prompt = CHUNK_SUMMARY_PROMPT.format(label=label, chunk=chunk)
+    # deterministic extraction, so repeated chunks also hit the LLM cache
+    return await call_llm(prompt, priority=priority, temperature=0.0)
+
+
+async def condense_text(
+    text: str,
+    max_tokens: int,
+    priority: LlmPriority = LlmPriority.prediction,
+    depth: int = 0,
+) -> str:
+    """Condense `text` to roughly `max_tokens` (no-op if it already fits)."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if depth >= MAX_REDUCE_DEPTH:
+        logger.warning(
+            "Context still %d tokens after %d reduce rounds; truncating",
+            count_tokens(text),
+            depth,
+        )
+        return truncate_to_tokens(text, max_tokens)
+
+    chunks = split_into_chunks(text, settings.CONTEXT_CHUNK_TOKENS)
+    summaries = await asyncio.gather(
+        *(
+            summarize_chunk(chunk, f"part {i} of {len(chunks)}", priority)
+            for i, chunk in enumerate(chunks, start=1)
+        )
+    )
+    return await condense_text(
+        "\n\n".join(summaries), max_tokens, priority, depth + 1
+    )
+
+
+@dataclass
+class _Chunk:
+    processed_text_id: object
+    index: int
+    text: str
+    label: str
+    stored: Optional[ChunkSummary]
+    summary: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        return chunk_hash(self.text)
+
+
+class ContextCondenser:
+    def __init__(self, repo: ChunkSummaryRepository):
+        self.repo = repo
+
+    async def condense(
+        self, processed_texts: Sequence[ProcessedText], max_tokens: int
+    ) -> str:
+        """Combined context for `processed_texts` within `max_tokens`."""
+        texts = [pt for pt in processed_texts if pt.cleaned_text]
+        combined = "\n\n".join(pt.cleaned_text for pt in texts)
+        if count_tokens(combined) <= max_tokens:
+            return combined
+
+        chunks: List[_Chunk] = []
+        for doc_number, pt in enumerate(texts, start=1):
+            stored = await self.repo.list_for_processed_text(pt.id)
+            parts = split_into_chunks(pt.cleaned_text, settings.CONTEXT_CHUNK_TOKENS)
+            for index, text in enumerate(parts):
+                chunk = _Chunk(
+                    processed_text_id=pt.id,
+                    index=index,
+                    text=text,
+                    label=f"document {doc_number}, part {index + 1} of {len(parts)}",
+                    stored=stored.get(index),
+                )
+                if chunk.stored is not None and chunk.stored.content_hash == chunk.digest:
+                    chunk.summary = chunk.stored.summary
+                chunks.append(chunk)
+
+        # map: summarize, concurrently, every chunk without a current summary
+        missing = [chunk for chunk in chunks if chunk.summary is None]
+        logger.info(
+            "Condensing %d tokens: %d chunks, %d reused",
+            count_tokens(combined),
+            len(chunks),
+            len(chunks) - len(missing),
+        )
+        summaries = await asyncio.gather(
+            *(summarize_chunk(chunk.text, chunk.label) for chunk in missing),
+            return_exceptions=True,
+        )
+        # store every summary that succeeded before surfacing a failure, so
+        # a retry only pays for the chunks that failed
+        errors = []
+        for chunk, summary in zip(missing, summaries):
+            if isinstance(summary, BaseException):
+                errors.append(summary)
+                continue
+            chunk.summary = summary
+            await self.repo.save(
+                chunk.processed_text_id,
+                chunk.index,
+                chunk.digest,
+                summary,
+                existing=chunk.stored,
+            )
+        if len(errors) < len(missing):
+            await self.repo.commit()
+        if errors:
+            logger.warning(
+                "%d of %d chunk summaries failed", len(errors), len(missing)
+            )
+            raise errors[0]
+
+        # reduce: keep document order, condense again if still too long
+        reduced = "\n\n".join(chunk.summary for chunk in chunks)
+        return await condense_text(reduced, max_tokens, depth=1)
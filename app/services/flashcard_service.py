@@ -3,7 +3,10 @@ import logging
 from typing import List
 
 from app.repositories.flashcard_repo import FlashcardRepository
+from app.core.config import settings
+from app.services.context_condenser import condense_text
 from app.services.llm_client import call_llm
+from app.services.llm_scheduler import LlmPriority
 from app.models.flashcards import Flashcard, FlashcardDifficulty
 
 logger = logging.getLogger(__name__)
@@ -29,10 +32,12 @@ class FlashcardService:
             "exam content. Return a JSON array of objects with keys: 'question', 'answer', "
             "and 'difficulty' (one of 'easy','medium','hard'). Only output valid JSON.\n\n"
         ).format(n=max_cards)
-        prompt += text[:15000]
+        prompt += await condense_text(
+            text, settings.FLASHCARD_CONTEXT_TOKENS, priority=LlmPriority.flashcards
+        )
 
         logger.info("Requesting flashcard generation from LLM (max %d)", max_cards)
-        resp = await call_llm(prompt)
+        resp = await call_llm(prompt, priority=LlmPriority.flashcards)
 
         cards = []
         if not resp or not resp.strip():
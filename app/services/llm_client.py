@@ -1,11 +1,22 @@
 """Lightweight OpenAI client wrapper with basic validation and retry.
 
 Keeps a single exported `call_llm(prompt)` coroutine that returns text.
+Requests are queued, rate limited and retried by
+`app.services.llm_scheduler`; responses are cached by prompt. Prompt sizes
+are counted with `app.services.prompt_budget` and the tokens each call
+used are reported to the scheduler's metrics.
 """
 
+import hashlib
+import json
+import unicodedata
+from typing import AsyncIterator, List, Optional
+
 from openai import AsyncOpenAI
+from app.core.cache import build_cache
 from app.core.config import settings
-import asyncio
+from app.services.llm_scheduler import LlmPriority, llm_scheduler
+from app.services.prompt_budget import count_tokens
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,54 +26,179 @@ logger = logging.getLogger(__name__)
 if not getattr(settings, "OPENAI_API_KEY", None):
     raise RuntimeError("OPENAI_API_KEY is not set in settings")
 
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+# retries are handled by the scheduler, not the SDK
+client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+
+SYSTEM_PROMPT = "You are an expert exam paper generator."
+CONTINUE_PROMPT = (
+    "Continue exactly where you stopped. Do not repeat anything you have "
+    "already written."
+)
+
+# (model, temperature, system prompt, prompt hash) -> response text
+llm_cache = build_cache(
+    "llm",
+    backend=settings.LLM_CACHE_BACKEND,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Canonical form for cache keys: NFC, LF line endings, no trailing
+    whitespace. Prompts that differ only in these still hit the same entry."""
+    prompt = unicodedata.normalize("NFC", prompt).replace("\r\n", "\n")
+    return "\n".join(line.rstrip() for line in prompt.split("\n")).strip()
+
+
+def _record_usage(
+    priority: LlmPriority, usage, prompt_tokens: int, text: str
+) -> None:
+    # prefer the API's own count; fall back to the local tokenizer
+    if usage is not None:
+        prompt_tokens = usage.prompt_tokens
+        completion_tokens = usage.completion_tokens
+    else:
+        completion_tokens = count_tokens(text)
+    llm_scheduler.record_usage(priority, prompt_tokens, completion_tokens)
+
+
+def llm_cache_key(
+    prompt: str, model: str, temperature: float, system_prompt: str
+) -> str:
+    prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+    params = json.dumps(
+        [model, temperature, system_prompt], ensure_ascii=False
+    ).encode()
+    return f"{hashlib.sha256(params).hexdigest()[:16]}:{prompt_hash}"
 
 
-async def call_llm(prompt: str, *, retries: int = 2, timeout: float = 30.0) -> str:
-    """Call the LLM with simple retry/backoff and return the assistant text.
+async def call_llm(
+    prompt: str,
+    *,
+    priority: LlmPriority = LlmPriority.default,
+    retries: Optional[int] = None,
+    timeout: float = 30.0,
+    temperature: float = 0.7,
+    use_cache: bool = True,
+) -> str:
+    """Call the LLM through the scheduler and return the assistant text.
 
     Args:
         prompt: the prompt string
-        retries: number of retry attempts on transient errors
-        timeout: overall request timeout in seconds (best-effort)
+        priority: scheduling class; lower values are served first
+        retries: retry attempts on transient errors (default `LLM_MAX_RETRIES`)
+        timeout: per-attempt request timeout in seconds
+        temperature: sampling temperature
+        use_cache: serve/store the response from the LLM cache
     """
-    backoff = 1.0
-    last_exc = None
-    for attempt in range(retries + 1):
-        try:
-            # use the AsyncOpenAI client; shape may vary by SDK version
-            response = await asyncio.wait_for(
-                client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert exam paper generator.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=0.7,
-                ),
-                timeout=timeout,
+    key = llm_cache_key(prompt, settings.LLM_MODEL, temperature, SYSTEM_PROMPT)
+    if use_cache:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            logger.info(
+                "LLM cache hit (hit ratio %.2f)", llm_cache.stats.hit_ratio
             )
+            return cached.decode()
 
-            # sanitize and return text
-            return response.choices[0].message.content
+    async def _request():
+        return await client.chat.completions.create(
+            model=settings.LLM_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=temperature,
+        )
 
-        except asyncio.TimeoutError as e:
-            last_exc = e
-            logger.warning(
-                "LLM call timed out, attempt %d/%d", attempt + 1, retries + 1
-            )
-        except Exception as e:
-            last_exc = e
-            logger.exception(
-                "LLM call failed on attempt %d/%d", attempt + 1, retries + 1
+    prompt_tokens = count_tokens(SYSTEM_PROMPT) + count_tokens(prompt)
+    response = await llm_scheduler.submit(
+        _request,
+        priority=priority,
+        tokens=prompt_tokens + settings.LLM_COMPLETION_TOKENS_ESTIMATE,
+        timeout=timeout,
+        retries=retries,
+    )
+    text = response.choices[0].message.content
+    _record_usage(priority, response.usage, prompt_tokens, text or "")
+
+    # empty/refused completions are not worth replaying
+    if use_cache and text and text.strip():
+        await llm_cache.set(key, text.encode())
+    return text
+
+
+async def stream_llm(
+    prompt: str,
+    *,
+    priority: LlmPriority = LlmPriority.default,
+    retries: Optional[int] = None,
+    idle_timeout: float = 30.0,
+    temperature: float = 0.7,
+    use_cache: bool = True,
+    continue_from: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Stream the assistant text for `prompt` as it is generated.
+
+    `idle_timeout` bounds the gap between deltas rather than the whole
+    completion. With `continue_from` (partial output of an interrupted
+    run) the model is asked to carry on after it instead of starting over;
+    such continuations bypass the cache. A cached response is yielded as a
+    single delta.
+    """
+    cacheable = use_cache and not continue_from
+    key = llm_cache_key(prompt, settings.LLM_MODEL, temperature, SYSTEM_PROMPT)
+    if cacheable:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            logger.info(
+                "LLM cache hit (hit ratio %.2f)", llm_cache.stats.hit_ratio
             )
+            yield cached.decode()
+            return
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    if continue_from:
+        messages += [
+            {"role": "assistant", "content": continue_from},
+            {"role": "user", "content": CONTINUE_PROMPT},
+        ]
+
+    usage = None
+
+    async def _deltas() -> AsyncIterator[str]:
+        nonlocal usage
+        stream = await client.chat.completions.create(
+            model=settings.LLM_MODEL,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            # the last chunk then carries the token usage
+            stream_options={"include_usage": True},
+        )
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
 
-        if attempt < retries:
-            await asyncio.sleep(backoff)
-            backoff *= 2
+    prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+    parts: List[str] = []
+    async for delta in llm_scheduler.stream(
+        _deltas,
+        priority=priority,
+        tokens=prompt_tokens + settings.LLM_COMPLETION_TOKENS_ESTIMATE,
+        idle_timeout=idle_timeout,
+        retries=retries,
+    ):
+        parts.append(delta)
+        yield delta
 
-    # if we get here, all retries failed
-    raise last_exc
+    text = "".join(parts)
+    _record_usage(priority, usage, prompt_tokens, text)
+    if cacheable and text.strip():
+        await llm_cache.set(key, text.encode())
@@ -0,0 +1,504 @@
+"""Scheduling for outbound LLM requests.
+
+Every call goes through one `LlmScheduler` per process, which:
+
+- caps in-flight requests (`LLM_MAX_CONCURRENCY`) and hands free slots to
+  the highest-priority waiter first (prediction ahead of flashcards);
+- takes one request and the estimated tokens from requests/tokens-per-minute
+  buckets, kept in Redis so all API and worker processes share the quota;
+- retries 429/5xx/connection errors, honouring `Retry-After`; a 429 also
+  pauses the shared buckets so other processes stop hitting the limit;
+- records queue wait vs. model latency, and prompt/completion tokens per
+  call (see `record_usage`).
+"""
+
+import abc
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import openai
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LlmPriority(enum.IntEnum):
+    """Lower values are served first."""
+
+    prediction = 0
+    default = 5
+    flashcards = 10
+
+
+@dataclass
+class LlmMetrics:
+    requests: int = 0
+    failures: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    queue_wait_seconds: float = 0.0
+    latency_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    by_priority: Dict[str, int] = field(default_factory=dict)
+    tokens_by_priority: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def avg_queue_wait(self) -> float:
+        return self.queue_wait_seconds / self.requests if self.requests else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.latency_seconds / self.requests if self.requests else 0.0
+
+
+class RateLimiter(abc.ABC):
+    """Requests/tokens-per-minute buckets; `reserve` returns seconds to wait."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until one request and `tokens` fit; return the time waited."""
+        waited = 0.0
+        while True:
+            try:
+                delay = await self.reserve(tokens)
+            except Exception:
+                # a broken limiter must not stop LLM traffic
+                logger.warning("LLM rate limiter unavailable", exc_info=True)
+                return waited
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    @abc.abstractmethod
+    async def reserve(self, tokens: int) -> float:
+        """Take one request and `tokens` if they fit, else return the wait."""
+
+    @abc.abstractmethod
+    async def pause(self, seconds: float) -> None:
+        """Stop handing out capacity for `seconds` (after a 429)."""
+
+
+class NullRateLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(0, 0)
+
+    async def reserve(self, tokens: int) -> float:
+        return 0.0
+
+    async def pause(self, seconds: float) -> None:
+        pass
+
+
+def _bucket_wait(level: float, cost: float, per_minute: int) -> float:
+    return max(0.0, (cost - level) * 60.0 / per_minute)
+
+
+class LocalRateLimiter(RateLimiter):
+    """In-process buckets (single process, or tests)."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        super().__init__(requests_per_minute, tokens_per_minute)
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    async def reserve(self, tokens: int) -> float:
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + elapsed * self.requests_per_minute / 60.0,
+        )
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed * self.tokens_per_minute / 60.0,
+        )
+
+        # a request larger than the whole bucket would otherwise never fit
+        cost = min(tokens, self.tokens_per_minute)
+        wait = max(
+            _bucket_wait(self._requests, 1, self.requests_per_minute),
+            _bucket_wait(self._tokens, cost, self.tokens_per_minute),
+        )
+        if wait == 0:
+            self._requests -= 1
+            self._tokens -= cost
+        return wait
+
+    async def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# KEYS: requests bucket, tokens bucket, pause flag
+# ARGV: requests/min, tokens/min, cost in tokens
+# Returns the wait in milliseconds (0 = reserved). Uses the server clock so
+# processes on different hosts agree.
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local paused = redis.call('PTTL', KEYS[3])
+if paused > 0 then
+  return paused
+end
+
+local function level(key, cap)
+  local v = redis.call('HMGET', key, 'level', 'ts')
+  local lvl = tonumber(v[1]) or cap
+  local ts = tonumber(v[2]) or now
+  return math.min(cap, lvl + (now - ts) * cap / 60000)
+end
+
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+local requests = level(KEYS[1], rpm)
+local tokens = level(KEYS[2], tpm)
+
+local wait = 0
+if requests < 1 then
+  wait = math.max(wait, (1 - requests) * 60000 / rpm)
+end
+if tokens < cost then
+  wait = math.max(wait, (cost - tokens) * 60000 / tpm)
+end
+if wait == 0 then
+  requests = requests - 1
+  tokens = tokens - cost
+end
+
+redis.call('HSET', KEYS[1], 'level', tostring(requests), 'ts', now)
+redis.call('HSET', KEYS[2], 'level', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+redis.call('PEXPIRE', KEYS[2], 120000)
+return math.ceil(wait)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets shared by every process through Redis (atomic Lua script)."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        url: Optional[str] = None,
+        prefix: str = "llm-rate",
+    ):
+        super().__init__(requests_per_minute, tokens_per_minute)
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self._keys = [f"{prefix}:requests", f"{prefix}:tokens", f"{prefix}:paused"]
+        self._script = self.client.register_script(_RESERVE_SCRIPT)
+
+    async def reserve(self, tokens: int) -> float:
+        wait_ms = await asyncio.to_thread(
+            self._script,
+            keys=self._keys,
+            args=[self.requests_per_minute, self.tokens_per_minute, tokens],
+        )
+        return int(wait_ms) / 1000.0
+
+    async def pause(self, seconds: float) -> None:
+        try:
+            await asyncio.to_thread(
+                self.client.set, self._keys[2], 1, px=max(1, int(seconds * 1000))
+            )
+        except Exception:
+            logger.warning("Failed to pause LLM rate limiter", exc_info=True)
+
+
+def build_rate_limiter(backend: str) -> RateLimiter:
+    """Create a limiter for `backend`: "redis", "local" or "none"."""
+    if backend == "redis":
+        return RedisRateLimiter(
+            settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE
+        )
+    if backend == "local":
+        return LocalRateLimiter(
+            settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE
+        )
+    if backend == "none":
+        return NullRateLimiter()
+    raise ValueError(f"Unknown LLM rate limit backend: {backend}")
+
+
+class _PrioritySlots:
+    """Counting semaphore that wakes waiters in priority order (FIFO within
+    a priority)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over just before cancellation
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class RetryableLlmError(Exception):
+    def __init__(self, cause: BaseException, retry_after: Optional[float] = None):
+        super().__init__(str(cause))
+        self.cause = cause
+        self.retry_after = retry_after
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue  # HTTP-date form: fall back to backoff
+    return None
+
+
+def _classify(exc: BaseException) -> Optional[RetryableLlmError]:
+    """Wrap retryable errors; None means the error is permanent."""
+    if isinstance(exc, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return RetryableLlmError(exc)
+    if isinstance(exc, openai.RateLimitError):
+        return RetryableLlmError(exc, _retry_after(exc))
+    if isinstance(exc, openai.APIStatusError) and (
+        exc.status_code >= 500 or exc.status_code in (408, 409)
+    ):
+        return RetryableLlmError(exc, _retry_after(exc))
+    return None
+
+
+class LlmScheduler:
+    def __init__(
+        self,
+        max_concurrency: int,
+        rate_limiter: RateLimiter,
+        max_retries: int = 4,
+        base_backoff: float = 1.0,
+    ):
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.metrics = LlmMetrics()
+        self._slots = _PrioritySlots(max_concurrency)
+
+    def _backoff(self, attempt: int) -> float:
+        return self.base_backoff * (2**attempt) * (0.5 + random.random() / 2)
+
+    async def submit(
+        self,
+        request: Callable[[], Awaitable[T]],
+        *,
+        priority: LlmPriority = LlmPriority.default,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> T:
+        """Run `request()` under the concurrency, rate and retry policy.
+
+        `request` is called once per attempt; `tokens` is the estimated
+        prompt + completion size charged against the tokens-per-minute bucket.
+        """
+        retries = self.max_retries if retries is None else retries
+        priority = LlmPriority(priority)
+
+        for attempt in range(retries + 1):
+            queued_at = time.perf_counter()
+            await self._slots.acquire(priority)
+            try:
+                await self.rate_limiter.acquire(tokens)
+                started = time.perf_counter()
+                queue_wait = started - queued_at
+                try:
+                    result = await asyncio.wait_for(request(), timeout=timeout)
+                except Exception as exc:
+                    error = _classify(exc)
+                    if error is None or attempt == retries:
+                        self.metrics.failures += 1
+                        raise
+                else:
+                    latency = time.perf_counter() - started
+                    self._record(priority, queue_wait, latency)
+                    return result
+            finally:
+                self._slots.release()
+
+            # back off outside the slot so other requests can proceed
+            await self._wait_before_retry(error, attempt, retries)
+
+        raise AssertionError("unreachable")
+
+    async def stream(
+        self,
+        request: Callable[[], AsyncIterator[T]],
+        *,
+        priority: LlmPriority = LlmPriority.default,
+        tokens: int = 0,
+        idle_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> AsyncIterator[T]:
+        """Like `submit`, for a streaming request: yields its items.
+
+        The slot is held until the stream is exhausted or closed.
+        `idle_timeout` bounds the wait for each item (not the whole
+        response), so long completions never time out while tokens keep
+        arriving. Failures are retried only before the first item; after
+        that the caller owns the partial output and the error propagates.
+        """
+        retries = self.max_retries if retries is None else retries
+        priority = LlmPriority(priority)
+
+        for attempt in range(retries + 1):
+            queued_at = time.perf_counter()
+            await self._slots.acquire(priority)
+            yielded = False
+            try:
+                await self.rate_limiter.acquire(tokens)
+                started = time.perf_counter()
+                queue_wait = started - queued_at
+                iterator = request()
+                try:
+                    while True:
+                        try:
+                            item = await asyncio.wait_for(
+                                iterator.__anext__(), timeout=idle_timeout
+                            )
+                        except StopAsyncIteration:
+                            break
+                        yielded = True
+                        yield item
+                except Exception as exc:
+                    error = _classify(exc)
+                    if error is None or yielded or attempt == retries:
+                        self.metrics.failures += 1
+                        raise
+                else:
+                    self._record(priority, queue_wait, time.perf_counter() - started)
+                    return
+                finally:
+                    await iterator.aclose()
+            finally:
+                self._slots.release()
+
+            await self._wait_before_retry(error, attempt, retries)
+
+    async def _wait_before_retry(
+        self, error: RetryableLlmError, attempt: int, retries: int
+    ) -> None:
+        delay = error.retry_after
+        if isinstance(error.cause, openai.RateLimitError):
+            self.metrics.rate_limited += 1
+            delay = delay if delay is not None else self._backoff(attempt)
+            await self.rate_limiter.pause(delay)
+        elif delay is None:
+            delay = self._backoff(attempt)
+        self.metrics.retries += 1
+        logger.warning(
+            "LLM request failed (%s), retry %d/%d in %.2fs",
+            type(error.cause).__name__,
+            attempt + 1,
+            retries,
+            delay,
+        )
+        await asyncio.sleep(delay)
+
+    def _record(self, priority: LlmPriority, queue_wait: float, latency: float) -> None:
+        m = self.metrics
+        m.requests += 1
+        m.queue_wait_seconds += queue_wait
+        m.latency_seconds += latency
+        m.by_priority[priority.name] = m.by_priority.get(priority.name, 0) + 1
+        logger.info(
+            "LLM request (priority=%s) queue_wait=%.2fs latency=%.2fs "
+            "[avg wait %.2fs, avg latency %.2fs over %d]",
+            priority.name,
+            queue_wait,
+            latency,
+            m.avg_queue_wait,
+            m.avg_latency,
+            m.requests,
+        )
+
+    def record_usage(
+        self, priority: LlmPriority, prompt_tokens: int, completion_tokens: int
+    ) -> None:
+        """Account the tokens one call actually used (for throughput/cost)."""
+        priority = LlmPriority(priority)
+        m = self.metrics
+        m.prompt_tokens += prompt_tokens
+        m.completion_tokens += completion_tokens
+        m.tokens_by_priority[priority.name] = (
+            m.tokens_by_priority.get(priority.name, 0)
+            + prompt_tokens
+            + completion_tokens
+        )
+        logger.info(
+            "LLM usage (priority=%s) prompt=%d completion=%d tokens "
+            "[total prompt %d, completion %d]",
+            priority.name,
+            prompt_tokens,
+            completion_tokens,
+            m.prompt_tokens,
+            m.completion_tokens,
+        )
+
+
+llm_scheduler = LlmScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    rate_limiter=build_rate_limiter(settings.LLM_RATE_LIMIT_BACKEND),
+    max_retries=settings.LLM_MAX_RETRIES,
+)
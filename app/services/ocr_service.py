@@ -1,42 +1,167 @@
-import pytesseract
-from pdf2image import convert_from_bytes
-from PIL import Image
-import io
-from typing import Optional
+import asyncio
+import dataclasses
+import json
+import logging
+from pathlib import Path
+from typing import Collection, Iterator, Optional
 
-from app.core.aws import get_s3_client
+from app.core.aws import download_object
+from app.core.cache import build_cache
+from app.core.ocr import (
+    PAGE_SOURCE_OCR,
+    OcrResult,
+    PageResult,
+    iter_ocr_pdf,
+    ocr_fingerprint,
+    ocr_images,
+)
 from app.models.file import File, FileType
+from app.repositories.file_page_repo import FilePageRepository
 from app.core.config import settings
+from app.core.preprocessing import open_image
 
+logger = logging.getLogger(__name__)
 
-async def run_ocr(file: File, s3_client: Optional[object] = None) -> str:
+# content-addressed: sha256(file bytes) + OCR fingerprint -> serialized OcrResult
+ocr_cache = build_cache(
+    "ocr",
+    backend=settings.OCR_CACHE_BACKEND,
+    ttl_seconds=settings.OCR_CACHE_TTL_SECONDS,
+    max_bytes=settings.OCR_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def ocr_cache_key(digest: str) -> str:
+    """Cache key for a file's sha256 under the current OCR configuration.
+
+    Changing `TESSERACT_CONFIG`, preprocessing (`OCR_ENGINE_VERSION`) or the
+    OCR settings changes the fingerprint, so stale entries are never read
+    and age out via TTL/LRU.
+    """
+    return f"{ocr_fingerprint()}:{digest}"
+
+
+async def invalidate_ocr_cache(digest: Optional[str] = None) -> None:
+    """Drop the cached result for one file digest, or the whole OCR cache."""
+    if digest is None:
+        await ocr_cache.clear()
+    else:
+        await ocr_cache.delete(ocr_cache_key(digest))
+
+
+def _dump_result(result: OcrResult) -> bytes:
+    return json.dumps(dataclasses.asdict(result)).encode()
+
+
+def _load_result(raw: bytes) -> OcrResult:
+    data = json.loads(raw)
+    return OcrResult(pages=[PageResult(**page) for page in data["pages"]])
+
+
+def _iter_file_pages(
+    file_type: FileType, path: str, skip_pages: Collection[int]
+) -> Iterator[PageResult]:
+    if file_type == FileType.pdf:
+        yield from iter_ocr_pdf(path, skip_pages=skip_pages)
+
+    elif file_type == FileType.image:
+        if 1 not in skip_pages:
+            with open_image(path) as image:
+                yield from ocr_images([image]).pages
+
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+async def run_ocr(
+    file: File,
+    s3_client: Optional[object] = None,
+    use_cache: bool = True,
+    page_repo: Optional[FilePageRepository] = None,
+) -> OcrResult:
     """
     Runs OCR on a File DB object.
     Supports PDF and Image files.
-    """
 
-    # 1️⃣ Download file bytes from S3
-    client = s3_client or get_s3_client()
-    response = client.get_object(Bucket=settings.AWS_S3_BUCKET, Key=file.s3_key)
+    The file is streamed from S3 to a temp file (bounded by
+    `OCR_MAX_INPUT_MB`) and handed to the renderer by path. Pages are OCRed
+    in parallel by `app.core.ocr`; the work runs in an executor so the event
+    loop stays responsive. Results are cached by
+    content hash, so re-uploads of the same paper skip OCR entirely.
 
-    file_bytes: bytes = response["Body"].read()
+    With a `page_repo`, every finished page is checkpointed as a `FilePage`
+    and pages checkpointed by an earlier (failed) run are not OCRed again.
+    """
 
-    extracted_text = ""
+    # 1️⃣ Stream the file from S3 into a temp dir (removed when done)
+    async with download_object(
+        file.s3_key,
+        max_bytes=settings.OCR_MAX_INPUT_MB * 1024 * 1024,
+        suffix=Path(file.s3_key).suffix.lower(),
+        s3_client=s3_client,
+    ) as source:
+        # 2️⃣ Return the cached result for identical content
+        key = ocr_cache_key(source.sha256)
+        if use_cache:
+            cached = await ocr_cache.get(key)
+            if cached is not None:
+                logger.info(
+                    "OCR cache hit for %s (hit ratio %.2f)",
+                    file.original_filename,
+                    ocr_cache.stats.hit_ratio,
+                )
+                return _load_result(cached)
 
-    # 2️⃣ Handle PDF
-    if file.file_type == FileType.pdf:
-        images = convert_from_bytes(file_bytes)
+        # 3️⃣ Restore checkpointed pages from a previous attempt
+        results = {}
+        if page_repo is not None:
+            for row in await page_repo.list_for_file(file.id):
+                results[row.page_number] = PageResult(
+                    page_number=row.page_number,
+                    text=row.text,
+                    seconds=row.seconds or 0.0,
+                    source=row.source,
+                    dpi=row.dpi,
+                    confidence=row.confidence,
+                    word_count=row.word_count or 0,
+                )
+            if results:
+                logger.info(
+                    "Resuming OCR for %s: %d pages already done",
+                    file.original_filename,
+                    len(results),
+                )
 
-        for image in images:
-            extracted_text += pytesseract.image_to_string(image)
-            extracted_text += "\n"
+        # 4️⃣ Render (PDF) and OCR remaining pages off the event loop, one
+        # page per executor step so each can be checkpointed as soon as it
+        # is done
+        loop = asyncio.get_running_loop()
+        pages = _iter_file_pages(file.file_type, source.path, set(results))
+        try:
+            while True:
+                page = await loop.run_in_executor(None, next, pages, None)
+                if page is None:
+                    break
+                results[page.page_number] = page
+                if page_repo is not None:
+                    await page_repo.add(file.id, page)
+                    # text-layer pages are cheap to redo; commit on OCRed
+                    # pages only
+                    if page.source == PAGE_SOURCE_OCR:
+                        await page_repo.commit()
+        finally:
+            pages.close()
 
-    # 3️⃣ Handle Image
-    elif file.file_type == FileType.image:
-        image = Image.open(io.BytesIO(file_bytes))
-        extracted_text = pytesseract.image_to_string(image)
+    if page_repo is not None:
+        await page_repo.commit()
 
-    else:
-        raise ValueError(f"Unsupported file type: {file.file_type}")
+    result = OcrResult(pages=[results[n] for n in sorted(results)])
+    logger.info(
+        "OCR page timings for %s: %s",
+        file.original_filename,
+        ", ".join(f"p{p.page_number}={p.seconds:.2f}s" for p in result.pages),
+    )
 
-    return extracted_text.strip()
+    if use_cache:
+        await ocr_cache.set(key, _dump_result(result))
+    return result
@@ -1,17 +1,48 @@
+import asyncio
+import json
 import uuid
 import logging
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 from app.repositories.predicted_paper_repo import PredictedPaperRepository
-from app.core.s3 import upload_bytesio_to_s3
+from app.core.aws import put_object_bytes
 from app.prompts.question_paper_prompt import QUESTION_PAPER_PROMPT
-from app.services.llm_client import call_llm
+from app.core.config import settings
+from app.models.predicted_paper import PredictedPaper, PredictedPaperStatus
+from app.services.llm_client import stream_llm
+from app.services.llm_scheduler import LlmPriority
+from app.services.paper_stream import PaperStreamPublisher, iter_paper_events
 from app.services.pdf_generator import generate_question_paper_pdf
 
 logger = logging.getLogger(__name__)
 from app.models.upload import Upload
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _paper_sse(
+    paper_id, status: PredictedPaperStatus, text: str
+) -> AsyncIterator[str]:
+    if status != PredictedPaperStatus.generating:
+        yield _sse("reset", {"text": text})
+        yield _sse(
+            "done" if status == PredictedPaperStatus.completed else "failed", {}
+        )
+        return
+
+    async for item in iter_paper_events(paper_id):
+        if item is None:
+            yield ": keep-alive\n\n"
+            continue
+        event, data = item
+        if event in ("reset", "delta"):
+            yield _sse(event, {"text": data})
+        else:
+            yield _sse(event, {"error": data} if data else {})
+
+
 class PredictedPaperService:
     def __init__(self, repo: PredictedPaperRepository):
         self.repo = repo
@@ -23,12 +54,13 @@ class PredictedPaperService:
                 "id": paper.id,
                 "exam_id": paper.exam_id,
                 "year": upload.year,
+                "status": paper.status,
                 "has_pdf": paper.pdf_s3_key is not None,
             }
             for paper, upload in rows
         ]
 
-    async def get_detail(self, paper_id: str, user_id: str) -> dict:
+    async def get_owned(self, paper_id: str, user_id: str) -> Optional[PredictedPaper]:
         paper = await self.repo.get(paper_id)
         if not paper:
             return None
@@ -37,12 +69,20 @@ class PredictedPaperService:
         upload = await self.repo.db.get(Upload, paper.upload_id)
         if not upload or upload.user_id != user_id:
             return None
+        return paper
 
+    async def get_detail(self, paper_id: str, user_id: str) -> dict:
+        paper = await self.get_owned(paper_id, user_id)
+        if not paper:
+            return None
+
+        upload = await self.repo.db.get(Upload, paper.upload_id)
         files = await self.repo.list_files_for_upload(upload.id)
 
         return {
             "id": paper.id,
             "predicted_text": paper.predicted_text,
+            "status": paper.status,
             "pdf_s3_key": paper.pdf_s3_key,
             "exam_id": paper.exam_id,
             "year": upload.year,
@@ -58,45 +98,127 @@ class PredictedPaperService:
             ],
         }
 
-    async def predict_and_store(self, upload_id: str, exam_id: str, context_text: str):
+    def stream_events(self, paper: PredictedPaper) -> AsyncIterator[str]:
+        """Server-sent events for a paper: its text so far, then live deltas
+        until it completes or fails. Finished papers are sent in one event.
+        """
+        # read the row now: the stream outlives the request's DB session
+        return _paper_sse(paper.id, paper.status, paper.predicted_text)
+
+    async def predict_and_store(
+        self,
+        upload_id: str,
+        exam_id: str,
+        context_text: str,
+        predicted_paper: Optional[PredictedPaper] = None,
+    ) -> PredictedPaper:
         """
-        Run LLM prediction, save PredictedPaper, generate PDF and upload to S3.
+        Stream the LLM prediction into a PredictedPaper (the PDF comes later, from
+        `render_pdf` in `WorkerService.finalize`).
+
+        The paper row is created up front with status `generating`, so
+        clients can follow it on `/predicted-papers/{id}/stream`. Text is
+        published to the paper's Redis stream as it arrives and persisted
+        periodically; if the run fails, the partial text is kept and passing
+        the paper back in resumes generation after it.
         """
         logger.info(f"🧠 Starting prediction for upload_id={upload_id}")
 
         if not context_text.strip():
             raise ValueError("Empty context text for prediction")
 
-        context = context_text[:12000]
-        prompt = QUESTION_PAPER_PROMPT.format(context=context)
+        # callers pack the context into PREDICTION_CONTEXT_TOKENS
+        # (see app.services.prompt_budget)
+        prompt = QUESTION_PAPER_PROMPT.format(context=context_text)
+
+        if predicted_paper is None:
+            predicted_paper = PredictedPaper(
+                upload_id=upload_id,
+                exam_id=exam_id,
+                predicted_text="",
+                status=PredictedPaperStatus.generating,
+            )
+            self.repo.db.add(predicted_paper)
+        else:
+            predicted_paper.status = PredictedPaperStatus.generating
+        await self.repo.db.commit()
 
-        logger.info("📤 Sending prompt to LLM")
-        predicted_text = await call_llm(prompt)
+        partial = predicted_paper.predicted_text or ""
+        if partial:
+            logger.info(f"↩️ Resuming prediction after {len(partial)} chars")
+
+        publisher = PaperStreamPublisher(predicted_paper.id)
+        await publisher.publish("reset", partial)
+
+        parts = [partial]
+        pending = []
+        loop = asyncio.get_running_loop()
+        published_at = persisted_at = loop.time()
+
+        async def _persist() -> None:
+            predicted_paper.predicted_text = "".join(parts)
+            await self.repo.db.commit()
+
+        logger.info("📤 Streaming prompt to LLM")
+        try:
+            async for delta in stream_llm(
+                prompt,
+                priority=LlmPriority.prediction,
+                continue_from=partial or None,
+            ):
+                parts.append(delta)
+                pending.append(delta)
+
+                now = loop.time()
+                if now - published_at >= settings.PREDICTION_PUBLISH_SECONDS:
+                    await publisher.publish("delta", "".join(pending))
+                    pending.clear()
+                    published_at = now
+                if now - persisted_at >= settings.PREDICTION_PERSIST_SECONDS:
+                    await _persist()
+                    persisted_at = now
+        except Exception as exc:
+            await publisher.publish("error", type(exc).__name__)
+            # keep what we have: a retry continues from here
+            try:
+                await self.repo.db.rollback()
+                await _persist()
+            except Exception:
+                logger.exception("Failed to persist partial prediction")
+            raise
+
+        if pending:
+            await publisher.publish("delta", "".join(pending))
+        predicted_paper.status = PredictedPaperStatus.completed
+        await _persist()
+        await publisher.publish("done")
+
+        logger.info(f"✅ Prediction saved (id={predicted_paper.id})")
 
-        # save predicted paper
-        from app.models.predicted_paper import PredictedPaper
+        return predicted_paper
 
-        predicted_paper = PredictedPaper(
-            upload_id=upload_id,
-            exam_id=exam_id,
-            predicted_text=predicted_text,
-        )
-        self.repo.db.add(predicted_paper)
-        await self.repo.db.flush()
+    async def mark_failed(self, predicted_paper: PredictedPaper) -> None:
+        """Give up on a paper that is still generating."""
+        predicted_paper.status = PredictedPaperStatus.failed
+        await self.repo.db.commit()
+        await PaperStreamPublisher(predicted_paper.id).publish("failed")
+
+    async def render_pdf(self, upload_id, predicted_text: str) -> str:
+        """Render a paper as PDF, upload it to S3 and return the key.
 
-        # generate PDF and upload
+        Uses no database state, so it can run concurrently with other work
+        on the session (see `WorkerService.finalize`).
+        """
         logger.info("📝 Generating PDF")
-        pdf_buffer = generate_question_paper_pdf(predicted_text)
+        # ReportLab is synchronous and CPU-bound; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        pdf_buffer = await loop.run_in_executor(
+            None, generate_question_paper_pdf, predicted_text
+        )
 
         s3_key = f"predicted/{upload_id}/{uuid.uuid4()}.pdf"
         logger.info(f"☁️ Uploading PDF to S3 → {s3_key}")
-        upload_bytesio_to_s3(
-            file_obj=pdf_buffer, s3_key=s3_key, content_type="application/pdf"
+        await put_object_bytes(
+            s3_key, pdf_buffer.getvalue(), content_type="application/pdf"
         )
-
-        predicted_paper.pdf_s3_key = s3_key
-        await self.repo.db.commit()
-
-        logger.info(f"✅ Prediction + PDF saved (s3_key={s3_key})")
-
-        return predicted_paper
+        return s3_key
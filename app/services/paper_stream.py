@@ -0,0 +1,78 @@
+"""Live progress of predicted papers over Redis streams.
+
+The worker generating a paper appends events to `predicted-paper:{id}`;
+any API process can replay and follow that stream for an SSE client. The
+database stays the source of truth; the stream only carries progress and
+expires after `PREDICTION_STREAM_TTL_SECONDS`.
+
+Events: `reset` (full text so far, sent when a run starts or resumes),
+`delta` (appended text), `error` (the run failed and may be retried),
+`done` and `failed` (terminal).
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_EVENTS = ("done", "failed")
+
+
+def stream_key(paper_id) -> str:
+    return f"predicted-paper:{paper_id}"
+
+
+class PaperStreamPublisher:
+    """Best-effort publisher: Redis errors are logged, never raised."""
+
+    def __init__(self, paper_id, client: Optional[redis.Redis] = None):
+        self.key = stream_key(paper_id)
+        self.client = client or redis.Redis.from_url(settings.REDIS_URL)
+
+    def _publish(self, event: str, data: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.xadd(self.key, {"event": event, "data": data})
+        pipe.expire(self.key, settings.PREDICTION_STREAM_TTL_SECONDS)
+        pipe.execute()
+
+    async def publish(self, event: str, data: str = "") -> None:
+        try:
+            await asyncio.to_thread(self._publish, event, data)
+        except Exception:
+            logger.warning("Failed to publish %s to %s", event, self.key, exc_info=True)
+
+
+async def iter_paper_events(
+    paper_id, block_ms: int = 15000, client: Optional[aioredis.Redis] = None
+) -> AsyncIterator[Optional[Tuple[str, str]]]:
+    """Replay a paper's stream from the start and follow it.
+
+    Yields `(event, data)` tuples until a terminal event, and `None`
+    whenever `block_ms` passes without news (callers send a keep-alive).
+    """
+    own_client = client is None
+    client = client or aioredis.Redis.from_url(settings.REDIS_URL)
+    key = stream_key(paper_id)
+    last_id = "0"
+    try:
+        while True:
+            response = await client.xread({key: last_id}, block=block_ms, count=100)
+            if not response:
+                yield None
+                continue
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    event = fields[b"event"].decode()
+                    yield event, fields[b"data"].decode()
+                    if event in TERMINAL_EVENTS:
+                        return
+    finally:
+        if own_client:
+            await client.aclose()
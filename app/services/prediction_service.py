@@ -5,7 +5,7 @@ from typing import List
 
 from app.models.question import Question
 from app.models.question_topic import QuestionTopic
-from app.models.exam import Topic
+from app.repositories.topic_catalogue import topic_catalogue
 
 
 class TopicPredictionService:
@@ -26,18 +26,16 @@ class TopicPredictionService:
 
         stmt = (
             select(
-                Topic.id,
-                Topic.name,
+                QuestionTopic.topic_id,
                 Question.year,
                 func.count(Question.id).label("q_count"),
             )
-            .join(QuestionTopic, QuestionTopic.topic_id == Topic.id)
             .join(Question, Question.id == QuestionTopic.question_id)
             .where(
                 Question.exam_id == exam_id,
                 Question.subject_id == subject_id,
             )
-            .group_by(Topic.id, Topic.name, Question.year)
+            .group_by(QuestionTopic.topic_id, Question.year)
         )
 
         result = await self.db.execute(stmt)
@@ -46,12 +44,19 @@ class TopicPredictionService:
         if not rows:
             return []
 
+        # topic names come from the cached catalogue instead of a join
+        topics = await topic_catalogue.topics_for_exam(self.db, exam_id)
+        topic_names = {topic.id: topic.name for topic in topics}
+
         year_min = min(r.year for r in rows)
         topic_scores = defaultdict(float)
 
         for r in rows:
+            name = topic_names.get(r.topic_id)
+            if name is None:
+                continue
             year_weight = r.year - year_min + 1
-            topic_scores[r.name] += r.q_count * year_weight
+            topic_scores[name] += r.q_count * year_weight
 
         total_score = sum(topic_scores.values())
         if total_score == 0:
@@ -0,0 +1,149 @@
+"""Token counting and priority packing for LLM prompts.
+
+Prompt sizes are measured in tokens of `LLM_MODEL`'s tokenizer (tiktoken)
+rather than characters, so a budget means the same thing for English,
+Hindi or maths-heavy text. Without tiktoken, or when its encoding files
+cannot be loaded, counts fall back to a ~4 characters/token estimate.
+
+`pack_context` fills a token budget with named sections in priority
+order (e.g. extracted questions before raw OCR text) and reports how many
+tokens each section got.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # optional; counts fall back to the heuristic
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# used for models tiktoken does not know yet
+DEFAULT_ENCODING = "o200k_base"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose
+    return len(text) // 4 + 1
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        # encodings are downloaded on first use; offline hosts need
+        # TIKTOKEN_CACHE_DIR pre-populated
+        logger.warning(
+            "No tiktoken encoding for %s; estimating tokens from length",
+            model,
+            exc_info=True,
+        )
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens `text` takes for `model` (default `LLM_MODEL`)."""
+    if not text:
+        return 0
+    encoding = _encoding(model or settings.LLM_MODEL)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(
+    text: str, max_tokens: int, model: Optional[str] = None
+) -> str:
+    """The longest prefix of `text` within `max_tokens`."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding(model or settings.LLM_MODEL)
+    if encoding is None:
+        return text[: (max_tokens - 1) * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    # a cut inside a multi-byte character decodes to U+FFFD; drop it
+    return encoding.decode(tokens[:max_tokens]).rstrip("�")
+
+
+@dataclass
+class ContextSection:
+    name: str
+    text: str
+    # lower values are packed first
+    priority: int = 0
+    # cut to the remaining budget instead of dropping it
+    truncatable: bool = True
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    budget: int
+    # tokens used per included section
+    sections: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+def pack_context(
+    sections: Sequence[ContextSection],
+    max_tokens: int,
+    separator: str = "\n\n",
+    model: Optional[str] = None,
+) -> PackedContext:
+    """Join `sections` by priority without exceeding `max_tokens`.
+
+    Sections of equal priority keep their given order. A section that
+    does not fit is truncated to what is left (or dropped if it is not
+    truncatable); lower-priority sections still get any room that remains.
+    """
+    separator_tokens = count_tokens(separator, model)
+    packed = PackedContext(text="", tokens=0, budget=max_tokens)
+    parts: List[str] = []
+
+    for section in sorted(sections, key=lambda s: s.priority):
+        if not section.text.strip():
+            continue
+        overhead = separator_tokens if parts else 0
+        remaining = max_tokens - packed.tokens - overhead
+        text = section.text
+        tokens = count_tokens(text, model)
+        if tokens > remaining:
+            if not section.truncatable or remaining <= 0:
+                packed.dropped.append(section.name)
+                continue
+            text = truncate_to_tokens(text, remaining, model)
+            if not text.strip():
+                packed.dropped.append(section.name)
+                continue
+            tokens = count_tokens(text, model)
+            packed.truncated.append(section.name)
+        parts.append(text)
+        packed.tokens += tokens + overhead
+        packed.sections[section.name] = tokens
+
+    packed.text = separator.join(parts)
+    if packed.truncated or packed.dropped:
+        logger.info(
+            "Packed %d/%d context tokens (truncated: %s, dropped: %s)",
+            packed.tokens,
+            max_tokens,
+            packed.truncated,
+            packed.dropped,
+        )
+    return packed
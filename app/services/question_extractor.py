@@ -1,11 +1,13 @@
 import re
 import logging
+import uuid
 from typing import Optional
 
 from app.models.processed_text import ProcessedText
 from app.models.upload import Upload
 from app.repositories.question_repo import QuestionRepository
 from app.repositories.topic_repo import TopicRepository
+from app.services.topic_matcher import get_topic_matcher
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +15,9 @@ logging.basicConfig(level=logging.INFO)
 # Regex to catch questions like 1. Text, 2) Text etc.
 QUESTION_REGEX = r"(?:^|\n)(\d{1,2}[.)]\s+.*?)(?=\n\d{1,2}[.)]\s+|\Z)"
 
+# TODO: determine proper subject_id for the question; placeholder for now
+PLACEHOLDER_SUBJECT_ID = uuid.UUID("50288f34-0039-4703-a2c0-95a4299a6fe3")
+
 
 class QuestionExtractorService:
     def __init__(self, question_repo: QuestionRepository, topic_repo: TopicRepository):
@@ -33,28 +38,46 @@ class QuestionExtractorService:
 
         logger.info(f"Found {len(matches)} questions in processed text")
 
-        # get topics for this exam once
+        # get topics for this exam once; the compiled matcher is reused
+        # across uploads until the exam's topics change
         topics = await self.topic_repo.list_topics_by_exam(upload.exam_id)
+        matcher = get_topic_matcher(upload.exam_id, topics)
 
+        question_rows = []
         for idx, q_text in enumerate(matches, start=1):
-            q_text_cleaned = q_text.strip()
-
-            # TODO: determine proper subject_id for the question; using None placeholder
-            question = await self.question_repo.create_question(
-                processed_text_id=processed_text.id,
-                exam_id=upload.exam_id,
-                subject_id="50288f34-0039-4703-a2c0-95a4299a6fe3",
-                year=upload.year,
-                question_number=idx,
-                question_text=q_text_cleaned,
+            question_rows.append(
+                {
+                    "processed_text_id": processed_text.id,
+                    "exam_id": upload.exam_id,
+                    "subject_id": PLACEHOLDER_SUBJECT_ID,
+                    "year": upload.year,
+                    "question_number": idx,
+                    "question_text": q_text.strip(),
+                }
             )
 
-            for topic in topics:
-                if topic.name.lower() in q_text_cleaned.lower():
-                    await self.question_repo.add_question_topic(
-                        question_id=question.id, topic_id=topic.id, confidence=1.0
-                    )
-                    logger.info(f"✅ Assigned topic '{topic.name}' to question {idx}")
+        question_ids = await self.question_repo.bulk_create_questions(question_rows)
+
+        topic_rows = []
+        for idx, (question_id, row) in enumerate(
+            zip(question_ids, question_rows), start=1
+        ):
+            topic_ids = matcher.match(row["question_text"])
+            for topic_id in topic_ids:
+                topic_rows.append(
+                    {
+                        "question_id": question_id,
+                        "topic_id": topic_id,
+                        "confidence": 1.0,
+                    }
+                )
+            if topic_ids:
+                logger.info(f"✅ Assigned {len(topic_ids)} topics to question {idx}")
+
+        await self.question_repo.bulk_add_question_topics(topic_rows)
 
         # let caller commit when appropriate
-        logger.info(f"🎯 Extraction staged for processed_text_id={processed_text.id}")
+        logger.info(
+            f"🎯 Extraction staged for processed_text_id={processed_text.id}: "
+            f"{len(question_ids)} questions, {len(topic_rows)} topic links"
+        )
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from app.models.file import File
 from app.repositories.processed_text_repo import ProcessedTextRepository
 
@@ -6,10 +8,23 @@ class TextProcessingService:
     def __init__(self, repo: ProcessedTextRepository):
         self.repo = repo
 
-    async def clean_text(self, file: File, raw_text: str):
-        """Normalize raw OCR text and persist ProcessedText via repository."""
+    async def clean_text(
+        self,
+        file: File,
+        raw_text: str,
+        confidence: Optional[float] = None,
+        word_count: Optional[int] = None,
+    ):
+        """Normalize raw OCR text and persist ProcessedText via repository.
+
+        `confidence` and `word_count` come from the OCR result (see
+        `app.core.ocr.OcrResult`).
+        """
         cleaned = raw_text.replace("\n\n", "\n").strip()
         processed = await self.repo.create(
-            file_id=file.id, cleaned_text=cleaned, confidence=0.9
+            file_id=file.id,
+            cleaned_text=cleaned,
+            confidence=confidence,
+            word_count=word_count,
         )
         return processed
@@ -0,0 +1,150 @@
+"""Multi-pattern topic matching for extracted questions.
+
+Topic names are compiled once per exam into an Aho–Corasick automaton, so
+tagging a question costs one pass over its text regardless of how many
+topics the syllabus has.
+"""
+
+import hashlib
+import logging
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TopicLike(Protocol):
+    id: Hashable
+    name: str
+
+
+def _normalize(text: str) -> str:
+    # case-insensitive, and OCR line breaks/double spaces inside a topic
+    # name ("Newton's\nLaws") still match
+    return " ".join(text.lower().split())
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class TopicMatcher:
+    """Aho–Corasick automaton over normalized topic names.
+
+    Matches are whole-word: "cell" matches "the cell wall" but not
+    "cells" or "excellent".
+    """
+
+    def __init__(self, topics: Iterable[TopicLike]):
+        # trie: per state, char -> next state; outputs are pattern indices
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patterns: List[str] = []
+        self._topic_ids: List[List[Hashable]] = []
+
+        by_pattern: Dict[str, int] = {}
+        for topic in topics:
+            pattern = _normalize(topic.name)
+            if not pattern:
+                continue
+            if pattern not in by_pattern:
+                by_pattern[pattern] = len(self._patterns)
+                self._patterns.append(pattern)
+                self._topic_ids.append([])
+                self._add(pattern, by_pattern[pattern])
+            self._topic_ids[by_pattern[pattern]].append(topic.id)
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def match(self, text: str) -> List[Hashable]:
+        """Return ids of topics whose name occurs in `text`, first match first."""
+        text = _normalize(text)
+        found: Dict[Hashable, None] = {}
+        state = 0
+        for end, ch in enumerate(text, start=1):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+
+            for index in self._out[state]:
+                pattern = self._patterns[index]
+                start = end - len(pattern)
+                if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(pattern[-1]) and end < len(text) and _is_word_char(text[end]):
+                    continue
+                for topic_id in self._topic_ids[index]:
+                    found.setdefault(topic_id, None)
+        return list(found)
+
+
+def _signature(topics: Iterable[TopicLike]) -> str:
+    digest = hashlib.sha256()
+    for topic_id, name in sorted((str(t.id), t.name) for t in topics):
+        digest.update(f"{topic_id}\0{name}\0".encode())
+    return digest.hexdigest()
+
+
+# exam_id -> (topics it was built from, their signature, compiled matcher);
+# lives for the whole process
+_matchers: Dict[Hashable, Tuple[Sequence[TopicLike], str, TopicMatcher]] = {}
+
+
+def get_topic_matcher(exam_id: Hashable, topics: Sequence[TopicLike]) -> TopicMatcher:
+    """Return the compiled matcher for an exam, rebuilding it if topics changed.
+
+    The topic catalogue hands out the same tuple until the syllabus changes,
+    so the common case is an identity check; otherwise topic ids and names
+    are compared by signature.
+    """
+    cached = _matchers.get(exam_id)
+    if cached is not None and cached[0] is topics:
+        return cached[2]
+
+    signature = _signature(topics)
+    if cached is not None and cached[1] == signature:
+        _matchers[exam_id] = (topics, signature, cached[2])
+        return cached[2]
+
+    matcher = TopicMatcher(topics)
+    _matchers[exam_id] = (topics, signature, matcher)
+    logger.info("Compiled topic matcher for exam %s (%d topics)", exam_id, len(matcher))
+    return matcher
+
+
+def invalidate_topic_matchers(exam_id: Optional[Hashable] = None) -> None:
+    """Forget compiled matchers for one exam, or for all exams."""
+    if exam_id is None:
+        _matchers.clear()
+    else:
+        _matchers.pop(exam_id, None)
@@ -1,15 +1,70 @@
-from typing import List
+import asyncio
+import functools
+import logging
+import math
+from pathlib import Path
+from typing import List, Optional
 from uuid import uuid4
 from fastapi import HTTPException, status
 
+from app.core import s3
+from app.core.aws import get_s3_executor
+from app.core.config import settings
 from app.repositories.upload_repo import UploadRepository
 from app.models.upload import Upload, UploadStatus
 from app.models.file import File as FileModel, FileType
+from app.schemas.upload import CompletedFile, PresignFile
+
+logger = logging.getLogger(__name__)
+
+# S3 rejects multipart parts smaller than 5 MB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10_000
+
+
+def file_type_for_filename(filename: Optional[str]) -> FileType:
+    """
+    Detect file type using filename extension.
+    Mobile clients often send content-type as application/octet-stream.
+    """
+    if not filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must have a filename",
+        )
+
+    ext = Path(filename).suffix.lower()
+
+    if ext == ".pdf":
+        return FileType.pdf
+    if ext in {".png", ".jpg", ".jpeg"}:
+        return FileType.image
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Unsupported file extension: {ext}",
+    )
+
+
+def upload_key_prefix(user_id) -> str:
+    return f"uploads/{user_id}/"
+
+
+def new_upload_key(filename: str, user_id) -> str:
+    # keys are namespaced by user, so ownership is known from the key alone
+    return f"{upload_key_prefix(user_id)}{uuid4()}_{Path(filename).name}"
 
 
 class UploadService:
-    def __init__(self, repo: UploadRepository):
+    def __init__(
+        self,
+        repo: UploadRepository,
+        s3_client=None,
+        bucket: Optional[str] = None,
+    ):
         self.repo = repo
+        self.s3_client = s3_client
+        self.bucket = bucket
 
     async def create_upload(self, user_id, exam_id, year, files: List[tuple]) -> dict:
         # files: list of tuples (original_filename, file_type, s3_key)
@@ -43,3 +98,146 @@ class UploadService:
 
     async def get_upload_files(self, upload_id):
         return await self.repo.list_files_for_upload(upload_id)
+
+    async def presign_upload(self, user_id, files: List[PresignFile]) -> List[dict]:
+        """Start one S3 multipart upload per file and presign its part URLs.
+
+        The client PUTs each part straight to S3 and then calls
+        `complete_presigned_upload`; file bytes never pass through the API.
+        The declared size and sha256 are stored as object metadata: the size
+        is verified on completion, the sha256 by the OCR worker, which hashes
+        the file while downloading it anyway.
+        """
+        max_bytes = settings.UPLOAD_MAX_MB * 1024 * 1024
+        for file in files:
+            file_type_for_filename(file.filename)
+            if file.size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                    detail=f"{file.filename} exceeds {settings.UPLOAD_MAX_MB} MB",
+                )
+
+        part_size = max(settings.UPLOAD_PART_SIZE_MB * 1024 * 1024, MIN_PART_SIZE)
+        presigned = []
+        for file in files:
+            # keep within S3's part limit for very large files
+            file_part_size = max(part_size, math.ceil(file.size / MAX_PARTS))
+            part_count = math.ceil(file.size / file_part_size)
+            s3_key = new_upload_key(file.filename, user_id)
+
+            upload_id, urls = await self._s3(
+                s3.create_presigned_multipart_upload,
+                s3_key,
+                part_count,
+                content_type=file.content_type,
+                metadata={
+                    "user-id": str(user_id),
+                    "size": str(file.size),
+                    "sha256": file.sha256.lower(),
+                },
+                expires_in=settings.UPLOAD_URL_EXPIRES_SECONDS,
+            )
+            presigned.append(
+                {
+                    "filename": file.filename,
+                    "s3_key": s3_key,
+                    "multipart_upload_id": upload_id,
+                    "part_size": file_part_size,
+                    "parts": [
+                        {"part_number": n, "url": url}
+                        for n, url in enumerate(urls, start=1)
+                    ],
+                }
+            )
+        return presigned
+
+    async def _s3(self, func, *args, **kwargs):
+        # blocking boto3 calls run on the shared S3 pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_s3_executor(),
+            functools.partial(
+                func, *args, bucket=self.bucket, s3_client=self.s3_client, **kwargs
+            ),
+        )
+
+    async def _head_owned_object(self, user_id, file: CompletedFile) -> dict:
+        head = await self._s3(s3.head_object, file.s3_key)
+        if head.get("Metadata", {}).get("user-id") != str(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Upload {file.s3_key} was not issued to this user",
+            )
+        return head
+
+    def _verify_uploaded_object(self, file: CompletedFile, head: dict) -> None:
+        metadata = head.get("Metadata", {})
+        if str(head["ContentLength"]) != metadata.get("size"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"{file.filename}: uploaded {head['ContentLength']} bytes, "
+                    f"expected {metadata.get('size')}"
+                ),
+            )
+
+    async def complete_presigned_upload(
+        self, user_id, exam_id, year, files: List[CompletedFile]
+    ) -> dict:
+        """Complete the multipart uploads, verify them and record the upload.
+
+        Keys outside the caller's prefix are rejected before anything is
+        completed: S3 ties a multipart upload id to its key, so nobody can
+        finish another user's upload. The caller's objects are deleted if any
+        file fails verification, and nothing is recorded unless every file
+        checks out. Multipart uploads that are never completed are left to
+        the bucket's lifecycle rule.
+        """
+        prefix = upload_key_prefix(user_id)
+        file_meta = []
+        for file in files:
+            file_type = file_type_for_filename(file.filename)
+            if not file.s3_key.startswith(prefix):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"Upload {file.s3_key} was not issued to this user",
+                )
+            file_meta.append((file.filename, file_type, file.s3_key))
+
+        owned = []
+        try:
+            for file in files:
+                try:
+                    await self._s3(
+                        s3.complete_multipart_upload,
+                        file.s3_key,
+                        file.multipart_upload_id,
+                        [
+                            {"PartNumber": part.part_number, "ETag": part.etag}
+                            for part in file.parts
+                        ],
+                    )
+                except Exception:
+                    logger.warning(
+                        "Failed to complete multipart upload %s",
+                        file.s3_key,
+                        exc_info=True,
+                    )
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"{file.filename}: upload could not be completed",
+                    )
+                head = await self._head_owned_object(user_id, file)
+                owned.append(file)
+                self._verify_uploaded_object(file, head)
+        except HTTPException:
+            await s3.delete_objects_from_s3(
+                [file.s3_key for file in owned],
+                bucket=self.bucket,
+                s3_client=self.s3_client,
+            )
+            raise
+
+        return await self.create_upload(
+            user_id=user_id, exam_id=exam_id, year=year, files=file_meta
+        )
@@ -1,12 +1,17 @@
+import asyncio
 import logging
+import time
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import List, Optional
 
 from app.models.upload import Upload, UploadStatus
 from app.models.file import File
+from app.models.predicted_paper import PredictedPaper, PredictedPaperStatus
 from app.models.processed_text import ProcessedText
+from app.models.question import Question
 from app.services.ocr_service import run_ocr
+from app.repositories.file_page_repo import FilePageRepository
 from app.repositories.processed_text_repo import ProcessedTextRepository
 from app.services.text_processing import TextProcessingService
 from app.repositories.question_repo import QuestionRepository
@@ -14,115 +19,329 @@ from app.repositories.topic_repo import TopicRepository
 from app.services.question_extractor import QuestionExtractorService
 from app.repositories.predicted_paper_repo import PredictedPaperRepository
 from app.services.paper_prediction_service import PredictedPaperService
+from app.repositories.chunk_summary_repo import ChunkSummaryRepository
+from app.services.context_condenser import ContextCondenser
+from app.services.prompt_budget import ContextSection, count_tokens, pack_context
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _question_block(questions: List[Question]) -> str:
+    lines = []
+    for question in questions:
+        number = f"Q{question.question_number}. " if question.question_number else ""
+        marks = f" [{question.marks} marks]" if question.marks else ""
+        lines.append(f"{number}{question.question_text.strip()}{marks}")
+    return "\n".join(lines)
+
+
 class WorkerService:
+    """Upload processing, split into stages.
+
+    Each stage commits its own results and skips work that an earlier run
+    already committed, so stages can be retried individually and run as
+    separate Celery tasks (see `app.workers.tasks`):
+
+        start_upload -> ocr_file (per file) -> extract_questions -> predict -> finalize
+    """
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def process_upload(self, upload_id: str) -> None:
-        logger.info(f"🚀 WorkerService started for upload_id={upload_id}")
-
+    async def _load_upload(self, upload_id) -> Upload:
         upload: Optional[Upload] = await self.db.get(Upload, upload_id)
         if not upload:
-            logger.warning(f"❌ Upload not found: {upload_id}")
+            raise LookupError(f"Upload not found: {upload_id}")
+        return upload
+
+    async def _load_files(self, upload_id) -> List[File]:
+        stmt = select(File).where(File.upload_id == upload_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def _load_processed_texts(self, upload_id) -> List[ProcessedText]:
+        stmt = select(ProcessedText).join(File).where(File.upload_id == upload_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def start_upload(self, upload_id) -> List[str]:
+        """Mark the upload as processing and return its file ids."""
+        logger.info(f"🚀 WorkerService started for upload_id={upload_id}")
+
+        upload = await self._load_upload(upload_id)
+        files = await self._load_files(upload_id)
+        if not files:
+            logger.warning(f"❌ No files found for upload {upload_id}")
+            upload.status = UploadStatus.failed
+            await self.db.commit()
+            return []
+
+        upload.status = UploadStatus.processing
+        await self.db.commit()
+        return [str(file.id) for file in files]
+
+    async def ocr_file(self, file_id) -> None:
+        """OCR one file and store its cleaned text (CPU-heavy stage)."""
+        file: Optional[File] = await self.db.get(File, file_id)
+        if not file:
+            raise LookupError(f"File not found: {file_id}")
+
+        processed_repo = ProcessedTextRepository(self.db)
+        if await processed_repo.get_by_file(file.id) is not None:
+            logger.info(f"⏭️ Text already extracted for file: {file.original_filename}")
             return
 
-        try:
-            upload.status = UploadStatus.processing
+        logger.info(f"📷 Running OCR on file: {file.original_filename}")
+        ocr_result = await run_ocr(file, page_repo=FilePageRepository(self.db))
+        raw_text = ocr_result.text
+        file.page_count = ocr_result.page_count
+        file.extracted_text = raw_text
+        file.page_sources = ocr_result.page_sources
+        confidence = ocr_result.confidence
+        logger.info(
+            f"✅ OCR complete for file: {file.original_filename} "
+            f"({ocr_result.page_count} pages, {ocr_result.seconds:.1f}s, "
+            f"{ocr_result.word_count} words, confidence="
+            f"{'n/a' if confidence is None else f'{confidence:.2f}'})"
+        )
+
+        logger.info(f"🧹 Cleaning text for file: {file.original_filename}")
+        text_processing_service = TextProcessingService(processed_repo)
+        await text_processing_service.clean_text(
+            file=file,
+            raw_text=raw_text,
+            confidence=confidence,
+            word_count=ocr_result.word_count,
+        )
+        await self.db.commit()
+        logger.info(f"✅ Text cleaned for file: {file.original_filename}")
+
+    def _review_reason(self, processed_texts: List[ProcessedText]) -> Optional[str]:
+        """Why the upload's OCR text is too poor to use, or None if it is fine.
+
+        Confidence is averaged over files by word count; files OCRed before
+        word counts were recorded are not judged.
+        """
+        judged = [pt for pt in processed_texts if pt.word_count is not None]
+        if not judged:
+            return None
+        # blank or unreadable scans recognize no words (and so have no
+        # confidence); they must still be stopped here
+        words = sum(pt.word_count for pt in judged)
+        if words < settings.OCR_MIN_WORDS:
+            return f"only {words} words recognized"
+        scored = [pt for pt in judged if pt.confidence is not None and pt.word_count]
+        if not scored:
+            return None
+        confidence = sum(pt.confidence * pt.word_count for pt in scored) / sum(
+            pt.word_count for pt in scored
+        )
+        if confidence < settings.OCR_MIN_CONFIDENCE:
+            return f"OCR confidence {confidence:.2f}"
+        return None
+
+    async def extract_questions(self, upload_id) -> None:
+        """Extract questions and topic links from every processed file.
+
+        Uploads whose OCR text is unusable (see `_review_reason`) are marked
+        `needs_review` here, and the later stages skip them.
+        """
+        upload = await self._load_upload(upload_id)
+        if upload.status == UploadStatus.needs_review:
+            logger.info(f"⏭️ Upload {upload_id} is waiting for review")
+            return
+
+        processed_texts = await self._load_processed_texts(upload_id)
+        reason = self._review_reason(processed_texts)
+        if reason is not None:
+            logger.warning(f"🔎 Upload {upload_id} needs review: {reason}")
+            upload.status = UploadStatus.needs_review
             await self.db.commit()
+            return
 
-            # Load files
-            stmt = select(File).where(File.upload_id == upload_id)
-            result = await self.db.execute(stmt)
-            files = result.scalars().all()
-            if not files:
-                logger.warning(f"❌ No files found for upload {upload_id}")
-                upload.status = UploadStatus.failed
-                await self.db.commit()
-                return
+        question_repo = QuestionRepository(self.db)
+        topic_repo = TopicRepository(self.db)
+        extractor = QuestionExtractorService(question_repo, topic_repo)
 
-            # Process each file
-            for idx, file in enumerate(files, start=1):
+        for processed_text in processed_texts:
+            if processed_text.questions_extracted:
                 logger.info(
-                    f"🔍 Processing file {idx}/{len(files)}: {file.original_filename}"
+                    f"⏭️ Questions already extracted for processed_text_id={processed_text.id}"
                 )
+                continue
 
-                logger.info(f"📷 Running OCR on file: {file.original_filename}")
-                raw_text = await run_ocr(file)
-                logger.info(f"✅ OCR complete for file: {file.original_filename}")
+            await extractor.extract_questions(
+                upload=upload, processed_text=processed_text
+            )
+            processed_text.questions_extracted = True
+            await self.db.commit()
 
-                logger.info(f"🧹 Cleaning text for file: {file.original_filename}")
-                processed_repo = ProcessedTextRepository(self.db)
-                text_processing_service = TextProcessingService(processed_repo)
-                processed_text = await text_processing_service.clean_text(
-                    file=file, raw_text=raw_text
-                )
-                logger.info(f"✅ Text cleaned for file: {file.original_filename}")
-                logger.info(
-                    f"❓ Extracting questions for file: {file.original_filename}"
-                )
-                question_repo = QuestionRepository(self.db)
-                topic_repo = TopicRepository(self.db)
-                extractor = QuestionExtractorService(question_repo, topic_repo)
-                await extractor.extract_questions(
-                    upload=upload, processed_text=processed_text
-                )
-                logger.info(
-                    f"✅ Questions extracted for file: {file.original_filename}"
-                )
+    async def predict(self, upload_id) -> Optional[PredictedPaper]:
+        """Generate (or reuse) the predicted paper for the upload."""
+        upload = await self._load_upload(upload_id)
+        if upload.status == UploadStatus.needs_review:
+            logger.info(f"⏭️ Skipping prediction: upload {upload_id} needs review")
+            return None
+        predicted_repo = PredictedPaperRepository(self.db)
 
-            logger.info("📚 Loading processed text for prediction")
+        predicted_paper = await predicted_repo.get_for_upload(upload.id)
+        if (
+            predicted_paper is not None
+            and predicted_paper.status == PredictedPaperStatus.completed
+        ):
+            logger.info(f"⏭️ Reusing predicted paper {predicted_paper.id}")
+            return predicted_paper
 
-            stmt = select(ProcessedText).join(File).where(File.upload_id == upload_id)
-            result = await self.db.execute(stmt)
-            processed_texts = result.scalars().all()
+        logger.info("📚 Loading processed text for prediction")
+        processed_texts = await self._load_processed_texts(upload_id)
+        if not processed_texts:
+            raise RuntimeError("No processed text found for prediction")
 
-            if not processed_texts:
-                raise RuntimeError("No processed text found for prediction")
+        # extracted questions are packed first; the raw text is condensed
+        # into whatever budget they leave (chunk summaries are stored, so
+        # a re-prediction reuses them)
+        budget = settings.PREDICTION_CONTEXT_TOKENS
+        questions = await QuestionRepository(self.db).list_for_processed_texts(
+            [processed_text.id for processed_text in processed_texts]
+        )
+        question_text = _question_block(questions)
+        text_budget = budget - count_tokens(question_text)
+        condensed_text = ""
+        if text_budget > 0:
+            condenser = ContextCondenser(ChunkSummaryRepository(self.db))
+            condensed_text = await condenser.condense(processed_texts, text_budget)
 
-            combined_text = "\n\n".join(
-                pt.cleaned_text for pt in processed_texts if pt.cleaned_text
-            )
+        context = pack_context(
+            [
+                ContextSection("questions", question_text, priority=0),
+                ContextSection("text", condensed_text, priority=1),
+            ],
+            budget,
+        )
+        combined_text = context.text
 
-            logger.info(
-                f"🧠 Running question paper prediction (chars={len(combined_text)})"
-            )
+        logger.info(
+            f"🧠 Running question paper prediction "
+            f"(context tokens={context.tokens}/{budget}, sections={context.sections})"
+        )
+
+        # use repository + service for prediction and persistence
+        predicted_service = PredictedPaperService(predicted_repo)
+        # an interrupted paper is resumed from its partial text
+        return await predicted_service.predict_and_store(
+            upload_id=upload.id,
+            exam_id=upload.exam_id,
+            context_text=combined_text,
+            predicted_paper=predicted_paper,
+        )
 
-            # use repository + service for prediction and persistence
-            predicted_repo = PredictedPaperRepository(self.db)
-            predicted_service = PredictedPaperService(predicted_repo)
-            predicted_paper = await predicted_service.predict_and_store(
-                upload_id=upload.id, exam_id=upload.exam_id, context_text=combined_text
+    async def _generate_flashcards(self, user_id, predicted_paper_id, text) -> None:
+        # flashcards are optional: failures are logged, never raised
+        from app.repositories.flashcard_repo import FlashcardRepository
+        from app.services.flashcard_service import FlashcardService
+
+        flashcard_repo = FlashcardRepository(self.db)
+        flashcard_service = FlashcardService(flashcard_repo)
+        try:
+            if await flashcard_repo.exists_for_paper(predicted_paper_id):
+                logger.info("⏭️ Flashcards already generated")
+                return
+            await flashcard_service.generate_flashcards(
+                user_id=str(user_id),
+                predicted_paper_id=str(predicted_paper_id),
+                text=text,
+                max_cards=20,
+            )
+        except Exception:
+            logger.exception(
+                "Failed to generate flashcards for predicted_paper=%s",
+                predicted_paper_id,
             )
+            await self.db.rollback()
 
-            # generate flashcards for the predicted paper
-            from app.repositories.flashcard_repo import FlashcardRepository
-            from app.services.flashcard_service import FlashcardService
-
-            flashcard_repo = FlashcardRepository(self.db)
-            flashcard_service = FlashcardService(flashcard_repo)
-            try:
-                await flashcard_service.generate_flashcards(
-                    user_id=str(upload.user_id),
-                    predicted_paper_id=str(predicted_paper.id),
-                    text=predicted_paper.predicted_text,
-                    max_cards=20,
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to generate flashcards for predicted_paper=%s",
-                    predicted_paper.id,
-                )
+    async def finalize(self, upload_id) -> None:
+        """Render the predicted PDF, generate flashcards, complete the upload.
 
-            upload.status = UploadStatus.completed
-            await self.db.commit()
-            logger.info(f"🎉 Upload {upload_id} processing completed")
+        PDF rendering/upload and flashcard generation both only need the
+        predicted text, so they run concurrently. Only the flashcard side
+        uses the session; the PDF key is stored once both are done. A PDF
+        failure fails the stage (after flashcards are saved, so a retry
+        skips them); a flashcard failure does not.
+        """
+        upload = await self._load_upload(upload_id)
+        if upload.status == UploadStatus.needs_review:
+            logger.info(f"⏭️ Nothing to finalize: upload {upload_id} needs review")
+            return
+
+        predicted_repo = PredictedPaperRepository(self.db)
+        predicted_paper = await predicted_repo.get_for_upload(upload.id)
+        if (
+            predicted_paper is None
+            or predicted_paper.status != PredictedPaperStatus.completed
+        ):
+            raise RuntimeError(f"No predicted paper for upload {upload_id}")
 
+        paper_id = predicted_paper.id
+        text = predicted_paper.predicted_text
+        predicted_service = PredictedPaperService(predicted_repo)
+
+        stages = [self._generate_flashcards(upload.user_id, paper_id, text)]
+        if predicted_paper.pdf_s3_key is None:
+            stages.append(predicted_service.render_pdf(upload.id, text))
+
+        started = time.perf_counter()
+        # wait for both even if one fails, so nothing outlives the stage
+        _, *pdf_result = await asyncio.gather(*stages, return_exceptions=True)
+        logger.info(
+            f"⏱️ PDF and flashcards finished in {time.perf_counter() - started:.1f}s"
+        )
+
+        if pdf_result:
+            if isinstance(pdf_result[0], BaseException):
+                raise pdf_result[0]
+            # reloaded: a failed flashcard run may have rolled the session back
+            predicted_paper = await self.db.get(PredictedPaper, paper_id)
+            predicted_paper.pdf_s3_key = pdf_result[0]
+            logger.info(f"✅ PDF saved (s3_key={pdf_result[0]})")
+
+        upload.status = UploadStatus.completed
+        await self.db.commit()
+        logger.info(f"🎉 Upload {upload_id} processing completed")
+
+    async def mark_failed(self, upload_id) -> None:
+        # drop the unfinished stage; committed checkpoints are kept
+        await self.db.rollback()
+        upload = await self._load_upload(upload_id)
+        upload.status = UploadStatus.failed
+        await self.db.commit()
+
+        predicted_repo = PredictedPaperRepository(self.db)
+        predicted_paper = await predicted_repo.get_for_upload(upload.id)
+        if (
+            predicted_paper is not None
+            and predicted_paper.status == PredictedPaperStatus.generating
+        ):
+            await PredictedPaperService(predicted_repo).mark_failed(predicted_paper)
+
+    async def process_upload(self, upload_id: str) -> None:
+        """Run every stage in this process (used outside the Celery pipeline)."""
+        try:
+            file_ids = await self.start_upload(upload_id)
+        except LookupError:
+            logger.warning(f"❌ Upload not found: {upload_id}")
+            return
+        if not file_ids:
+            return
+
+        try:
+            for idx, file_id in enumerate(file_ids, start=1):
+                logger.info(f"🔍 Processing file {idx}/{len(file_ids)}")
+                await self.ocr_file(file_id)
+            await self.extract_questions(upload_id)
+            await self.predict(upload_id)
+            await self.finalize(upload_id)
         except Exception:
             logger.exception(f"🔥 WorkerService failed for upload {upload_id}")
-            upload.status = UploadStatus.failed
-            await self.db.commit()
+            await self.mark_failed(upload_id)
             raise
@@ -13,3 +13,10 @@ async def process_upload_worker(upload_id: str) -> None:
     async with AsyncSessionLocal() as db:
         service = WorkerService(db)
         await service.process_upload(upload_id)
+
+
+async def run_worker_stage(stage: str, *args):
+    """Run one `WorkerService` stage method in a fresh session."""
+    async with AsyncSessionLocal() as db:
+        service = WorkerService(db)
+        return await getattr(service, stage)(*args)
@@ -0,0 +1,65 @@
+"""Per-process asyncio runtime for Celery workers.
+
+Every worker process owns one long-lived event loop. The async engine in
+`app.core.database` (and its asyncpg pool) is only ever used from that loop,
+so pooled connections are reused across tasks instead of being bound to a
+loop that `asyncio.run` already closed.
+
+Works with the prefork (default) and solo pools. The threads pool would run
+tasks on one loop from several threads, which is not supported.
+"""
+
+import asyncio
+import logging
+from typing import Any, Coroutine, Optional, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.core.database import engine
+from app.core.ocr import shutdown_ocr_executor
+from app.core.aws import shutdown_s3_executor
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's event loop, creating it on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run `coro` to completion on the process-wide loop."""
+    return get_worker_loop().run_until_complete(coro)
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs) -> None:
+    # a forked child must not reuse connections inherited from the parent
+    engine.sync_engine.dispose(close=False)
+    get_worker_loop()
+    logger.info("Worker process runtime initialised")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs) -> None:
+    global _loop
+    shutdown_ocr_executor()
+    shutdown_s3_executor()
+    if _loop is None or _loop.is_closed():
+        return
+
+    try:
+        _loop.run_until_complete(engine.dispose())
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+    finally:
+        _loop.close()
+        _loop = None
+    logger.info("Worker process runtime shut down")
@@ -1,11 +1,72 @@
+"""Upload processing as a Celery pipeline of stage tasks.
+
+    process_upload ─┬─ ocr_file(file 1) ─┐
+                    ├─ ocr_file(file 2) ─┼─ extract_questions ─ predict ─ finalize
+                    └─ ...              ─┘
+
+OCR tasks go to the CPU-bound `ocr` queue, everything else to the I/O-bound
+`io` queue (see `app.core.celery_app`), so the two worker kinds scale
+independently. Stages are idempotent (`WorkerService`), so retries resume.
+"""
+
+from celery import chain, group
+
+from app.core.aws import ObjectChecksumMismatch, ObjectTooLarge
 from app.core.celery_app import celery_app
-import asyncio
-from app.workers.process_upload import process_upload_worker
+from app.workers.process_upload import run_worker_stage
+from app.workers.runtime import run_async
+
+STAGE_TASK_OPTIONS = dict(
+    autoretry_for=(Exception,),
+    # missing rows and rejected input files fail the same way every time
+    dont_autoretry_for=(LookupError, ObjectTooLarge, ObjectChecksumMismatch),
+    retry_backoff=True,
+    max_retries=3,
+)
 
 
-@celery_app.task(name="process_upload")
+def _run(stage: str, *args):
+    # run the async stage on the worker process's long-lived event loop
+    return run_async(run_worker_stage(stage, *args))
+
+
+@celery_app.task(name="process_upload", **STAGE_TASK_OPTIONS)
 def process_upload_task(upload_id: str):
-    """Celery task wrapper that runs the async process_upload_worker."""
+    """Start the processing pipeline for an upload."""
+    file_ids = _run("start_upload", upload_id)
+    if not file_ids:
+        return
+
+    pipeline = chain(
+        group(ocr_file_task.si(file_id) for file_id in file_ids),
+        extract_questions_task.si(upload_id),
+        predict_task.si(upload_id),
+        finalize_upload_task.si(upload_id),
+    )
+    pipeline.on_error(mark_upload_failed_task.si(upload_id))
+    pipeline.apply_async()
+
+
+@celery_app.task(name="upload.ocr_file", **STAGE_TASK_OPTIONS)
+def ocr_file_task(file_id: str):
+    _run("ocr_file", file_id)
+
+
+@celery_app.task(name="upload.extract_questions", **STAGE_TASK_OPTIONS)
+def extract_questions_task(upload_id: str):
+    _run("extract_questions", upload_id)
+
+
+@celery_app.task(name="upload.predict", **STAGE_TASK_OPTIONS)
+def predict_task(upload_id: str):
+    _run("predict", upload_id)
+
+
+@celery_app.task(name="upload.finalize", **STAGE_TASK_OPTIONS)
+def finalize_upload_task(upload_id: str):
+    _run("finalize", upload_id)
+
 
-    # run the async worker function in a fresh event loop
-    asyncio.run(process_upload_worker(upload_id))
+@celery_app.task(name="upload.mark_failed")
+def mark_upload_failed_task(upload_id: str):
+    _run("mark_failed", upload_id)
@@ -0,0 +1,62 @@
+"""Accuracy and resource metrics for OCR benchmarks."""
+
+import resource
+import sys
+from typing import Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so layout differences (line breaks, blank lines
+    between paragraphs) do not count as errors."""
+    return " ".join(text.split())
+
+
+def edit_distance(reference: str, hypothesis: str) -> int:
+    """Levenshtein distance in characters (insertions, deletions, substitutions)."""
+    if len(reference) < len(hypothesis):
+        reference, hypothesis = hypothesis, reference
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, start=1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_char != hyp_char),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def character_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """(edits, reference characters) after `normalize_text` on both sides.
+
+    Summing both over pages gives a document CER that is not skewed by
+    short pages, and keeps the quadratic edit distance per page.
+    """
+    reference = normalize_text(reference)
+    hypothesis = normalize_text(hypothesis)
+    return edit_distance(reference, hypothesis), len(reference)
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """Edits per reference character; 0.0 is a perfect read, and it can
+    exceed 1.0 when OCR adds a lot of noise."""
+    edits, chars = character_errors(reference, hypothesis)
+    if not chars:
+        return float(edits > 0)
+    return edits / chars
+
+
+def _maxrss_mb(who: int) -> float:
+    # kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def peak_rss_mb() -> Tuple[float, float]:
+    """Peak resident memory (MB) of this process and of its largest
+    finished child (pool workers, `tesseract`/Poppler subprocesses)."""
+    return _maxrss_mb(resource.RUSAGE_SELF), _maxrss_mb(resource.RUSAGE_CHILDREN)
@@ -0,0 +1,76 @@
+"""Compare OCR backends (pages/second) on a PDF.
+
+Pages are rendered once, up front, and then read by every available backend
+(`pytesseract`, and `tesserocr` if installed), so only recognition and
+preprocessing are timed. The PDF's text layer is ignored.
+
+    python -m benchmarks.ocr_backends [--pdf assets/sample.pdf] [--dpi 300]
+        [--workers 1] [--repeat 3]
+
+Requires Tesseract and Poppler, like the OCR worker itself.
+"""
+
+import argparse
+import logging
+import time
+from typing import List
+
+from PIL import Image
+
+from app.core import ocr
+from app.core.config import settings
+
+
+def available_backends() -> List[str]:
+    backends = ["pytesseract"]
+    if ocr.tesserocr is not None:
+        backends.append("tesserocr")
+    return backends
+
+
+def run(backend: str, pages: List[Image.Image], workers: int) -> float:
+    """Seconds to OCR `pages` with `backend` on `workers` workers."""
+    settings.OCR_BACKEND = backend
+    settings.OCR_MAX_WORKERS = workers
+    # pool processes copy the settings when they start
+    ocr.shutdown_ocr_executor()
+    started = time.perf_counter()
+    result = ocr.ocr_images(pages)
+    seconds = time.perf_counter() - started
+    if ocr.ocr_backend() != backend:
+        raise SystemExit(f"{backend} is not usable here")
+    print(
+        f"  {backend:<12} {seconds:7.2f}s  {len(pages) / seconds:6.2f} pages/s  "
+        f"{result.word_count} words, confidence {result.confidence or 0:.2f}"
+    )
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default="assets/sample.pdf")
+    parser.add_argument("--dpi", type=int, default=ocr.DEFAULT_DPI)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    count = ocr.get_pdf_page_count(args.pdf)
+    pages = ocr._render_pages(args.pdf, args.dpi, 1, count)
+    print(f"{args.pdf}: {count} pages at {args.dpi} DPI, {args.workers} worker(s)")
+
+    best = {}
+    for attempt in range(1, args.repeat + 1):
+        print(f"run {attempt}/{args.repeat}")
+        for backend in available_backends():
+            seconds = run(backend, pages, args.workers)
+            best[backend] = min(seconds, best.get(backend, seconds))
+    ocr.shutdown_ocr_executor()
+
+    print("best")
+    for backend, seconds in best.items():
+        print(f"  {backend:<12} {count / seconds:6.2f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
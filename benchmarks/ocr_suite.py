@@ -0,0 +1,309 @@
+"""OCR throughput and accuracy benchmark.
+
+Runs `app.core.ocr` ("engine") and `app.services.ocr_service.run_ocr`
+("service", from a local file instead of S3, cache disabled) over
+
+- `assets/sample.png`, against `benchmarks/golden/sample.png.txt`;
+- `assets/sample.pdf`, once through its text layer and once forced through
+  OCR, both against the text layer (born-digital, so it is the truth);
+- synthetic scanned pages with known text: image-only PDFs at several font
+  sizes (one page skewed and speckled) and an oversized phone-style photo.
+
+Every case runs in a fresh process, so peak RSS is per case. Reported:
+pages/s (wall clock), character error rate (CER, whitespace-insensitive),
+Tesseract word confidence, and peak RSS of the case process and of its
+largest child (pool workers, `tesseract`, Poppler).
+
+    python -m benchmarks.ocr_suite [--mode engine|service|both]
+        [--case NAME ...] [--synthetic-pages 3] [--json results.json]
+        [--max-cer 0.05]
+
+`--max-cer` exits non-zero when any case is less accurate, so the suite can
+gate OCR changes. Requires Tesseract and Poppler, like the OCR worker.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from benchmarks.metrics import character_errors, peak_rss_mb
+from benchmarks.synthetic import synthetic_page, write_scanned_pdf
+
+ROOT = Path(__file__).resolve().parent.parent
+ASSETS = ROOT / "assets"
+GOLDEN = Path(__file__).resolve().parent / "golden"
+
+MODES = ("engine", "service")
+
+
+@dataclass
+class Case:
+    name: str
+    path: str
+    # "pdf" or "image"
+    kind: str
+    # expected text per page; None where unknown
+    golden: Optional[List[str]] = None
+    # app settings overridden for this case
+    settings: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class Measurement:
+    case: str
+    mode: str
+    pages: int
+    seconds: float
+    words: int
+    confidence: Optional[float]
+    rss_mb: float
+    child_rss_mb: float
+    cer: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+class LocalFileS3:
+    """Just enough of an S3 client for `run_ocr` to read a local file."""
+
+    def get_object(self, Bucket, Key):
+        return {"Body": open(Key, "rb"), "ContentLength": os.path.getsize(Key)}
+
+
+def _read_pages(case: Case, mode: str):
+    from app.core import ocr
+    from app.core.preprocessing import open_image
+    from app.models.file import FileType
+    from app.services import ocr_service
+
+    if mode == "service":
+        file = SimpleNamespace(
+            id=None,
+            s3_key=case.path,
+            file_type=FileType.pdf if case.kind == "pdf" else FileType.image,
+            original_filename=Path(case.path).name,
+        )
+        return asyncio.run(
+            ocr_service.run_ocr(file, s3_client=LocalFileS3(), use_cache=False)
+        )
+    if case.kind == "pdf":
+        return ocr.ocr_pdf(case.path)
+    return ocr.ocr_images([open_image(case.path)])
+
+
+def _measure(case: Case, mode: str, results) -> None:
+    """Process entry point: run one case and report page texts and usage."""
+    from app.core import ocr
+    from app.core.config import settings
+
+    for name, value in case.settings.items():
+        setattr(settings, name, value)
+    try:
+        started = time.perf_counter()
+        result = _read_pages(case, mode)
+        seconds = time.perf_counter() - started
+        ocr.shutdown_ocr_executor()
+    except Exception as exc:
+        results.put({"error": f"{type(exc).__name__}: {exc}"})
+        return
+    rss, child_rss = peak_rss_mb()
+    results.put(
+        {
+            "texts": [page.text for page in result.pages],
+            "seconds": seconds,
+            "words": result.word_count,
+            "confidence": result.confidence,
+            "rss_mb": rss,
+            "child_rss_mb": child_rss,
+        }
+    )
+
+
+def run_case(case: Case, mode: str) -> Measurement:
+    # spawn: a clean interpreter per case, so RSS is not inherited; not
+    # daemonic, so the OCR pool can still start worker processes
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(case, mode, results))
+    process.start()
+    outcome = None
+    while outcome is None:
+        try:
+            outcome = results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                outcome = {"error": f"exited with code {process.exitcode}"}
+    process.join()
+
+    if "error" in outcome:
+        return Measurement(
+            case.name, mode, 0, 0.0, 0, None, 0.0, 0.0, error=outcome["error"]
+        )
+
+    texts = outcome["texts"]
+    measurement = Measurement(
+        case=case.name,
+        mode=mode,
+        pages=len(texts),
+        seconds=outcome["seconds"],
+        words=outcome["words"],
+        confidence=outcome["confidence"],
+        rss_mb=outcome["rss_mb"],
+        child_rss_mb=outcome["child_rss_mb"],
+    )
+    if case.golden is not None:
+        edits = chars = 0
+        for index, expected in enumerate(case.golden):
+            actual = texts[index] if index < len(texts) else ""
+            page_edits, page_chars = character_errors(expected, actual)
+            edits += page_edits
+            chars += page_chars
+        measurement.cer = edits / chars if chars else None
+    return measurement
+
+
+def _pdf_text_layer(path: str) -> Optional[List[str]]:
+    from app.core.ocr import extract_text_layer, get_pdf_page_count
+
+    try:
+        pages = extract_text_layer(path, get_pdf_page_count(path))
+    except Exception:
+        # no Poppler; the PDF cases will report the failure
+        return None
+    return pages if any(page.strip() for page in pages) else None
+
+
+def build_cases(work_dir: str, synthetic_pages: int) -> List[Case]:
+    sample_pdf = str(ASSETS / "sample.pdf")
+    sample_layer = _pdf_text_layer(sample_pdf)
+    cases = [
+        Case(
+            "sample.png",
+            str(ASSETS / "sample.png"),
+            "image",
+            golden=[(GOLDEN / "sample.png.txt").read_text()],
+        ),
+        Case("sample.pdf/text-layer", sample_pdf, "pdf", golden=sample_layer),
+        Case(
+            "sample.pdf/ocr",
+            sample_pdf,
+            "pdf",
+            golden=sample_layer,
+            settings={"OCR_USE_TEXT_LAYER": False},
+        ),
+    ]
+
+    # scanned PDFs: small, body and large print; the second page of each is
+    # skewed and speckled
+    for font_pt in (8, 11, 14):
+        pages = [
+            synthetic_page(
+                font_pt=font_pt,
+                skew_degrees=1.5 if number == 1 else 0.0,
+                noise=0.002 if number == 1 else 0.0,
+                seed=font_pt * 100 + number,
+            )
+            for number in range(synthetic_pages)
+        ]
+        path = os.path.join(work_dir, f"scan-{font_pt}pt.pdf")
+        write_scanned_pdf(pages, path, dpi=200)
+        cases.append(
+            Case(
+                f"synthetic/{font_pt}pt-scan",
+                path,
+                "pdf",
+                golden=[page.text for page in pages],
+            )
+        )
+
+    # a ~15 MP photo: exercises downscaling and deskew of large images
+    photo = synthetic_page(
+        font_pt=11, dpi=400, skew_degrees=3.0, noise=0.001, seed=7
+    )
+    path = os.path.join(work_dir, "photo.png")
+    photo.image.save(path)
+    cases.append(Case("synthetic/photo", path, "image", golden=[photo.text]))
+    return cases
+
+
+def _format(value: Optional[float], spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(measurements: List[Measurement]) -> None:
+    header = (
+        f"{'case':<24} {'mode':<8} {'pages':>5} {'pages/s':>8} {'CER':>7} "
+        f"{'conf':>5} {'RSS MB':>7} {'child MB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for m in measurements:
+        if m.error:
+            print(f"{m.case:<24} {m.mode:<8} failed: {m.error}")
+            continue
+        print(
+            f"{m.case:<24} {m.mode:<8} {m.pages:>5} {m.pages_per_second:>8.2f} "
+            f"{_format(m.cer, '.2%'):>7} {_format(m.confidence, '.2f'):>5} "
+            f"{m.rss_mb:>7.0f} {m.child_rss_mb:>8.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=(*MODES, "both"), default="both")
+    parser.add_argument(
+        "--case", action="append", help="only cases whose name contains this"
+    )
+    parser.add_argument("--synthetic-pages", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--max-cer", type=float)
+    args = parser.parse_args()
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+    measurements = []
+    with tempfile.TemporaryDirectory(prefix="ocr-bench-") as work_dir:
+        cases = build_cases(work_dir, args.synthetic_pages)
+        if args.case:
+            cases = [
+                case for case in cases if any(part in case.name for part in args.case)
+            ]
+        for case in cases:
+            for mode in modes:
+                measurements.append(run_case(case, mode))
+
+    print_table(measurements)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(
+                [
+                    {**asdict(m), "pages_per_second": m.pages_per_second}
+                    for m in measurements
+                ],
+                fh,
+                indent=2,
+            )
+
+    failed = [m for m in measurements if m.error]
+    if args.max_cer is not None:
+        failed += [
+            m for m in measurements if m.cer is not None and m.cer > args.max_cer
+        ]
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Synthetic scanned pages with known text.
+
+Pages are drawn with Pillow in a TrueType font shipped with reportlab (so
+no system fonts are needed), optionally rotated and speckled like a
+scanner would, and can be bundled into an image-only PDF (no text layer),
+which forces the OCR path.
+"""
+
+import os
+import random
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import reportlab
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_PATH = os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf")
+
+# exam-paper style filler; words are drawn at random from it
+_CORPUS = (
+    "Define the term acceleration and state its SI unit. A body of mass 5 kg "
+    "moves with a velocity of 12 m/s. Calculate its kinetic energy and explain "
+    "why it depends on the square of the velocity. Describe the process of "
+    "photosynthesis and name two factors that affect its rate. Solve the "
+    "equation 3x + 7 = 22 and verify your answer. Explain the difference "
+    "between mitosis and meiosis with a labelled diagram. What is the "
+    "function of the mitochondria in a cell? State Ohm's law and derive an "
+    "expression for the equivalent resistance of two resistors in series."
+).split()
+
+# A4 in inches
+PAGE_INCHES = (8.27, 11.69)
+
+
+@dataclass
+class SyntheticPage:
+    image: Image.Image
+    text: str
+
+
+def _lines(rng: random.Random, words_per_line: int, count: int) -> List[str]:
+    return [
+        " ".join(rng.choice(_CORPUS) for _ in range(words_per_line))
+        for _ in range(count)
+    ]
+
+
+def synthetic_page(
+    font_pt: float = 11.0,
+    dpi: int = 200,
+    page_inches: Sequence[float] = PAGE_INCHES,
+    skew_degrees: float = 0.0,
+    noise: float = 0.0,
+    seed: int = 0,
+) -> SyntheticPage:
+    """One grayscale page filled with `font_pt` text, rendered at `dpi`.
+
+    `noise` is the fraction of pixels flipped to random gray (salt and
+    pepper); `skew_degrees` rotates the finished page.
+    """
+    rng = random.Random(seed)
+    width, height = (int(inches * dpi) for inches in page_inches)
+    font_px = max(6, round(font_pt * dpi / 72))
+    font = ImageFont.truetype(FONT_PATH, font_px)
+    margin = dpi  # one inch
+    line_height = int(font_px * 1.5)
+
+    # fit the line length to the page width
+    sample = " ".join(_CORPUS[:40])
+    chars_per_line = int((width - 2 * margin) / font.getlength(sample) * len(sample))
+    words_per_line = max(1, chars_per_line // 8)
+    line_count = max(1, (height - 2 * margin) // line_height)
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    lines = []
+    y = margin
+    for line in _lines(rng, words_per_line, line_count):
+        while font.getlength(line) > width - 2 * margin and " " in line:
+            line = line.rsplit(" ", 1)[0]
+        draw.text((margin, y), line, font=font, fill=0)
+        lines.append(line)
+        y += line_height
+
+    if skew_degrees:
+        image = image.rotate(skew_degrees, resample=Image.BICUBIC, fillcolor=255)
+    if noise:
+        pixels = image.load()
+        for _ in range(int(width * height * noise)):
+            pixels[rng.randrange(width), rng.randrange(height)] = rng.randrange(256)
+    return SyntheticPage(image=image, text="\n".join(lines))
+
+
+def write_scanned_pdf(pages: Sequence[SyntheticPage], path: str, dpi: int) -> None:
+    """Save `pages` as an image-only PDF at `dpi`."""
+    first, *rest = [page.image for page in pages]
+    first.save(path, "PDF", resolution=dpi, save_all=True, append_images=rest)
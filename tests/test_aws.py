@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core import aws
+
+BUCKET = "prepnexa-test"
+
+
+def test_s3_clients_are_shared_per_credentials():
+    first = aws.get_s3_client()
+    assert aws.get_s3_client() is first
+    assert aws.get_s3_client(region_name="eu-west-1") is not first
+    assert first.meta.config.max_pool_connections == aws.settings.S3_MAX_POOL_CONNECTIONS
+
+
+def test_s3_executor_is_per_process(monkeypatch):
+    parent = aws.get_s3_executor()
+    assert aws.get_s3_executor() is parent
+
+    # a forked child sees a new pid and must not use the parent's threads
+    monkeypatch.setattr(aws.os, "getpid", lambda: -1)
+    child = aws.get_s3_executor()
+    assert child is not parent
+    aws.shutdown_s3_executor()
+    assert aws.get_s3_executor() is not child
+    aws.shutdown_s3_executor()
+
+    monkeypatch.undo()
+    assert aws.get_s3_executor() is parent
+
+
+@pytest.mark.asyncio
+async def test_async_object_helpers():
+    with mock_aws():
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        client.create_bucket(Bucket=BUCKET)
+        data = bytes(range(256)) * 100
+
+        await aws.put_object_bytes("k", data, bucket=BUCKET, s3_client=client)
+        assert await aws.get_object_bytes("k", bucket=BUCKET, s3_client=client) == data
+
+        chunks = [
+            chunk
+            async for chunk in aws.iter_object_chunks(
+                "k", chunk_size=4096, bucket=BUCKET, s3_client=client
+            )
+        ]
+        assert len(chunks) == 7
+        assert b"".join(chunks) == data
+
+
+@pytest.mark.asyncio
+async def test_download_object_streams_to_temp_file_and_cleans_up():
+    with mock_aws():
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        client.create_bucket(Bucket=BUCKET)
+        data = b"%PDF-1.4 " * 1000
+        client.put_object(Bucket=BUCKET, Key="paper.pdf", Body=data)
+
+        async with aws.download_object(
+            "paper.pdf", max_bytes=len(data), suffix=".pdf", bucket=BUCKET, s3_client=client
+        ) as obj:
+            assert obj.path.endswith(".pdf")
+            with open(obj.path, "rb") as fh:
+                assert fh.read() == data
+            assert obj.size == len(data)
+            assert obj.sha256 == hashlib.sha256(data).hexdigest()
+        assert not os.path.exists(os.path.dirname(obj.path))
+
+        with pytest.raises(aws.ObjectTooLarge):
+            async with aws.download_object(
+                "paper.pdf", max_bytes=100, bucket=BUCKET, s3_client=client
+            ):
+                pass
@@ -0,0 +1,71 @@
+import io
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.cache import DiskCache
+from app.core.ocr import PageResult
+from app.models.file import FileType
+from app.services import ocr_service
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_ttl_and_stats(tmp_path):
+    cache = DiskCache("t", ttl_seconds=60, max_bytes=1024, directory=str(tmp_path))
+
+    assert await cache.get("a") is None
+    await cache.set("a", b"value")
+    assert await cache.get("a") == b"value"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    # age the entry past its TTL
+    path = cache._path("a")
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert await cache.get("a") is None
+    assert not os.path.exists(path)
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache("t", ttl_seconds=60, max_bytes=25, directory=str(tmp_path))
+
+    await cache.set("old", b"x" * 10)
+    os.utime(cache._path("old"), (time.time() - 10, time.time() - 10))
+    await cache.set("used", b"x" * 10)
+    os.utime(cache._path("used"), (time.time() - 5, time.time() - 5))
+    await cache.get("used")  # touch: now most recently used
+    await cache.set("new", b"x" * 10)
+
+    assert await cache.get("old") is None
+    assert await cache.get("used") is not None
+    assert await cache.get("new") is not None
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_serves_duplicates_from_cache(tmp_path, monkeypatch):
+    cache = DiskCache("ocr", ttl_seconds=60, max_bytes=1 << 20, directory=str(tmp_path))
+    monkeypatch.setattr(ocr_service, "ocr_cache", cache)
+
+    calls = []
+
+    def fake_pages(file_type, file_bytes, skip_pages):
+        calls.append(file_bytes)
+        yield PageResult(page_number=1, text="Q1. Hello", seconds=0.5)
+
+    monkeypatch.setattr(ocr_service, "_iter_file_pages", fake_pages)
+
+    s3 = SimpleNamespace(
+        get_object=lambda Bucket, Key: {"Body": io.BytesIO(b"%PDF same bytes")}
+    )
+    file = SimpleNamespace(
+        s3_key="uploads/a.pdf", file_type=FileType.pdf, original_filename="a.pdf"
+    )
+
+    first = await ocr_service.run_ocr(file, s3_client=s3)
+    second = await ocr_service.run_ocr(file, s3_client=s3)
+
+    assert len(calls) == 1
+    assert second.text == first.text == "Q1. Hello"
+    assert cache.stats.hits == 1
@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import context_condenser
+from app.services.context_condenser import (
+    ContextCondenser,
+    condense_text,
+    split_into_chunks,
+)
+
+
+class FakeRepo:
+    def __init__(self):
+        self.rows = {}
+        self.commits = 0
+
+    async def list_for_processed_text(self, processed_text_id):
+        return {
+            index: row
+            for (pt_id, index), row in self.rows.items()
+            if pt_id == processed_text_id
+        }
+
+    async def save(self, processed_text_id, chunk_index, content_hash, summary, existing=None):
+        row = existing or SimpleNamespace()
+        row.content_hash = content_hash
+        row.summary = summary
+        self.rows[(processed_text_id, chunk_index)] = row
+        return row
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def fake_summaries(monkeypatch):
+    calls = []
+
+    async def summarize(chunk, label, priority=None):
+        calls.append(chunk)
+        return f"summary of {label}"
+
+    monkeypatch.setattr(context_condenser, "summarize_chunk", summarize)
+    monkeypatch.setattr(settings, "CONTEXT_CHUNK_TOKENS", 50)
+    return calls
+
+
+def _paragraphs(prefix, count):
+    return "\n\n".join(f"{prefix} paragraph {i} " + "x" * 120 for i in range(count))
+
+
+def test_split_into_chunks_respects_budget_and_order():
+    text = _paragraphs("doc", 10)
+    chunks = split_into_chunks(text, 50)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) // 4 + 1 <= 50 for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+
+
+def test_condense_text_passes_short_text_through(fake_summaries):
+    assert asyncio.run(condense_text("short text", 100)) == "short text"
+    assert fake_summaries == []
+
+
+def test_condense_text_summarizes_long_text(fake_summaries):
+    result = asyncio.run(condense_text(_paragraphs("doc", 10), 100))
+
+    assert fake_summaries
+    assert result.startswith("summary of part 1 of")
+    assert len(result) // 4 + 1 <= 100
+
+
+def test_condenser_reuses_stored_summaries(fake_summaries):
+    repo = FakeRepo()
+    texts = [
+        SimpleNamespace(id=uuid.uuid4(), cleaned_text=_paragraphs("first", 6)),
+        SimpleNamespace(id=uuid.uuid4(), cleaned_text=_paragraphs("second", 6)),
+    ]
+    condenser = ContextCondenser(repo)
+
+    first = asyncio.run(condenser.condense(texts, 200))
+    calls = len(fake_summaries)
+    assert calls == len(repo.rows)
+    assert repo.commits == 1
+    assert first.index("document 1") < first.index("document 2")
+
+    second = asyncio.run(condenser.condense(texts, 200))
+    assert second == first
+    assert len(fake_summaries) == calls
+    assert repo.commits == 1
+
+
+def test_condenser_recomputes_stale_summaries(fake_summaries):
+    repo = FakeRepo()
+    texts = [SimpleNamespace(id=uuid.uuid4(), cleaned_text=_paragraphs("doc", 6))]
+    condenser = ContextCondenser(repo)
+    asyncio.run(condenser.condense(texts, 100))
+
+    stale = repo.rows[(texts[0].id, 0)]
+    stale.content_hash = "0" * 64
+    calls = len(fake_summaries)
+    asyncio.run(condenser.condense(texts, 100))
+
+    assert len(fake_summaries) == calls + 1
+    assert repo.rows[(texts[0].id, 0)] is stale
+    assert stale.content_hash != "0" * 64
+
+
+def test_condenser_keeps_successful_summaries_when_one_fails(monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_CHUNK_TOKENS", 50)
+    calls = []
+    failing = {"part 2 of"}
+
+    async def summarize(chunk, label, priority=None):
+        calls.append(label)
+        if any(part in label for part in failing):
+            raise RuntimeError("LLM unavailable")
+        return f"summary of {label}"
+
+    monkeypatch.setattr(context_condenser, "summarize_chunk", summarize)
+    repo = FakeRepo()
+    texts = [SimpleNamespace(id=uuid.uuid4(), cleaned_text=_paragraphs("doc", 6))]
+    condenser = ContextCondenser(repo)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(condenser.condense(texts, 100))
+    chunk_count = len(calls)
+    assert len(repo.rows) == chunk_count - 1
+    assert repo.commits == 1
+
+    # the retry only summarizes the chunk that failed
+    failing.clear()
+    asyncio.run(condenser.condense(texts, 100))
+    assert calls[chunk_count:] == [calls[1]]
+    assert len(repo.rows) == chunk_count
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.core.cache import DiskCache
+from app.services import llm_client
+from app.services.llm_scheduler import LlmPriority, LlmScheduler, NullRateLimiter
+
+
+@pytest.fixture
+def fake_llm(tmp_path, monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-mini",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"answer {len(calls)}"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 12,
+                    "completion_tokens": 3,
+                    "total_tokens": 15,
+                },
+            },
+        )
+
+    client = AsyncOpenAI(
+        api_key="sk-test",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    cache = DiskCache("llm", ttl_seconds=60, max_bytes=1 << 20, directory=str(tmp_path))
+    monkeypatch.setattr(llm_client, "client", client)
+    monkeypatch.setattr(llm_client, "llm_cache", cache)
+    monkeypatch.setattr(
+        llm_client,
+        "llm_scheduler",
+        LlmScheduler(max_concurrency=2, rate_limiter=NullRateLimiter()),
+    )
+    return calls, cache
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_are_served_from_cache(fake_llm):
+    calls, cache = fake_llm
+
+    first = await llm_client.call_llm("Predict the paper:\r\nQ1. Optics  ")
+    second = await llm_client.call_llm("Predict the paper:\nQ1. Optics")
+
+    assert first == second == "answer 1"
+    assert len(calls) == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.hit_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_cache_key_covers_parameters_and_opt_out(fake_llm):
+    calls, _ = fake_llm
+
+    await llm_client.call_llm("same prompt")
+    assert await llm_client.call_llm("same prompt", temperature=0.2) == "answer 2"
+    assert await llm_client.call_llm("same prompt", use_cache=False) == "answer 3"
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_calls_report_token_usage(fake_llm):
+    await llm_client.call_llm("usage prompt", priority=LlmPriority.flashcards)
+    await llm_client.call_llm("usage prompt", priority=LlmPriority.flashcards)
+
+    # the cache hit costs nothing
+    metrics = llm_client.llm_scheduler.metrics
+    assert (metrics.prompt_tokens, metrics.completion_tokens) == (12, 3)
+    assert metrics.tokens_by_priority == {"flashcards": 15}
@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+from benchmarks.metrics import (
+    character_error_rate,
+    character_errors,
+    edit_distance,
+    peak_rss_mb,
+)
+from benchmarks.synthetic import synthetic_page, write_scanned_pdf
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("same", "same") == 0
+
+
+def test_cer_ignores_layout_whitespace():
+    assert character_error_rate("Define force\n\n(5)", "Define  force (5)") == 0.0
+    # one substitution in 10 characters
+    assert character_error_rate("Ohm's law.", "0hm's law.") == pytest.approx(0.1)
+    assert character_errors("", "noise") == (5, 0)
+    assert character_error_rate("", "") == 0.0
+    assert character_error_rate("", "noise") == 1.0
+
+
+def test_synthetic_pages_are_reproducible_and_fit_the_page():
+    page = synthetic_page(font_pt=11, dpi=100, seed=3)
+    again = synthetic_page(font_pt=11, dpi=100, seed=3)
+
+    assert page.image.mode == "L"
+    assert page.image.size == (827, 1169)
+    assert page.text == again.text
+    assert page.image.tobytes() == again.image.tobytes()
+    lines = page.text.split("\n")
+    assert len(lines) > 20 and all(lines)
+    # something was drawn, inside the one-inch margins
+    box = page.image.point(lambda v: 255 - v).getbbox()
+    assert box[0] >= 100 and box[2] <= 727
+
+
+def test_scanned_pdf_has_one_page_per_image(tmp_path):
+    pages = [synthetic_page(dpi=50, seed=n) for n in range(3)]
+    path = tmp_path / "scan.pdf"
+
+    write_scanned_pdf(pages, str(path), dpi=50)
+
+    data = path.read_bytes()
+    assert data.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type\s*/Page\b", data)) == 3
+
+
+def test_peak_rss_is_reported_in_megabytes():
+    rss, child_rss = peak_rss_mb()
+    assert 10 < rss < 100_000
+    assert child_rss >= 0
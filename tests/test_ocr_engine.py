@@ -0,0 +1,322 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.core import ocr
+
+
+def _data(*words, conf=90):
+    """`image_to_data` dict with `words` on one line."""
+    n = len(words)
+    return {
+        "level": [5] * n,
+        "block_num": [1] * n,
+        "par_num": [1] * n,
+        "line_num": [1] * n,
+        "conf": [conf] * n,
+        "text": list(words),
+    }
+
+
+@pytest.fixture(autouse=True)
+def pytesseract_backend(monkeypatch):
+    # the fakes below patch pytesseract; don't let an installed tesserocr win
+    monkeypatch.setattr(ocr.settings, "OCR_BACKEND", "pytesseract")
+
+
+def _fake_image_to_data(image, lang=None, config=None, output_type=None):
+    # pages are encoded by width; later pages finish first to exercise ordering
+    width = image.shape[1]
+    time.sleep(0.01 * (5 - width))
+    return _data(f"page-{width}")
+
+
+def test_pages_are_reassembled_in_order(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(ocr, "get_ocr_executor", lambda: pool)
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", _fake_image_to_data)
+
+    images = [Image.new("RGB", (width, 10), "white") for width in range(1, 5)]
+    result = ocr.ocr_images(images)
+    pool.shutdown()
+
+    assert [p.page_number for p in result.pages] == [1, 2, 3, 4]
+    assert result.text == "page-1\npage-2\npage-3\npage-4"
+    assert all(p.seconds > 0 for p in result.pages)
+
+
+def test_single_worker_runs_inline(monkeypatch):
+    monkeypatch.setattr(ocr.settings, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", _fake_image_to_data)
+
+    assert ocr.get_ocr_executor() is None
+    result = ocr.ocr_images([Image.new("RGB", (2, 10), "white")])
+    assert result.text == "page-2"
+
+
+def test_pdf_pages_render_in_windows(monkeypatch):
+    calls = []
+
+    def fake_convert(path, dpi, first_page, last_page, grayscale):
+        assert grayscale
+        calls.append((first_page, last_page))
+        return [Image.new("L", (n, 10)) for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(ocr, "get_pdf_page_count", lambda path: 5)
+    monkeypatch.setattr(ocr, "convert_from_path", fake_convert)
+
+    pages = ocr.iter_pdf_pages("doc.pdf", dpi=100, window=2)
+    assert calls == []  # nothing rendered until consumed
+    assert [(n, image.width) for n, image in pages] == [(n, n) for n in range(1, 6)]
+    assert calls == [(1, 2), (3, 4), (5, 5)]
+
+
+def test_only_scanned_pages_are_ocred(monkeypatch):
+    layer = ["Question 1. Define photosynthesis and explain its stages. " * 2, "", "\ufffd" * 60]
+    rendered = []
+
+    def fake_iter_pdf_pages(path, dpi, window, page_numbers):
+        rendered.extend(page_numbers)
+        for n in page_numbers:
+            yield n, Image.new("RGB", (n, 10))
+
+    monkeypatch.setattr(ocr.settings, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(ocr, "get_pdf_page_count", lambda path: 3)
+    monkeypatch.setattr(ocr, "extract_text_layer", lambda path, count: layer)
+    monkeypatch.setattr(ocr, "iter_pdf_pages", fake_iter_pdf_pages)
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", _fake_image_to_data)
+
+    result = ocr.ocr_pdf("doc.pdf")
+
+    assert rendered == [2, 3]
+    assert result.page_sources == ["text_layer", "ocr", "ocr"]
+    assert result.pages[1].text == "page-2"
+
+
+def test_pages_are_submitted_in_batches(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    submitted = []
+    submit = pool.submit
+
+    def recording_submit(fn, batch):
+        submitted.append([n for n, _ in batch])
+        return submit(fn, batch)
+
+    monkeypatch.setattr(pool, "submit", recording_submit)
+    monkeypatch.setattr(ocr, "get_ocr_executor", lambda: pool)
+    monkeypatch.setattr(ocr.settings, "OCR_BATCH_PAGES", 2)
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", _fake_image_to_data)
+
+    images = [Image.new("L", (width, 10), "white") for width in range(1, 6)]
+    result = ocr.ocr_images(images)
+    pool.shutdown()
+
+    assert submitted == [[1, 2], [3, 4], [5]]
+    assert result.text == "page-1\npage-2\npage-3\npage-4\npage-5"
+
+
+def _rendered_page(dpi, point_size):
+    """Grayscale A4 'render' whose text height scales with dpi and font size."""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    page = np.full((height, width), 255, np.uint8)
+    scale = point_size * dpi / 72 / 22  # Hershey simplex caps are ~22px at 1.0
+    for y in range(int(dpi), height - int(dpi), max(8, int(scale * 45))):
+        cv2.putText(
+            page,
+            "Define momentum",
+            (int(dpi / 2), y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            scale,
+            0,
+            max(1, int(scale * 2)),
+        )
+    return Image.fromarray(page)
+
+
+def test_small_text_pages_are_rerendered_at_higher_dpi(monkeypatch):
+    sizes = {1: 18, 2: 5, 3: 18}
+    renders = []
+
+    def fake_convert(path, dpi, first_page, last_page, grayscale):
+        renders.append((first_page, last_page, dpi))
+        return [
+            _rendered_page(dpi, sizes[n]) for n in range(first_page, last_page + 1)
+        ]
+
+    monkeypatch.setattr(ocr.settings, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(ocr.settings, "OCR_USE_TEXT_LAYER", False)
+    monkeypatch.setattr(ocr.settings, "OCR_ADAPTIVE_DPI", True)
+    monkeypatch.setattr(ocr.settings, "OCR_LOW_DPI", 100)
+    monkeypatch.setattr(ocr.settings, "OCR_MAX_DPI", 300)
+    monkeypatch.setattr(ocr.settings, "OCR_MIN_TEXT_HEIGHT_PX", 16)
+    monkeypatch.setattr(ocr, "get_pdf_page_count", lambda path: 3)
+    monkeypatch.setattr(ocr, "convert_from_path", fake_convert)
+    monkeypatch.setattr(
+        ocr.pytesseract, "image_to_data", lambda *a, **k: _data("text")
+    )
+
+    result = ocr.ocr_pdf("doc.pdf")
+
+    # 18pt reads fine at 100 DPI; 5pt needs 300 DPI and only page 2 pays for it
+    assert [page.dpi for page in result.pages] == [100, 300, 100]
+    assert [r for r in renders if r[2] > 100] == [(2, 2, 300)]
+
+
+def test_explicit_dpi_disables_adaptive_rendering(monkeypatch):
+    renders = []
+
+    def fake_convert(path, dpi, first_page, last_page, grayscale):
+        renders.append(dpi)
+        return [Image.new("L", (10, 10), "white")] * (last_page - first_page + 1)
+
+    monkeypatch.setattr(ocr.settings, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(ocr.settings, "OCR_USE_TEXT_LAYER", False)
+    monkeypatch.setattr(ocr, "get_pdf_page_count", lambda path: 2)
+    monkeypatch.setattr(ocr, "convert_from_path", fake_convert)
+    monkeypatch.setattr(
+        ocr.pytesseract, "image_to_data", lambda *a, **k: _data("text")
+    )
+
+    result = ocr.ocr_pdf("doc.pdf", dpi=250)
+
+    assert set(renders) == {250}
+    assert [page.dpi for page in result.pages] == [250, 250]
+
+
+def test_page_text_and_confidence_come_from_word_data():
+    data = {
+        "level": [1, 5, 5, 5, 5, 5],
+        "block_num": [1, 1, 1, 1, 2, 2],
+        "par_num": [0, 1, 1, 1, 1, 1],
+        "line_num": [0, 1, 1, 2, 1, 1],
+        "conf": [-1, 90, 80, 60, 30, 95],
+        "text": ["", "Define", "force", "(5)", "~", " "],
+    }
+
+    page = ocr.page_text_from_data(data)
+
+    assert page.text == "Define force\n(5)\n\n~"
+    assert page.word_count == 4
+    # weighted by characters: (6*90 + 5*80 + 3*60 + 1*30) / 15
+    assert page.confidence == pytest.approx(1150 / 15 / 100)
+    assert ocr.page_text_from_data({}).confidence is None
+
+
+def test_document_confidence_is_weighted_by_words():
+    result = ocr.OcrResult(
+        pages=[
+            ocr.PageResult(1, "a " * 90, 1.0, confidence=0.9, word_count=90),
+            ocr.PageResult(2, "b " * 10, 1.0, confidence=0.1, word_count=10),
+            ocr.PageResult(3, "", 1.0, confidence=None, word_count=0),
+        ]
+    )
+
+    assert result.word_count == 100
+    assert result.confidence == pytest.approx(0.82)
+
+
+class _RIL(IntEnum):
+    BLOCK = 0
+    PARA = 1
+    TEXTLINE = 2
+    WORD = 3
+
+
+class _FakeWord:
+    def __init__(self, text, conf, starts):
+        self.text, self.conf, self.starts = text, conf, starts
+
+    def IsAtBeginningOf(self, level):
+        return level in self.starts
+
+    def Confidence(self, level):
+        return self.conf
+
+    def GetUTF8Text(self, level):
+        return self.text
+
+
+class _FakeApi:
+    created = []
+
+    def __init__(self, lang, oem, psm):
+        self.images = []
+        _FakeApi.created.append(threading.get_ident())
+
+    def SetImageBytes(self, data, width, height, bpp, bpl):
+        assert len(data) == width * height == bpl * height and bpp == 1
+        self.images.append((width, height))
+
+    def Recognize(self):
+        pass
+
+    def GetIterator(self):
+        return [
+            _FakeWord("Define", 90, {_RIL.BLOCK, _RIL.PARA, _RIL.TEXTLINE}),
+            _FakeWord("force", 80, set()),
+            _FakeWord("(5)", 60, {_RIL.TEXTLINE}),
+            _FakeWord("Next", 70, {_RIL.PARA, _RIL.TEXTLINE}),
+        ]
+
+    def Clear(self):
+        pass
+
+
+def _fake_tesserocr(api=_FakeApi):
+    return SimpleNamespace(
+        PyTessBaseAPI=api,
+        OEM=SimpleNamespace(DEFAULT=3),
+        PSM=SimpleNamespace(SINGLE_BLOCK=6),
+        RIL=_RIL,
+        iterate_level=lambda iterator, level: iter(iterator),
+    )
+
+
+def test_tesserocr_backend_reuses_one_engine_per_thread(monkeypatch):
+    monkeypatch.setattr(ocr.settings, "OCR_BACKEND", "auto")
+    monkeypatch.setattr(ocr.settings, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(ocr, "tesserocr", _fake_tesserocr())
+    monkeypatch.setattr(ocr, "_engines", threading.local())
+    monkeypatch.setattr(ocr, "preprocess_image", lambda image: np.asarray(image))
+    monkeypatch.setattr(
+        ocr.pytesseract, "image_to_data", pytest.fail, raising=False
+    )
+    _FakeApi.created = []
+
+    images = [Image.new("L", (20, 10), "white") for _ in range(3)]
+    result = ocr.ocr_images(images)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(ocr.read_image, images[0]).result()
+
+    assert ocr.ocr_backend() == "tesserocr"
+    assert result.pages[0].text == "Define force\n(5)\n\nNext"
+    assert result.pages[0].word_count == 4
+    assert result.pages[0].confidence == pytest.approx(
+        (6 * 90 + 5 * 80 + 3 * 60 + 4 * 70) / 18 / 100
+    )
+    # one engine for the three inline pages, one for the pool thread
+    assert len(_FakeApi.created) == 2
+    assert len(set(_FakeApi.created)) == 2
+
+
+def test_falls_back_to_pytesseract_when_tesserocr_cannot_start(monkeypatch):
+    def broken_api(**kwargs):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+    monkeypatch.setattr(ocr.settings, "OCR_BACKEND", "auto")
+    monkeypatch.setattr(ocr, "tesserocr", _fake_tesserocr(broken_api))
+    monkeypatch.setattr(ocr, "_engines", threading.local())
+    monkeypatch.setattr(ocr, "_tesserocr_failed", False)
+    monkeypatch.setattr(
+        ocr.pytesseract, "image_to_data", lambda *a, **k: _data("fallback")
+    )
+
+    assert ocr.read_image(Image.new("L", (20, 10), "white")).text == "fallback"
+    assert ocr.ocr_backend() == "pytesseract"
@@ -0,0 +1,64 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.cache import NullCache
+from app.core.ocr import PageResult
+from app.models.file import FileType
+from app.services import ocr_service
+
+
+class FakePageRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.added = []
+        self.commits = 0
+
+    async def list_for_file(self, file_id):
+        return self.rows
+
+    async def add(self, file_id, page):
+        self.added.append(page.page_number)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_resumes_from_checkpointed_pages(monkeypatch):
+    monkeypatch.setattr(ocr_service, "ocr_cache", NullCache("ocr", 60))
+    skipped = []
+
+    def fake_pages(file_type, file_bytes, skip_pages):
+        skipped.extend(sorted(skip_pages))
+        for n in (3, 4):
+            yield PageResult(page_number=n, text=f"new {n}", seconds=1.0)
+
+    monkeypatch.setattr(ocr_service, "_iter_file_pages", fake_pages)
+
+    rows = [
+        SimpleNamespace(
+            page_number=n,
+            text=f"old {n}",
+            seconds=1.0,
+            source="ocr",
+            dpi=200,
+            confidence=0.9,
+            word_count=2,
+        )
+        for n in (1, 2)
+    ]
+    repo = FakePageRepo(rows)
+    s3 = SimpleNamespace(get_object=lambda Bucket, Key: {"Body": io.BytesIO(b"%PDF")})
+    file = SimpleNamespace(
+        id="f1", s3_key="k", file_type=FileType.pdf, original_filename="a.pdf"
+    )
+
+    result = await ocr_service.run_ocr(file, s3_client=s3, page_repo=repo)
+
+    assert skipped == [1, 2]
+    assert repo.added == [3, 4]
+    assert repo.commits >= 2
+    assert result.text == "old 1\nold 2\nnew 3\nnew 4"
+    assert [page.dpi for page in result.pages[:2]] == [200, 200]
@@ -0,0 +1,172 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.dependencies.auth import get_current_user
+from app.dependencies.services import get_predicted_paper_service
+from app.models.predicted_paper import PredictedPaper, PredictedPaperStatus
+from app.services import paper_prediction_service
+from app.services.llm_scheduler import LlmScheduler, NullRateLimiter
+from app.services.paper_prediction_service import PredictedPaperService
+
+
+class FakeDB:
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+
+    def add(self, obj):
+        obj.id = uuid.uuid4()
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class RecordingPublisher:
+    events = []
+
+    def __init__(self, paper_id):
+        self.paper_id = paper_id
+
+    async def publish(self, event, data=""):
+        self.events.append((event, data))
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    RecordingPublisher.events = []
+    monkeypatch.setattr(paper_prediction_service, "PaperStreamPublisher", RecordingPublisher)
+    monkeypatch.setattr(paper_prediction_service.settings, "PREDICTION_PUBLISH_SECONDS", 0)
+    monkeypatch.setattr(paper_prediction_service.settings, "PREDICTION_PERSIST_SECONDS", 0)
+    calls = []
+
+    def fake_stream(deltas, fail_after=None):
+        async def _stream(prompt, **kwargs):
+            calls.append(kwargs)
+            for i, delta in enumerate(deltas):
+                if i == fail_after:
+                    raise ConnectionError("stream dropped")
+                yield delta
+
+        monkeypatch.setattr(paper_prediction_service, "stream_llm", _stream)
+
+    return SimpleNamespace(fake_stream=fake_stream, calls=calls)
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_keeps_partial_text(streaming):
+    db = FakeDB()
+    service = PredictedPaperService(SimpleNamespace(db=db))
+
+    streaming.fake_stream(["Q1. ", "Optics", " Q2."], fail_after=2)
+    with pytest.raises(ConnectionError):
+        await service.predict_and_store(uuid.uuid4(), uuid.uuid4(), "context")
+
+    paper = db.added[0]
+    assert paper.predicted_text == "Q1. Optics"
+    assert paper.status == PredictedPaperStatus.generating
+    events = RecordingPublisher.events
+    assert events[0] == ("reset", "")
+    assert ("delta", "Q1. ") in events
+    assert events[-1] == ("error", "ConnectionError")
+
+
+@pytest.mark.asyncio
+async def test_interrupted_prediction_resumes_after_partial_text(streaming):
+    service = PredictedPaperService(SimpleNamespace(db=FakeDB()))
+    partial = PredictedPaper(
+        id=uuid.uuid4(),
+        upload_id=uuid.uuid4(),
+        exam_id=uuid.uuid4(),
+        predicted_text="Q1. Optics",
+        status=PredictedPaperStatus.generating,
+    )
+
+    streaming.fake_stream([" Q2. Motion"])
+    paper = await service.predict_and_store(
+        partial.upload_id, partial.exam_id, "context", predicted_paper=partial
+    )
+
+    assert streaming.calls[-1]["continue_from"] == "Q1. Optics"
+    assert paper.predicted_text == "Q1. Optics Q2. Motion"
+    assert paper.status == PredictedPaperStatus.completed
+    assert RecordingPublisher.events[0] == ("reset", "Q1. Optics")
+    assert RecordingPublisher.events[-1] == ("done", "")
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_streams_only_before_first_item():
+    scheduler = LlmScheduler(
+        max_concurrency=1, rate_limiter=NullRateLimiter(), base_backoff=0
+    )
+    attempts = []
+
+    def flaky(fail_at):
+        async def _request():
+            attempts.append(fail_at)
+            if len(attempts) == 1 and fail_at == 0:
+                raise asyncio.TimeoutError()
+            yield "a"
+            if fail_at == 1:
+                raise asyncio.TimeoutError()
+            yield "b"
+
+        return _request
+
+    assert [x async for x in scheduler.stream(flaky(0))] == ["a", "b"]
+    assert len(attempts) == 2
+
+    attempts.clear()
+    received = []
+    with pytest.raises(asyncio.TimeoutError):
+        async for item in scheduler.stream(flaky(1)):
+            received.append(item)
+    assert received == ["a"] and len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_sse_endpoint_relays_live_events(monkeypatch):
+    user = SimpleNamespace(id=uuid.uuid4())
+    paper = SimpleNamespace(
+        id=uuid.uuid4(),
+        upload_id=uuid.uuid4(),
+        status=PredictedPaperStatus.generating,
+        predicted_text="",
+    )
+
+    class Service(PredictedPaperService):
+        async def get_owned(self, paper_id, user_id):
+            return paper if paper_id == str(paper.id) and user_id == user.id else None
+
+    async def fake_events(paper_id):
+        assert paper_id == paper.id
+        for item in [("reset", ""), ("delta", "Q1. Optics"), None, ("done", "")]:
+            yield item
+
+    monkeypatch.setattr(paper_prediction_service, "iter_paper_events", fake_events)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_predicted_paper_service] = lambda: Service(None)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            resp = await client.get(f"/predicted-papers/{paper.id}/stream")
+            missing = await client.get(f"/predicted-papers/{uuid.uuid4()}/stream")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert resp.text == (
+        'event: reset\ndata: {"text": ""}\n\n'
+        'event: delta\ndata: {"text": "Q1. Optics"}\n\n'
+        ": keep-alive\n\n"
+        "event: done\ndata: {}\n\n"
+    )
+    assert missing.status_code == 404
@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.core import preprocessing
+
+
+def _page(width=1240, height=1754):
+    """Synthetic white page with black text lines."""
+    page = np.full((height, width), 255, np.uint8)
+    for i, y in enumerate(range(150, height - 150, 45)):
+        cv2.putText(
+            page,
+            f"Question {i}. Define momentum and state its SI unit",
+            (100, y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            0,
+            2,
+        )
+    return page
+
+
+@pytest.mark.parametrize("angle", [3.0, -5.0, 7.5])
+def test_skewed_pages_are_straightened(angle):
+    skewed = preprocessing._rotate(_page(), angle, border=255)
+
+    estimate = preprocessing.estimate_skew(skewed)
+    assert estimate == pytest.approx(-angle, abs=0.2)
+    assert preprocessing.estimate_skew(preprocessing.deskew(skewed)) == pytest.approx(
+        0.0, abs=0.2
+    )
+
+
+def test_straight_and_blank_pages_are_left_alone():
+    page = _page()
+    blank = np.full((100, 80), 255, np.uint8)
+
+    assert preprocessing.deskew(page) is page
+    assert preprocessing.estimate_skew(blank) == 0.0
+    assert preprocessing.crop_borders(blank) is blank
+
+
+def test_dark_frame_and_margins_are_cropped():
+    page = _page()
+    ys, xs = np.nonzero(page < 128)
+    framed = cv2.copyMakeBorder(page, 60, 60, 60, 60, cv2.BORDER_CONSTANT, value=0)
+    framed = cv2.copyMakeBorder(framed, 100, 100, 100, 100, cv2.BORDER_CONSTANT, value=255)
+
+    cropped = preprocessing.crop_borders(framed, margin=10)
+
+    assert cropped.shape == (
+        ys.max() - ys.min() + 1 + 20,
+        xs.max() - xs.min() + 1 + 20,
+    )
+    assert (cropped[:, :5] == 255).all()
+
+
+def test_oversized_rasters_are_downscaled(monkeypatch):
+    monkeypatch.setattr(preprocessing.settings, "OCR_MAX_IMAGE_PIXELS", 1_000_000)
+    photo = np.full((3000, 4000), 255, np.uint8)
+
+    small = preprocessing.downscale(photo)
+
+    assert small.shape[0] * small.shape[1] <= 1_000_000
+    assert small.shape[1] / small.shape[0] == pytest.approx(4 / 3, rel=0.01)
+
+
+def test_pipeline_returns_binary_grayscale_raster():
+    rgba = Image.fromarray(_page()).convert("RGBA")
+
+    result = preprocessing.preprocess_page(rgba)
+
+    assert result.ndim == 2
+    assert set(np.unique(result)) <= {0, 255}
+    # text survives binarization, the paper does not turn to noise
+    assert 0.01 < (result == 0).mean() < 0.3
+
+
+def test_light_text_on_dark_background_is_inverted():
+    page = _page(width=600, height=400)
+    dark = cv2.bitwise_not(page)
+
+    assert preprocessing.normalize_polarity(page) is page
+    assert (preprocessing.normalize_polarity(dark) == page).all()
+    result = preprocessing.preprocess_page(dark)
+    assert 0.01 < (result == 0).mean() < 0.3
+
+
+def test_large_jpegs_are_decoded_small_and_gray(tmp_path, monkeypatch):
+    monkeypatch.setattr(preprocessing.settings, "OCR_MAX_IMAGE_PIXELS", 1_000_000)
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (4000, 3000), "white").save(path)
+
+    image = preprocessing.open_image(str(path))
+
+    assert image.mode == "L"
+    assert image.width * image.height < 4000 * 3000
+    assert image.width * image.height >= 1_000_000
@@ -0,0 +1,210 @@
+import hashlib
+import uuid
+from types import SimpleNamespace
+
+import boto3
+import pytest
+import requests
+from httpx import AsyncClient, ASGITransport
+from moto import mock_aws
+
+from app.core import aws
+from app.main import app
+from app.dependencies.auth import get_current_user
+from app.dependencies.services import get_upload_service
+from app.routers import uploads as uploads_router
+from app.services.upload_service import UploadService
+
+BUCKET = "prepnexa-test"
+
+
+class FakeUploadRepo:
+    def __init__(self):
+        self.uploads = []
+        self.files = []
+
+    async def create_upload(self, upload):
+        upload.id = uuid.uuid4()
+        self.uploads.append(upload)
+        return upload
+
+    async def add_file(self, file):
+        self.files.append(file)
+        return file
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def s3_env(monkeypatch):
+    with mock_aws():
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        client.create_bucket(Bucket=BUCKET)
+        repo = FakeUploadRepo()
+        user = SimpleNamespace(id=uuid.uuid4())
+        enqueued = []
+
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_upload_service] = lambda: UploadService(
+            repo, s3_client=client, bucket=BUCKET
+        )
+        monkeypatch.setattr(uploads_router, "enqueue_process_upload", enqueued.append)
+        yield SimpleNamespace(client=client, repo=repo, user=user, enqueued=enqueued)
+        app.dependency_overrides.clear()
+
+
+def _upload_parts(presigned, data):
+    parts = []
+    size = presigned["part_size"]
+    for part in presigned["parts"]:
+        start = (part["part_number"] - 1) * size
+        resp = requests.put(part["url"], data=data[start : start + size])
+        assert resp.status_code == 200
+        parts.append({"part_number": part["part_number"], "etag": resp.headers["ETag"]})
+    return parts
+
+
+async def _presign_and_upload(client, data, declared_sha256=None):
+    resp = await client.post(
+        "/uploads/presign",
+        json={
+            "files": [
+                {
+                    "filename": "paper.pdf",
+                    "size": len(data),
+                    "sha256": declared_sha256 or hashlib.sha256(data).hexdigest(),
+                }
+            ]
+        },
+    )
+    assert resp.status_code == 200
+    presigned = resp.json()["files"][0]
+    return presigned, _upload_parts(presigned, data)
+
+
+def _complete_body(presigned, parts):
+    return {
+        "exam_id": str(uuid.uuid4()),
+        "year": 2024,
+        "files": [
+            {
+                "filename": presigned["filename"],
+                "s3_key": presigned["s3_key"],
+                "multipart_upload_id": presigned["multipart_upload_id"],
+                "parts": parts,
+            }
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_presigned_multipart_upload_roundtrip(s3_env, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_PART_SIZE_MB", 5)
+    # two parts: one full 5 MB part and a short tail
+    data = b"%PDF-1.4 " + b"x" * (5 * 1024 * 1024 + 100)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        presigned, parts = await _presign_and_upload(client, data)
+        assert presigned["s3_key"].startswith(f"uploads/{s3_env.user.id}/")
+        assert "{" not in presigned["s3_key"]
+        assert len(presigned["parts"]) == 2
+
+        resp = await client.post("/uploads/complete", json=_complete_body(presigned, parts))
+
+    assert resp.status_code == 201
+    assert s3_env.enqueued == [s3_env.repo.uploads[0].id]
+    assert [f.s3_key for f in s3_env.repo.files] == [presigned["s3_key"]]
+    body = s3_env.client.get_object(Bucket=BUCKET, Key=presigned["s3_key"])["Body"].read()
+    assert body == data
+
+
+@pytest.mark.asyncio
+async def test_size_mismatch_is_rejected_and_deleted(s3_env):
+    data = b"%PDF-1.4 small"
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.post(
+            "/uploads/presign",
+            json={
+                "files": [
+                    {
+                        "filename": "paper.pdf",
+                        "size": len(data) + 1,
+                        "sha256": hashlib.sha256(data).hexdigest(),
+                    }
+                ]
+            },
+        )
+        presigned = resp.json()["files"][0]
+        parts = _upload_parts(presigned, data)
+        resp = await client.post("/uploads/complete", json=_complete_body(presigned, parts))
+
+    assert resp.status_code == 400
+    assert "expected" in resp.json()["detail"]
+    assert s3_env.repo.files == []
+    assert s3_env.enqueued == []
+    listing = s3_env.client.list_objects_v2(Bucket=BUCKET)
+    assert listing.get("KeyCount", 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_checksum_is_verified_by_the_worker_download(s3_env):
+    data = b"%PDF-1.4 small"
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        presigned, parts = await _presign_and_upload(
+            client, data, declared_sha256="0" * 64
+        )
+        resp = await client.post("/uploads/complete", json=_complete_body(presigned, parts))
+
+    # the API no longer reads the object back
+    assert resp.status_code == 201
+    with pytest.raises(aws.ObjectChecksumMismatch):
+        async with aws.download_object(
+            presigned["s3_key"], bucket=BUCKET, s3_client=s3_env.client
+        ):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_another_user_cannot_complete_an_upload(s3_env):
+    data = b"%PDF-1.4 small"
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        presigned, parts = await _presign_and_upload(client, data)
+        intruder = SimpleNamespace(id=uuid.uuid4())
+        app.dependency_overrides[get_current_user] = lambda: intruder
+        resp = await client.post("/uploads/complete", json=_complete_body(presigned, parts))
+
+    assert resp.status_code == 403
+    assert s3_env.repo.files == []
+    assert s3_env.enqueued == []
+    # rejected before completion: the owner's upload is untouched
+    in_progress = s3_env.client.list_multipart_uploads(Bucket=BUCKET)["Uploads"]
+    assert [u["UploadId"] for u in in_progress] == [presigned["multipart_upload_id"]]
+    listing = s3_env.client.list_objects_v2(Bucket=BUCKET)
+    assert listing.get("KeyCount", 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_presign_rejects_oversized_and_unsupported_files(s3_env, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.UPLOAD_MAX_MB", 1)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        too_big = await client.post(
+            "/uploads/presign",
+            json={"files": [{"filename": "a.pdf", "size": 2 * 1024 * 1024, "sha256": "0" * 64}]},
+        )
+        bad_ext = await client.post(
+            "/uploads/presign",
+            json={"files": [{"filename": "a.docx", "size": 10, "sha256": "0" * 64}]},
+        )
+
+    assert too_big.status_code == 413
+    assert bad_ext.status_code == 400
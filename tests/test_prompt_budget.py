@@ -0,0 +1,76 @@
+import pytest
+
+from app.services import prompt_budget
+from app.services.prompt_budget import (
+    ContextSection,
+    count_tokens,
+    pack_context,
+    truncate_to_tokens,
+)
+
+
+class WordEncoding:
+    """Stand-in tokenizer: one token per space-separated word."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+@pytest.fixture
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "_encoding", lambda model: WordEncoding())
+
+
+@pytest.fixture
+def no_tokenizer(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "_encoding", lambda model: None)
+
+
+def test_count_and_truncate_use_the_tokenizer(word_tokens):
+    assert count_tokens("") == 0
+    assert count_tokens("one two three") == 3
+    assert truncate_to_tokens("one two three four", 2) == "one two"
+    assert truncate_to_tokens("one two", 5) == "one two"
+
+
+def test_counts_fall_back_to_length_estimate(no_tokenizer):
+    text = "x" * 400
+
+    assert count_tokens(text) == 101
+    assert count_tokens(truncate_to_tokens(text, 50)) <= 50
+
+
+def test_pack_context_fills_budget_by_priority(word_tokens):
+    packed = pack_context(
+        [
+            ContextSection("text", "raw " * 20, priority=1),
+            ContextSection("questions", "Q1 Q2 Q3", priority=0),
+        ],
+        max_tokens=10,
+        separator=" ",
+    )
+
+    assert packed.text.startswith("Q1 Q2 Q3 raw")
+    assert packed.tokens <= 10
+    assert packed.sections["questions"] == 3
+    assert packed.truncated == ["text"]
+    assert packed.dropped == []
+
+
+def test_pack_context_drops_sections_that_cannot_be_cut(word_tokens):
+    packed = pack_context(
+        [
+            ContextSection("questions", "a b c d e f", priority=0),
+            ContextSection("header", "too long for the rest", truncatable=False, priority=1),
+            ContextSection("footer", "end", priority=2),
+        ],
+        max_tokens=9,
+        separator=" ",
+    )
+
+    assert packed.text == "a b c d e f end"
+    assert packed.dropped == ["header"]
+    assert packed.sections == {"questions": 6, "footer": 1}
@@ -0,0 +1,103 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models.question import Question
+from app.models.question_topic import QuestionTopic
+from app.repositories.question_repo import QuestionRepository
+from app.services.question_extractor import QuestionExtractorService
+
+
+class SqliteDB:
+    """Async-session stand-in running the real statements on SQLite.
+
+    SQLite supports multi-row INSERT ... RETURNING, so the bulk insert and
+    its id ordering are exercised as on Postgres.
+    """
+
+    def __init__(self):
+        self.engine = create_engine("sqlite://")
+        Question.__table__.create(self.engine)
+        QuestionTopic.__table__.create(self.engine)
+        self.session = Session(self.engine)
+
+    async def execute(self, stmt, params=None):
+        return self.session.execute(stmt, params)
+
+
+@pytest.fixture
+def db():
+    db = SqliteDB()
+    yield db
+    db.session.close()
+    db.engine.dispose()
+
+
+def _row(number, text):
+    return {
+        "processed_text_id": uuid.uuid4(),
+        "exam_id": uuid.uuid4(),
+        "subject_id": uuid.uuid4(),
+        "year": 2024,
+        "question_number": number,
+        "question_text": text,
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_returns_ids_in_input_order(db):
+    repo = QuestionRepository(db)
+    # numbers deliberately out of order, so a sort by anything but the
+    # input position would show
+    rows = [_row(number, f"question {number}") for number in (7, 2, 9, 1, 5)]
+
+    ids = await repo.bulk_create_questions(rows)
+
+    assert len(ids) == len(set(ids)) == len(rows)
+    stored = dict(
+        db.session.execute(select(Question.id, Question.question_number)).all()
+    )
+    assert [stored[question_id] for question_id in ids] == [7, 2, 9, 1, 5]
+    assert await repo.bulk_create_questions([]) == []
+
+
+@pytest.mark.asyncio
+async def test_extracted_topic_links_point_at_their_questions(db):
+    optics, motion = uuid.uuid4(), uuid.uuid4()
+    topics = [
+        SimpleNamespace(id=optics, name="Optics"),
+        SimpleNamespace(id=motion, name="Motion"),
+    ]
+
+    class TopicRepo:
+        async def list_topics_by_exam(self, exam_id):
+            return topics
+
+    upload = SimpleNamespace(exam_id=uuid.uuid4(), year=2024)
+    processed_text = SimpleNamespace(
+        id=uuid.uuid4(),
+        cleaned_text=(
+            "1. Explain total internal reflection in optics.\n"
+            "2. Define uniform motion.\n"
+            "3. Name two prime numbers.\n"
+            "4. Relate optics and motion in a moving mirror."
+        ),
+    )
+    extractor = QuestionExtractorService(QuestionRepository(db), TopicRepo())
+
+    await extractor.extract_questions(upload=upload, processed_text=processed_text)
+
+    links = db.session.execute(
+        select(Question.question_number, QuestionTopic.topic_id).join(
+            QuestionTopic, QuestionTopic.question_id == Question.id
+        )
+    ).all()
+    assert sorted(links, key=lambda link: (link[0], link[1] == motion)) == [
+        (1, optics),
+        (2, motion),
+        (4, optics),
+        (4, motion),
+    ]
@@ -0,0 +1,85 @@
+import io
+import threading
+import time
+
+import boto3
+import pytest
+from fastapi import UploadFile
+from moto import mock_aws
+
+from app.core.s3 import upload_files_to_s3
+
+BUCKET = "prepnexa-test"
+
+
+class RecordingClient:
+    """Wraps a moto client; tracks overlap and fails uploads of `fail_key`
+    after the object was written (like an interrupted transfer)."""
+
+    def __init__(self, client, fail_key=None):
+        self.client = client
+        self.fail_key = fail_key
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def upload_fileobj(self, file_obj, bucket, key, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.05)
+            self.client.upload_fileobj(file_obj, bucket, key, **kwargs)
+            if key == self.fail_key:
+                raise ConnectionError("connection reset")
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+@pytest.fixture
+def s3_client():
+    with mock_aws():
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def _files(n):
+    return [
+        (UploadFile(file=io.BytesIO(b"img %d" % i), filename=f"{i}.png"), f"uploads/{i}.png")
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_uploads_run_concurrently_within_limit(s3_client):
+    client = RecordingClient(s3_client)
+
+    keys = await upload_files_to_s3(
+        _files(6), bucket=BUCKET, s3_client=client, max_concurrency=3
+    )
+
+    assert keys == [f"uploads/{i}.png" for i in range(6)]
+    assert 1 < client.peak <= 3
+    assert s3_client.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 6
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_deletes_every_object(s3_client):
+    client = RecordingClient(s3_client, fail_key="uploads/2.png")
+
+    with pytest.raises(ConnectionError):
+        await upload_files_to_s3(
+            _files(4), bucket=BUCKET, s3_client=client, max_concurrency=2
+        )
+
+    assert s3_client.list_objects_v2(Bucket=BUCKET)["KeyCount"] == 0
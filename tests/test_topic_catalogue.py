@@ -0,0 +1,109 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.database import Base
+from app.models import catalogue_version
+from app.repositories.topic_catalogue import TopicCatalogue
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0][0] if self.rows else None
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    def __init__(self, topics):
+        self.version = 1
+        self.topics = topics
+        self.topic_queries = 0
+
+    async def execute(self, stmt):
+        if "catalogue_version" in str(stmt):
+            return FakeResult([] if self.version is None else [(self.version,)])
+        self.topic_queries += 1
+        return FakeResult(self.topics)
+
+
+def _row(name):
+    return (uuid.uuid4(), name, uuid.uuid4(), "Physics")
+
+
+@pytest.mark.asyncio
+async def test_topics_are_cached_until_version_changes():
+    db = FakeDB([_row("Optics"), _row("Motion")])
+    catalogue = TopicCatalogue(check_seconds=0)
+
+    first = await catalogue.topics_for_exam(db, "exam-1")
+    second = await catalogue.topics_for_exam(db, "exam-1")
+
+    assert [t.name for t in first] == ["Optics", "Motion"]
+    assert second is first
+    assert db.topic_queries == 1
+    assert catalogue.stats.hit_ratio == 0.5
+    assert catalogue.memory_bytes() > 0
+
+    db.version = 2
+    db.topics = [_row("Optics")]
+    third = await catalogue.topics_for_exam(db, "exam-1")
+
+    assert [t.name for t in third] == ["Optics"]
+    assert db.topic_queries == 2
+    assert catalogue.version == 2
+
+
+@pytest.mark.asyncio
+async def test_version_is_not_rechecked_within_interval():
+    db = FakeDB([_row("Optics")])
+    catalogue = TopicCatalogue(check_seconds=3600)
+
+    await catalogue.topics_for_exam(db, "exam-1")
+    db.version = 2
+    await catalogue.topics_for_exam(db, "exam-1")
+    assert db.topic_queries == 1
+
+    catalogue.invalidate()
+    await catalogue.topics_for_exam(db, "exam-1")
+    assert db.topic_queries == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_version_row_expires_cache_every_interval():
+    db = FakeDB([_row("Optics")])
+    db.version = None
+    catalogue = TopicCatalogue(check_seconds=3600)
+
+    await catalogue.topics_for_exam(db, "exam-1")
+    await catalogue.topics_for_exam(db, "exam-1")
+    assert db.topic_queries == 1
+
+    # interval elapsed: dropped although no version ever moves
+    catalogue._checked_at -= 3600
+    await catalogue.topics_for_exam(db, "exam-1")
+    assert db.topic_queries == 2
+
+
+def test_create_all_seeds_version_row_and_triggers():
+    statements = []
+    connection = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        execute=lambda ddl: statements.append(" ".join(str(ddl).split())),
+    )
+
+    catalogue_version._install_triggers(Base.metadata, connection)
+
+    assert statements[0].startswith("INSERT INTO catalogue_version")
+    assert "ON CONFLICT (id) DO NOTHING" in statements[0]
+    assert any("FUNCTION bump_catalogue_version()" in s for s in statements)
+    for table in catalogue_version.CATALOGUE_TABLES:
+        assert any(
+            s.startswith(f"CREATE TRIGGER {table}_catalogue_version")
+            for s in statements
+        )
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from app.services import topic_matcher
+from app.services.topic_matcher import TopicMatcher, get_topic_matcher
+
+
+def _topics(*names):
+    return [SimpleNamespace(id=f"t{i}", name=name) for i, name in enumerate(names)]
+
+
+def test_matches_whole_words_case_insensitively():
+    matcher = TopicMatcher(_topics("Cell", "Cell Division", "Acid", "pH"))
+
+    assert matcher.match("Explain CELL division in plants.") == ["t0", "t1"]
+    assert matcher.match("Cells and excellent acidic") == []
+    assert matcher.match("What is the pH of an acid?") == ["t3", "t2"]
+
+
+def test_overlapping_names_and_line_breaks():
+    matcher = TopicMatcher(_topics("Newton's Laws", "laws of motion", "motion"))
+
+    text = "State Newton's\nlaws of   motion."
+    assert matcher.match(text) == ["t0", "t1", "t2"]
+
+
+def test_duplicate_names_map_to_every_topic():
+    matcher = TopicMatcher(_topics("Optics", "optics"))
+
+    assert len(matcher) == 1
+    assert matcher.match("Ray optics") == ["t0", "t1"]
+
+
+def test_matcher_is_cached_until_topics_change():
+    topic_matcher.invalidate_topic_matchers()
+    topics = _topics("Algebra")
+
+    first = get_topic_matcher("exam", topics)
+    assert get_topic_matcher("exam", list(topics)) is first
+
+    changed = get_topic_matcher("exam", topics + _topics("x", "Geometry")[1:])
+    assert changed is not first
+    assert changed.match("geometry") == ["t1"]
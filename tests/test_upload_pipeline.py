@@ -0,0 +1,165 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.aws import ObjectChecksumMismatch
+from app.core.celery_app import celery_app
+from app.models.predicted_paper import PredictedPaperStatus
+from app.models.upload import UploadStatus
+from app.repositories.predicted_paper_repo import PredictedPaperRepository
+from app.repositories.processed_text_repo import ProcessedTextRepository
+from app.services import worker_service
+from app.services.question_extractor import QuestionExtractorService
+from app.services.worker_service import WorkerService
+from app.workers import tasks
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Run `process_upload_task` inline, capturing the pipeline it builds."""
+    pipelines = []
+    real_chain = tasks.chain
+
+    def capture_chain(*signatures):
+        pipeline = real_chain(*signatures)
+        pipeline.apply_async = lambda: pipelines.append(pipeline)
+        return pipeline
+
+    def start(file_ids):
+        monkeypatch.setattr(tasks, "_run", lambda stage, *args: file_ids)
+        monkeypatch.setattr(tasks, "chain", capture_chain)
+        tasks.process_upload_task.run("upload-1")
+        return pipelines
+
+    return start
+
+
+def test_pipeline_fans_out_ocr_then_runs_stages_in_order(started):
+    (pipeline,) = started(["f1", "f2"])
+
+    # a group followed by tasks becomes a chord: OCR every file, then the rest
+    assert [(sig.task, sig.args) for sig in pipeline.tasks] == [
+        ("upload.ocr_file", ("f1",)),
+        ("upload.ocr_file", ("f2",)),
+    ]
+    assert [(sig.task, sig.args) for sig in pipeline.body.tasks] == [
+        ("upload.extract_questions", ("upload-1",)),
+        ("upload.predict", ("upload-1",)),
+        ("upload.finalize", ("upload-1",)),
+    ]
+    # immutable: stages take the upload id, not the previous result
+    assert all(sig.immutable for sig in pipeline.tasks)
+    assert all(sig.immutable for sig in pipeline.body.tasks)
+
+    (errback,) = pipeline.body.options["link_error"]
+    assert (errback.task, errback.args) == ("upload.mark_failed", ("upload-1",))
+
+
+def test_upload_without_files_starts_no_pipeline(started):
+    assert started([]) == []
+
+
+def test_ocr_runs_on_its_own_queue():
+    router = celery_app.amqp.router
+
+    def queue(name):
+        return router.route({}, name, (), {})["queue"].name
+
+    assert queue("upload.ocr_file") == "ocr"
+    for name in ("upload.extract_questions", "upload.predict", "upload.finalize"):
+        assert queue(name) == "io"
+
+
+def test_stages_retry_transient_errors_only():
+    for task in (
+        tasks.process_upload_task,
+        tasks.ocr_file_task,
+        tasks.extract_questions_task,
+        tasks.predict_task,
+        tasks.finalize_upload_task,
+    ):
+        assert task.autoretry_for == (Exception,)
+        assert LookupError in task.dont_autoretry_for
+        assert ObjectChecksumMismatch in task.dont_autoretry_for
+    # the errback must not retry itself into a loop
+    assert not getattr(tasks.mark_upload_failed_task, "autoretry_for", None)
+
+
+class FakeDB:
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self.commits = 0
+
+    async def get(self, model, key):
+        return self.rows.get(key)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_ocr_file_skips_files_with_processed_text(monkeypatch):
+    file = SimpleNamespace(id="f1", original_filename="a.pdf")
+    db = FakeDB({"f1": file})
+
+    async def get_by_file(self, file_id):
+        return SimpleNamespace(file_id=file_id)
+
+    async def run_ocr(*args, **kwargs):
+        pytest.fail("OCR must not run again")
+
+    monkeypatch.setattr(ProcessedTextRepository, "get_by_file", get_by_file)
+    monkeypatch.setattr(worker_service, "run_ocr", run_ocr)
+
+    await WorkerService(db).ocr_file("f1")
+    assert db.commits == 0
+
+    with pytest.raises(LookupError):
+        await WorkerService(db).ocr_file("missing")
+
+
+@pytest.mark.asyncio
+async def test_extract_questions_skips_extracted_texts(monkeypatch):
+    upload = SimpleNamespace(id=uuid.uuid4(), status=UploadStatus.processing)
+    texts = [
+        SimpleNamespace(
+            id=uuid.uuid4(), confidence=0.9, word_count=300, questions_extracted=done
+        )
+        for done in (True, False)
+    ]
+    extracted = []
+    service = WorkerService(FakeDB({upload.id: upload}))
+
+    async def load_processed_texts(upload_id):
+        return texts
+
+    async def extract(self, upload, processed_text):
+        extracted.append(processed_text.id)
+
+    monkeypatch.setattr(service, "_load_processed_texts", load_processed_texts)
+    monkeypatch.setattr(QuestionExtractorService, "extract_questions", extract)
+
+    await service.extract_questions(upload.id)
+
+    assert extracted == [texts[1].id]
+    assert all(text.questions_extracted for text in texts)
+    assert service.db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_predict_reuses_completed_paper(monkeypatch):
+    upload = SimpleNamespace(id=uuid.uuid4(), status=UploadStatus.processing)
+    paper = SimpleNamespace(id=uuid.uuid4(), status=PredictedPaperStatus.completed)
+    service = WorkerService(FakeDB({upload.id: upload}))
+
+    async def get_for_upload(self, upload_id):
+        return paper
+
+    async def load_processed_texts(upload_id):
+        pytest.fail("a completed paper needs no context")
+
+    monkeypatch.setattr(PredictedPaperRepository, "get_for_upload", get_for_upload)
+    monkeypatch.setattr(service, "_load_processed_texts", load_processed_texts)
+
+    assert await service.predict(upload.id) is paper
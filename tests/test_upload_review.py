@@ -0,0 +1,82 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.upload import UploadStatus
+from app.services.question_extractor import QuestionExtractorService
+from app.services.worker_service import WorkerService
+
+
+class FakeDB:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _text(confidence, word_count):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        confidence=confidence,
+        word_count=word_count,
+        questions_extracted=False,
+    )
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    upload = SimpleNamespace(id=uuid.uuid4(), status=UploadStatus.processing)
+    texts = []
+    extracted = []
+    service = WorkerService(FakeDB())
+
+    async def load_upload(upload_id):
+        return upload
+
+    async def load_processed_texts(upload_id):
+        return texts
+
+    async def extract(self, upload, processed_text):
+        extracted.append(processed_text.id)
+
+    monkeypatch.setattr(service, "_load_upload", load_upload)
+    monkeypatch.setattr(service, "_load_processed_texts", load_processed_texts)
+    monkeypatch.setattr(QuestionExtractorService, "extract_questions", extract)
+    return service, upload, texts, extracted
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "pages",
+    [
+        [(0.35, 400)],  # unreadable scan
+        [(0.95, 10), (0.9, 5)],  # almost no text
+        [(0.95, 100), (0.2, 900)],  # mostly garbage
+        [(None, 0), (None, 0)],  # blank scans: no words, no confidence
+        [(None, 0), (None, None)],  # blank scan next to a legacy file
+    ],
+)
+async def test_unusable_ocr_stops_before_llm_stages(worker, pages):
+    service, upload, texts, extracted = worker
+    texts.extend(_text(*page) for page in pages)
+
+    await service.extract_questions(upload.id)
+
+    assert upload.status == UploadStatus.needs_review
+    assert extracted == []
+    assert await service.predict(upload.id) is None
+    await service.finalize(upload.id)
+    assert upload.status == UploadStatus.needs_review
+
+
+@pytest.mark.asyncio
+async def test_good_and_legacy_texts_are_processed(worker):
+    service, upload, texts, extracted = worker
+    texts.extend([_text(0.92, 300), _text(0.4, 20), _text(None, None)])
+
+    await service.extract_questions(upload.id)
+
+    assert upload.status == UploadStatus.processing
+    assert extracted == [text.id for text in texts]
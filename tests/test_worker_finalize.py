@@ -0,0 +1,154 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.predicted_paper import PredictedPaper, PredictedPaperStatus
+from app.models.upload import Upload, UploadStatus
+from app.repositories.flashcard_repo import FlashcardRepository
+from app.repositories.predicted_paper_repo import PredictedPaperRepository
+from app.services import paper_prediction_service
+from app.services.flashcard_service import FlashcardService
+from app.services.paper_prediction_service import PredictedPaperService
+from app.services.worker_service import WorkerService
+
+
+class FakeDB:
+    def __init__(self, upload, paper):
+        self.rows = {Upload: upload, PredictedPaper: paper}
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def get(self, model, key):
+        return self.rows[model]
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    upload = SimpleNamespace(
+        id=uuid.uuid4(), user_id=uuid.uuid4(), status=UploadStatus.processing
+    )
+    paper = SimpleNamespace(
+        id=uuid.uuid4(),
+        status=PredictedPaperStatus.completed,
+        predicted_text="Section A\n\nQ1. Define momentum.",
+        pdf_s3_key=None,
+    )
+    db = FakeDB(upload, paper)
+
+    async def get_for_upload(self, upload_id):
+        return paper
+
+    async def exists_for_paper(self, predicted_paper_id):
+        return False
+
+    monkeypatch.setattr(PredictedPaperRepository, "get_for_upload", get_for_upload)
+    monkeypatch.setattr(FlashcardRepository, "exists_for_paper", exists_for_paper)
+    return WorkerService(db), db, upload, paper
+
+
+def _slow(result=None, error=None, calls=None):
+    async def stage(self, *args, **kwargs):
+        if calls is not None:
+            calls.append(args or kwargs)
+        await asyncio.sleep(0.2)
+        if error is not None:
+            raise error
+        return result
+
+    return stage
+
+
+@pytest.mark.asyncio
+async def test_pdf_and_flashcards_run_concurrently(worker, monkeypatch):
+    service, db, upload, paper = worker
+    started = {"pdf": asyncio.Event(), "flashcards": asyncio.Event()}
+    overlapped = []
+
+    def _handshake(name, other, result=None):
+        # each stage waits until the other has started: run one after the
+        # other, the first would time out
+        async def stage(self, *args, **kwargs):
+            started[name].set()
+            await asyncio.wait_for(started[other].wait(), timeout=5)
+            overlapped.append(name)
+            return result
+
+        return stage
+
+    monkeypatch.setattr(
+        PredictedPaperService,
+        "render_pdf",
+        _handshake("pdf", "flashcards", "predicted/x.pdf"),
+    )
+    monkeypatch.setattr(
+        FlashcardService, "generate_flashcards", _handshake("flashcards", "pdf")
+    )
+
+    await service.finalize(upload.id)
+
+    assert sorted(overlapped) == ["flashcards", "pdf"]
+    assert paper.pdf_s3_key == "predicted/x.pdf"
+    assert upload.status == UploadStatus.completed
+
+
+@pytest.mark.asyncio
+async def test_flashcard_failure_does_not_fail_the_stage(worker, monkeypatch):
+    service, db, upload, paper = worker
+    monkeypatch.setattr(PredictedPaperService, "render_pdf", _slow("predicted/x.pdf"))
+    monkeypatch.setattr(
+        FlashcardService, "generate_flashcards", _slow(error=RuntimeError("llm down"))
+    )
+
+    await service.finalize(upload.id)
+
+    assert db.rollbacks == 1
+    assert paper.pdf_s3_key == "predicted/x.pdf"
+    assert upload.status == UploadStatus.completed
+
+
+@pytest.mark.asyncio
+async def test_pdf_failure_waits_for_flashcards_then_raises(worker, monkeypatch):
+    service, db, upload, paper = worker
+    flashcard_calls = []
+    monkeypatch.setattr(
+        PredictedPaperService, "render_pdf", _slow(error=RuntimeError("s3 down"))
+    )
+    monkeypatch.setattr(
+        FlashcardService, "generate_flashcards", _slow(calls=flashcard_calls)
+    )
+
+    with pytest.raises(RuntimeError, match="s3 down"):
+        await service.finalize(upload.id)
+
+    assert flashcard_calls
+    assert paper.pdf_s3_key is None
+    assert upload.status == UploadStatus.processing
+
+
+@pytest.mark.asyncio
+async def test_render_pdf_uploads_rendered_document(monkeypatch):
+    uploaded = {}
+
+    async def put_object_bytes(key, data, content_type=None):
+        uploaded.update(key=key, data=data, content_type=content_type)
+        return key
+
+    monkeypatch.setattr(paper_prediction_service, "put_object_bytes", put_object_bytes)
+    upload_id = uuid.uuid4()
+
+    key = await PredictedPaperService(repo=None).render_pdf(
+        upload_id, "Section A\n\nQ1. Define momentum."
+    )
+
+    assert key.startswith(f"predicted/{upload_id}/") and key.endswith(".pdf")
+    assert uploaded["key"] == key
+    assert uploaded["data"].startswith(b"%PDF")
+    assert uploaded["content_type"] == "application/pdf"
@@ -0,0 +1,23 @@
+import asyncio
+
+from app.workers import runtime
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_tasks_share_one_event_loop_per_process():
+    first = runtime.run_async(_current_loop())
+    second = runtime.run_async(_current_loop())
+
+    assert first is second
+    assert not first.is_closed()
+
+
+def test_shutdown_closes_loop_and_next_task_gets_a_new_one():
+    old = runtime.run_async(_current_loop())
+    runtime.shutdown_worker_process()
+
+    assert old.is_closed()
+    assert runtime.run_async(_current_loop()) is not old